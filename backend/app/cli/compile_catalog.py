@@ -0,0 +1,30 @@
+"""
+카탈로그 산출물 컴파일
+
+    python -m app.cli.compile_catalog [경로]
+
+배포 시 워커를 띄우기 전에 한 번 실행해 두면 각 워커는 시작하자마자 산출물을 mmap합니다.
+(실행하지 않아도 첫 워커가 시작할 때 자동으로 컴파일합니다.)
+"""
+import sys
+
+from app.database import SessionLocal
+from app.services.catalog_artifact import CATALOG_ARTIFACT_PATH, compile_catalog, open_artifact
+
+
+def main(argv=None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    target = argv[0] if argv else CATALOG_ARTIFACT_PATH
+
+    db = SessionLocal()
+    try:
+        version = compile_catalog(db, target)
+    finally:
+        db.close()
+
+    artifact = open_artifact(target, version)
+    print(f"{target}: 카탈로그 버전 {version}, {artifact.size:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+오프라인 일괄 예측 CLI
+
+    python -m app.cli.score 입력.jsonl -o 결과.jsonl [--workers N] [--top-k K]
+
+입력 (확장자로 형식 판별, --input-format으로 지정 가능):
+- JSONL: 한 줄에 하나씩 {"symptom_ids": [1, 2]} 또는 {"symptoms": ["발열", "기침"]}
+         (PredictRequest의 top_k, min_score, scorer도 줄마다 지정 가능)
+- CSV  : 헤더에 symptoms 또는 symptom_ids 열, 값은 ';'로 구분한 증상 이름 또는 ID
+출력 (확장자로 형식 판별):
+- JSONL: 입력 줄마다 BatchPredictItem 한 줄 (/api/predict/stream 응답과 같은 형식)
+- CSV  : 입력 줄 × 순위마다 한 행
+
+카탈로그는 부모 프로세스에서 한 번만 불러오고(컴파일된 산출물이 있으면 mmap),
+fork로 만든 작업 프로세스들이 copy-on-write로 공유합니다.
+점수 계산은 API와 같은 코드(app.services.prediction.score_items → 점수 방식별 score_batch)를 사용합니다.
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from app.database import SessionLocal, engine
+from app.schemas import BatchPredictItem, PredictRequest
+from app.services.catalog import CatalogSnapshot, get_catalog_snapshot
+from app.services.prediction import score_items
+from app.services.scorers import available_scorers, resolve_scorer_name
+
+# fork 전에 부모 프로세스에서 설정 (작업 프로세스는 복사 없이 공유)
+_snapshot: Optional[CatalogSnapshot] = None
+_symptom_ids_by_name: Dict[str, int] = {}
+_options: Dict = {}
+
+CSV_FIELDS = [
+    "row", "rank", "disease_id", "disease_name", "category", "probability",
+    "matched_symptoms", "error",
+]
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+    input_format = args.input_format or _format_of(args.input)
+    output_format = args.output_format or _format_of(args.output)
+
+    db = SessionLocal()
+    try:
+        snapshot = get_catalog_snapshot(db)
+    finally:
+        db.close()
+    # 파생 구조를 fork 전에 만들어 두고, 부모의 DB 연결은 자식에게 물려주지 않음
+    snapshot.scorer(resolve_scorer_name(args.scorer))
+    engine.dispose()
+
+    global _snapshot, _symptom_ids_by_name, _options
+    _snapshot = snapshot
+    _symptom_ids_by_name = {name: sid for sid, name in snapshot.index.symptoms.items()}
+    _options = {
+        "input_format": input_format,
+        "output_format": output_format,
+        "top_k": args.top_k,
+        "min_score": args.min_score,
+        "scorer": args.scorer,
+    }
+
+    started = time.perf_counter()
+    rows = errors = 0
+    with open(args.output, "w", encoding="utf-8", newline="") as output:
+        if output_format == "csv":
+            csv.writer(output).writerow(CSV_FIELDS)
+        for chunk_rows, chunk_errors, text in _run(args):
+            output.write(text)
+            rows += chunk_rows
+            errors += chunk_errors
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{rows:,}줄 처리 (오류 {errors:,}줄), {elapsed:.2f}초, "
+        f"{rows / elapsed if elapsed else 0:,.0f} rows/s "
+        f"(작업 프로세스 {args.workers}개, 카탈로그 세대 {snapshot.generation})",
+        file=sys.stderr,
+    )
+
+
+def _parse_args(argv) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli.score", description="CSV/JSONL 증상 세트 일괄 질병 예측"
+    )
+    parser.add_argument("input", help="입력 파일 (.jsonl 또는 .csv)")
+    parser.add_argument("-o", "--output", required=True, help="결과 파일 (.jsonl 또는 .csv)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"])
+    parser.add_argument("--output-format", choices=["jsonl", "csv"])
+    parser.add_argument("--top-k", type=int, default=3, help="기본 반환 질병 수 (줄별 지정 우선)")
+    parser.add_argument("--min-score", type=float, default=0.0, help="기본 최소 예측 점수")
+    parser.add_argument(
+        "--scorer", choices=available_scorers(), help="기본 점수 계산 방식 (생략하면 서버 기본값)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="작업 프로세스 수"
+    )
+    parser.add_argument("--chunk-size", type=int, default=512, help="작업 단위 줄 수")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers와 --chunk-size는 1 이상이어야 합니다")
+    return args
+
+
+def _format_of(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _run(args: argparse.Namespace) -> Iterator[Tuple[int, int, str]]:
+    """입력을 chunk 단위로 나눠 계산하고 결과를 입력 순서대로 생성"""
+    chunks = _read_chunks(args.input, _options["input_format"], args.chunk_size)
+    if args.workers == 1:
+        for chunk in chunks:
+            yield _score_chunk(chunk)
+        return
+
+    # 결과를 기다리는 작업 수를 제한해 입력 파일 크기와 무관하게 메모리를 일정하게 유지
+    max_pending = args.workers * 4
+    with multiprocessing.get_context("fork").Pool(args.workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(_score_chunk, (chunk,)))
+        while pending:
+            yield pending.popleft().get()
+
+
+def _read_chunks(
+    path: str, input_format: str, chunk_size: int
+) -> Iterator[List[Tuple[int, Union[str, Dict]]]]:
+    """(입력 줄 번호, 원본 줄 또는 CSV 행) 묶음 (빈 줄은 건너뛰고 번호도 매기지 않음)"""
+    with open(path, encoding="utf-8", newline="") as f:
+        records = csv.DictReader(f) if input_format == "csv" else (
+            line for line in f if line.strip()
+        )
+        chunk = []
+        for row, record in enumerate(records):
+            chunk.append((row, record))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _score_chunk(chunk: List[Tuple[int, Union[str, Dict]]]) -> Tuple[int, int, str]:
+    """(작업 프로세스) 묶음 하나를 계산해 (줄 수, 오류 줄 수, 출력 텍스트) 반환"""
+    entries = [(row, _parse_record(record)) for row, record in chunk]
+    items = score_items(entries, _snapshot)
+    errors = sum(1 for item in items if item.error is not None)
+    if _options["output_format"] == "csv":
+        return len(items), errors, _to_csv(items)
+    return len(items), errors, "".join(item.model_dump_json() + "\n" for item in items)
+
+
+def _parse_record(record: Union[str, Dict]) -> Union[PredictRequest, str]:
+    """입력 줄 → PredictRequest (증상 이름은 ID로 변환, 잘못된 줄은 오류 메시지)"""
+    defaults = {
+        "top_k": _options["top_k"],
+        "min_score": _options["min_score"],
+        "scorer": _options["scorer"],
+    }
+    try:
+        if isinstance(record, dict):
+            values = record.get("symptoms") or record.get("symptom_ids") or ""
+            data = {**defaults, "symptoms": [v.strip() for v in values.split(";") if v.strip()]}
+        else:
+            data = json.loads(record)
+            if isinstance(data, list):
+                data = {"symptoms": data}
+            if not isinstance(data, dict):
+                return "잘못된 요청 형식: 한 줄은 JSON 객체 또는 증상 목록이어야 합니다"
+            data = {**defaults, **data}
+    except (ValueError, AttributeError) as e:
+        return f"잘못된 요청 형식: {e}"
+
+    if "symptoms" in data:
+        symptoms = data.pop("symptoms")
+        if not isinstance(symptoms, list) or not all(
+            isinstance(value, (str, int)) and not isinstance(value, bool) for value in symptoms
+        ):
+            return "잘못된 요청 형식: symptoms는 증상 이름 또는 ID 목록이어야 합니다"
+        symptom_ids, unknown = [], []
+        for value in symptoms:
+            symptom_id = _resolve_symptom(value)
+            if symptom_id is None:
+                unknown.append(value)
+            else:
+                symptom_ids.append(symptom_id)
+        if unknown:
+            return f"존재하지 않는 증상: {unknown}"
+        data["symptom_ids"] = symptom_ids
+
+    try:
+        return PredictRequest(**data)
+    except (ValidationError, TypeError) as e:
+        return f"잘못된 요청 형식: {e}"
+
+
+def _resolve_symptom(value) -> Optional[int]:
+    """증상 이름 또는 ID(숫자/숫자 문자열) → 증상 ID"""
+    if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+        return int(value)
+    return _symptom_ids_by_name.get(value)
+
+
+def _to_csv(items: List[BatchPredictItem]) -> str:
+    lines = []
+    for item in items:
+        if item.result is None:
+            lines.append([item.index, "", "", "", "", "", "", item.error])
+            continue
+        for prediction in item.result.predictions:
+            lines.append([
+                item.index,
+                prediction.rank,
+                prediction.disease_id,
+                prediction.disease_name,
+                prediction.category,
+                prediction.probability,
+                ";".join(m.name for m in prediction.matched_symptoms),
+                "",
+            ])
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(lines)
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    main()
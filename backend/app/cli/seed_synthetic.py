@@ -0,0 +1,160 @@
+"""
+규모 테스트용 합성 카탈로그 생성
+
+    python -m app.cli.seed_synthetic --diseases 100000 --symptoms 5000 [--database-url URL]
+
+같은 seed와 인자로는 항상 같은 카탈로그가 만들어집니다.
+- 증상 인기도는 Zipf 분포 (순위 r의 증상이 선택될 가중치 1 / r^zipf)
+- 질병마다 증상 수는 [min-symptoms, max-symptoms]에서 균등하게 선택
+- 질병마다 처음 뽑힌 1~2개가 주요 증상 (연결 확률도 더 높음)
+
+대상 DB의 테이블을 지우고 다시 만든 뒤 Core executemany로 한 번에 적재합니다.
+(seed_data_extended.py처럼 객체마다 db.add + flush 하지 않음)
+"""
+import argparse
+import time
+from typing import Dict
+
+import numpy as np
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
+
+from app.database import SQLALCHEMY_DATABASE_URL, Base
+from app.models import Disease, DiseaseSymptom, Symptom
+
+CATEGORIES = [
+    "감염성질환", "근골격계질환", "기타질환", "내분비대사질환", "비뇨기질환",
+    "소화기질환", "신경계질환", "심혈관질환", "안과질환", "이비인후과질환",
+    "정신과질환", "피부질환", "호흡기질환",
+]
+
+INSERT_BATCH_SIZE = 50_000
+
+
+def generate_catalog(
+    bind: Engine,
+    diseases: int,
+    symptoms: int,
+    min_symptoms: int = 5,
+    max_symptoms: int = 15,
+    zipf: float = 1.1,
+    seed: int = 42,
+) -> Dict[str, int]:
+    """bind의 카탈로그 테이블을 합성 데이터로 다시 채우고 테이블별 행 수 반환"""
+    if not 1 <= min_symptoms <= max_symptoms:
+        raise ValueError("증상 수 범위가 올바르지 않습니다")
+    if max_symptoms > symptoms:
+        raise ValueError("질병당 최대 증상 수가 전체 증상 수보다 많습니다")
+
+    rng = np.random.default_rng(seed)
+
+    # 인기 순위를 증상 ID와 무관하게 섞어 ID 순서가 인기도를 드러내지 않도록 함
+    popularity = rng.permutation(symptoms) + 1
+    weights = 1.0 / np.arange(1, symptoms + 1) ** zipf
+    cdf = np.cumsum(weights) / weights.sum()
+
+    symptom_rows = [
+        {"id": i, "name": f"합성증상{i:06d}", "description": f"합성 증상 {i}"}
+        for i in range(1, symptoms + 1)
+    ]
+    categories = rng.integers(len(CATEGORIES), size=diseases)
+    disease_rows = [
+        {
+            "id": i + 1,
+            "name": f"합성질병{i + 1:07d}",
+            "description": f"합성 질병 {i + 1}",
+            "category": CATEGORIES[categories[i]],
+        }
+        for i in range(diseases)
+    ]
+
+    counts = rng.integers(min_symptoms, max_symptoms + 1, size=diseases)
+    links = []
+    link_id = 0
+    for disease_index, count in enumerate(counts.tolist()):
+        # 복원 추출한 후보에서 중복을 빼고 앞에서부터 count개 (모자라면 더 뽑음)
+        chosen: Dict[int, None] = {}
+        while len(chosen) < count:
+            draws = np.searchsorted(cdf, rng.random(count * 2), side="right")
+            for rank in draws.tolist():
+                chosen.setdefault(int(popularity[rank]))
+                if len(chosen) == count:
+                    break
+        primary_count = 1 if count < 4 else 2
+        probabilities = np.concatenate([
+            rng.uniform(0.6, 0.95, size=primary_count),
+            rng.uniform(0.1, 0.6, size=count - primary_count),
+        ]).round(2).tolist()
+        for position, symptom_id in enumerate(chosen):
+            link_id += 1
+            links.append({
+                "id": link_id,
+                "disease_id": disease_index + 1,
+                "symptom_id": symptom_id,
+                "probability": probabilities[position],
+                "is_primary": position < primary_count,
+            })
+
+    Base.metadata.drop_all(bind=bind)
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        if bind.dialect.name == "sqlite":
+            # 재생성한 DB를 한 번에 채우는 작업이므로 중간 fsync 생략
+            conn.execute(text("PRAGMA synchronous = OFF"))
+        for table, rows in (
+            (Symptom.__table__, symptom_rows),
+            (Disease.__table__, disease_rows),
+            (DiseaseSymptom.__table__, links),
+        ):
+            for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                conn.execute(insert(table), rows[start:start + INSERT_BATCH_SIZE])
+
+    return {
+        "symptoms": len(symptom_rows),
+        "diseases": len(disease_rows),
+        "disease_symptoms": len(links),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli.seed_synthetic", description="규모 테스트용 합성 카탈로그 생성"
+    )
+    parser.add_argument(
+        "--database-url", default=SQLALCHEMY_DATABASE_URL, help="대상 DB (기존 데이터 삭제)"
+    )
+    parser.add_argument("--diseases", type=int, default=1000, help="질병 수")
+    parser.add_argument("--symptoms", type=int, default=500, help="증상 수")
+    parser.add_argument("--min-symptoms", type=int, default=5, help="질병당 최소 증상 수")
+    parser.add_argument("--max-symptoms", type=int, default=15, help="질병당 최대 증상 수")
+    parser.add_argument("--zipf", type=float, default=1.1, help="증상 인기도 Zipf 지수")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    bind = create_engine(args.database_url)
+    started = time.perf_counter()
+    try:
+        counts = generate_catalog(
+            bind,
+            diseases=args.diseases,
+            symptoms=args.symptoms,
+            min_symptoms=args.min_symptoms,
+            max_symptoms=args.max_symptoms,
+            zipf=args.zipf,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        bind.dispose()
+
+    print("=" * 60)
+    print(f">> 증상: {counts['symptoms']:,}개")
+    print(f">> 질병: {counts['diseases']:,}개")
+    print(f">> 질병-증상 관계: {counts['disease_symptoms']:,}개")
+    print(f">> 소요 시간: {time.perf_counter() - started:.1f}초")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
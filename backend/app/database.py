@@ -1,14 +1,44 @@
+import functools
+from typing import Callable
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
+# 같은 DB 파일을 aiosqlite로 여는 비동기 경로 (모델은 동기 경로와 공유)
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./app.db"
+
+# 동기 라우트가 실행되는 anyio 스레드 풀 크기 (기본 스레드 제한기 토큰 수)
+THREADPOOL_SIZE = 40
+DB_POOL_SIZE = 20
 
+# 동기 라우트는 스레드 하나에 연결 하나이므로 스레드 풀 크기까지만 연결을 엶.
+# 세션은 엔드포인트가 끝나면 응답 직렬화 전에 닫으므로(release_session_before_response)
+# 직렬화용 스레드를 기다리는 동안 연결을 쥐고 있지 않음
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=DB_POOL_SIZE,
+    max_overflow=THREADPOOL_SIZE - DB_POOL_SIZE,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# aiosqlite 기본값(NullPool)은 세션마다 연결(+전용 스레드)을 새로 만들므로 풀을 사용.
+# aiosqlite 연결마다 전용 스레드가 생기므로 동기 엔진과 같은 상한을 둠
+# (상한에 닿으면 pool_timeout까지 연결 반환을 기다림)
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=THREADPOOL_SIZE - DB_POOL_SIZE,
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -18,3 +48,29 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def release_session_before_response(endpoint: Callable) -> Callable:
+    """
+    동기 엔드포인트가 반환하면 인자로 받은 세션을 바로 닫도록 감싼 함수
+
+    get_db의 정리 코드는 응답 직렬화가 끝난 뒤 실행되고, 동기 라우트의 직렬화는
+    스레드 풀의 다른 스레드에서 실행되므로 그동안 연결을 쥐고 있게 됩니다.
+    반환값은 닫기 전에 읽혀 있어야 합니다 (커밋 후에는 db.refresh).
+    """
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            for value in kwargs.values():
+                if isinstance(value, Session):
+                    value.close()
+
+    return wrapper
@@ -1,13 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import engine, Base
-from app.routers import examples, symptoms, diseases, prediction
+from app.database import async_engine, engine, Base, SessionLocal
+from app.middleware import MetricsMiddleware, ProfilingMiddleware
+from app.routers import examples, symptoms, diseases, prediction, metrics
+from app.services.catalog import get_catalog_snapshot
+from app.services.query_budget import (
+    QueryBudgetRoute,
+    query_budget,
+    query_budget_exceeded_handler,
+)
+from app.services.sql_stats import QueryBudgetExceeded, instrument_engine
 
 # 데이터베이스 테이블 생성
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Module 5 API", version="1.0.0")
+# 요청별 SQL 문장 수/시간 집계 (동기·비동기 엔진 모두)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 시작 시 컴파일된 카탈로그 산출물을 mmap (없거나 오래됐으면 다시 컴파일)
+    db = SessionLocal()
+    try:
+        get_catalog_snapshot(db)
+    finally:
+        db.close()
+    yield
+
+
+app = FastAPI(title="Module 5 API", version="1.0.0", lifespan=lifespan)
+app.router.route_class = QueryBudgetRoute
+
+# SQL 문장 예산 초과 (QUERY_BUDGET_MODE=enforce): 실행된 문장 목록과 함께 500
+app.add_exception_handler(QueryBudgetExceeded, query_budget_exceeded_handler)
 
 # CORS 설정
 app.add_middleware(
@@ -18,13 +48,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 단위 프로파일링 (PROFILE_TOKEN 값의 x-profile 헤더 또는 PROFILE_SAMPLE_RATE 확률)
+app.add_middleware(ProfilingMiddleware, routes=app.routes)
+
+# 요청 지표 (가장 바깥에서 CORS 처리까지 포함해 측정)
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
 # 라우터 등록
 app.include_router(examples.router)
 app.include_router(symptoms.router)
 app.include_router(diseases.router)
 app.include_router(prediction.router)
+app.include_router(metrics.router)
 
 
 @app.get("/api/health")
+@query_budget(0)
 def health_check():
     return {"status": "ok", "message": "FastAPI 서버가 정상 작동 중입니다."}
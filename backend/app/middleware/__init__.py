@@ -0,0 +1,4 @@
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+
+__all__ = ["MetricsMiddleware", "ProfilingMiddleware"]
@@ -0,0 +1,70 @@
+"""
+요청 지표 수집 미들웨어
+
+경로별 요청 수/응답 시간/상태 코드/처리 중인 요청 수와 요청마다 실행한 SQL 문장 수·시간을
+metrics_registry에 기록합니다. (/api/metrics에서 Prometheus 형식으로 조회)
+
+응답 본문을 감싸지 않는 순수 ASGI 미들웨어이므로 스트리밍 응답도 그대로 전달됩니다.
+"""
+import time
+from typing import List
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import MetricsRegistry, metrics_registry
+from app.services.sql_stats import track_sql
+
+# 어떤 라우트와도 맞지 않는 요청 (경로를 그대로 라벨로 쓰면 라벨 수가 무한히 늘어남)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(routes: List[BaseRoute], scope: Scope) -> str:
+    """요청이 맞는 라우트의 경로 템플릿 (예: /api/diseases/{disease_id}/symptoms)"""
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            # 경로는 맞지만 메서드가 다른 경우 (405)
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: List[BaseRoute],
+        registry: MetricsRegistry = metrics_registry,
+    ):
+        self.app = app
+        self.routes = routes
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.routes, scope)
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.registry.request_started(method, route)
+        started = time.perf_counter()
+        with track_sql() as sql:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                self.registry.request_finished(
+                    method, route, status_code, time.perf_counter() - started,
+                    sql.count, sql.seconds,
+                )
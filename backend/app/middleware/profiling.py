@@ -0,0 +1,126 @@
+"""
+요청 단위 프로파일링 미들웨어
+
+다음 경우에 그 요청 하나를 샘플링 프로파일러로 기록해 PROFILE_DIR에 저장합니다.
+- 요청 헤더 PROFILE_HEADER(기본 x-profile) 값이 PROFILE_TOKEN과 같을 때
+  (PROFILE_TOKEN이 비어 있으면(기본값) 헤더로는 프로파일하지 않음 - 아무 클라이언트나
+   프로파일러를 켜 응답을 늦추고 디스크를 채우지 못하도록)
+- PROFILE_SAMPLE_RATE(기본 0) 확률로 무작위 선택될 때
+
+프로파일한 요청의 응답에는 저장 파일 이름을 x-profile-id 헤더로 붙입니다.
+이미 다른 요청을 프로파일 중이면 그 요청은 프로파일하지 않습니다.
+프로파일하지 않는 요청의 비용은 헤더 목록 확인(과 샘플링 확률 사용 시 난수 하나)뿐입니다.
+"""
+import hmac
+import logging
+import os
+import random
+import time
+from typing import List, Optional
+
+import anyio
+from starlette.datastructures import MutableHeaders
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.metrics import route_template
+from app.services.profiler import (
+    PROFILE_DIR,
+    catalog_size,
+    finish_profile,
+    profile_name,
+    save_profile,
+    try_start_profile,
+)
+from app.services.sql_stats import current_sql_stats
+
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "x-profile")
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+PROFILE_ID_HEADER = "x-profile-id"
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: List[BaseRoute],
+        header: str = PROFILE_HEADER,
+        token: str = PROFILE_TOKEN,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        directory: str = PROFILE_DIR,
+    ):
+        self.app = app
+        self.routes = routes
+        # 헤더나 토큰이 빈 문자열이면 헤더로는 프로파일하지 않음
+        self.header = header.lower().encode("latin-1") if header and token else None
+        self.token = token.encode("latin-1")
+        self.sample_rate = sample_rate
+        self.directory = directory
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        profiler = try_start_profile() if trigger else None
+        if profiler is None:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.routes, scope)
+        name = profile_name(method, route)
+        status_code = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, name)
+            await send(message)
+
+        started_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            duration = time.perf_counter() - started
+            profile = finish_profile(profiler)
+            sql = current_sql_stats()
+            metadata = {
+                "method": method,
+                "route": route,
+                "path": scope["path"],
+                "status": status_code,
+                "trigger": trigger,
+                "started_at": started_at,
+                "duration_ms": round(duration * 1000, 3),
+                "sql_statements": sql.count if sql is not None else None,
+                "sql_ms": round(sql.seconds * 1000, 3) if sql is not None else None,
+            }
+            await anyio.to_thread.run_sync(self._save, profile, name, metadata)
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        """프로파일할 요청이면 계기("header"/"sampled"), 아니면 None"""
+        if self.header is not None:
+            for key, value in scope["headers"]:
+                if key == self.header:
+                    if hmac.compare_digest(value, self.token):
+                        return "header"
+                    break
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def _save(self, profile, name: str, metadata: dict) -> None:
+        metadata["catalog"] = catalog_size()
+        try:
+            path = save_profile(profile, name, metadata, self.directory)
+        except OSError:
+            logger.exception("프로파일 저장 실패: %s", name)
+            return
+        logger.info("프로파일 저장: %s (%.1fms)", path, metadata["duration_ms"])
@@ -2,5 +2,7 @@ from app.models.example import Example
 from app.models.symptom import Symptom
 from app.models.disease import Disease
 from app.models.disease_symptom import DiseaseSymptom
+from app.models.symptom_alias import SymptomAlias
+from app.models.catalog_version import CatalogVersion
 
-__all__ = ["Example", "Symptom", "Disease", "DiseaseSymptom"]
+__all__ = ["Example", "Symptom", "Disease", "DiseaseSymptom", "SymptomAlias", "CatalogVersion"]
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class CatalogVersion(Base):
+    """카탈로그(질병/증상/연결) 버전 - 쓰기마다 증가하는 단일 행"""
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -15,3 +15,5 @@ class Symptom(Base):
 
     # Many-to-Many relationship with Disease through DiseaseSymptom
     disease_symptoms = relationship("DiseaseSymptom", back_populates="symptom")
+    # 증상 삭제 시 다른 이름은 라우터에서 일괄 삭제 (하나씩 불러오지 않음)
+    aliases = relationship("SymptomAlias", back_populates="symptom", passive_deletes=True)
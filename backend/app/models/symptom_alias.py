@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class SymptomAlias(Base):
+    """증상의 다른 이름 (동의어·구어 표현, 예: 목이 아파 → 인후통) - 자유 텍스트 증상 추출용"""
+
+    __tablename__ = "symptom_aliases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symptom_id = Column(Integer, ForeignKey("symptoms.id", ondelete="CASCADE"), nullable=False, index=True)
+    alias = Column(String(100), nullable=False, unique=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    symptom = relationship("Symptom", back_populates="aliases")
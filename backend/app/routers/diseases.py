@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import Disease, Symptom, DiseaseSymptom
 from app.schemas import (
     DiseaseCreate,
@@ -12,33 +14,40 @@ from app.schemas import (
     DiseaseSymptomsBulkUpdate,
     SymptomInfo,
 )
+from app.services.catalog import notify_disease_changed
+from app.services.query_budget import QueryBudgetRoute, query_budget
 
-router = APIRouter(prefix="/api/diseases", tags=["diseases"])
+router = APIRouter(
+    prefix="/api/diseases", tags=["diseases"], route_class=QueryBudgetRoute
+)
 
 
 @router.get("/categories")
-def get_categories(db: Session = Depends(get_db)):
+@query_budget(1)
+async def get_categories(db: AsyncSession = Depends(get_async_db)):
     """질병 카테고리 목록 조회"""
-    categories = db.query(Disease.category).distinct().all()
+    categories = await db.execute(select(Disease.category).distinct())
     return {"categories": [c[0] for c in categories if c[0]]}
 
 
 @router.get("/", response_model=list[DiseaseResponse])
-def get_diseases(
+@query_budget(1)
+async def get_diseases(
     skip: int = 0,
     limit: int = 100,
     category: str | None = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """모든 질병 목록 조회 (카테고리 필터 옵션)"""
-    query = db.query(Disease)
+    query = select(Disease)
     if category:
-        query = query.filter(Disease.category == category)
-    diseases = query.offset(skip).limit(limit).all()
-    return diseases
+        query = query.where(Disease.category == category)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 
 @router.get("/{disease_id}", response_model=DiseaseResponse)
+@query_budget(1)
 def get_disease(disease_id: int, db: Session = Depends(get_db)):
     """특정 질병 조회"""
     disease = db.query(Disease).filter(Disease.id == disease_id).first()
@@ -48,6 +57,7 @@ def get_disease(disease_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=DiseaseResponse, status_code=201)
+@query_budget(9)
 def create_disease(disease: DiseaseCreate, db: Session = Depends(get_db)):
     """새로운 질병 생성"""
     # 중복 체크
@@ -58,11 +68,13 @@ def create_disease(disease: DiseaseCreate, db: Session = Depends(get_db)):
     db_disease = Disease(**disease.model_dump())
     db.add(db_disease)
     db.commit()
+    notify_disease_changed(db, db_disease.id)
     db.refresh(db_disease)
     return db_disease
 
 
 @router.put("/{disease_id}", response_model=DiseaseResponse)
+@query_budget(9)
 def update_disease(disease_id: int, disease: DiseaseUpdate, db: Session = Depends(get_db)):
     """질병 정보 수정"""
     db_disease = db.query(Disease).filter(Disease.id == disease_id).first()
@@ -80,11 +92,13 @@ def update_disease(disease_id: int, disease: DiseaseUpdate, db: Session = Depend
         setattr(db_disease, key, value)
 
     db.commit()
+    notify_disease_changed(db, disease_id)
     db.refresh(db_disease)
     return db_disease
 
 
 @router.delete("/{disease_id}")
+@query_budget(8)
 def delete_disease(disease_id: int, db: Session = Depends(get_db)):
     """질병 삭제"""
     disease = db.query(Disease).filter(Disease.id == disease_id).first()
@@ -93,6 +107,7 @@ def delete_disease(disease_id: int, db: Session = Depends(get_db)):
 
     db.delete(disease)
     db.commit()
+    notify_disease_changed(db, disease_id)
     return {"message": "질병이 성공적으로 삭제되었습니다"}
 
 
@@ -100,31 +115,37 @@ def delete_disease(disease_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{disease_id}/symptoms", response_model=DiseaseSymptomResponse)
-def get_disease_symptoms(disease_id: int, db: Session = Depends(get_db)):
+@query_budget(2)
+async def get_disease_symptoms(disease_id: int, db: AsyncSession = Depends(get_async_db)):
     """특정 질병의 모든 증상 조회"""
     # 질병 존재 확인
-    disease = db.query(Disease).filter(Disease.id == disease_id).first()
+    disease = await db.get(Disease, disease_id)
     if not disease:
         raise HTTPException(status_code=404, detail="질병을 찾을 수 없습니다")
 
-    # 질병-증상 연결 조회
-    disease_symptoms = (
-        db.query(DiseaseSymptom).filter(DiseaseSymptom.disease_id == disease_id).all()
+    # 질병-증상 연결과 증상 이름을 한 번에 조회 (삭제된 증상의 연결은 제외)
+    rows = await db.execute(
+        select(
+            DiseaseSymptom.symptom_id,
+            Symptom.name,
+            DiseaseSymptom.probability,
+            DiseaseSymptom.is_primary,
+        )
+        .join(Symptom, Symptom.id == DiseaseSymptom.symptom_id)
+        .where(DiseaseSymptom.disease_id == disease_id)
+        .order_by(DiseaseSymptom.id)
     )
 
     # 증상 정보 구성
-    symptom_infos = []
-    for ds in disease_symptoms:
-        symptom = db.query(Symptom).filter(Symptom.id == ds.symptom_id).first()
-        if symptom:
-            symptom_infos.append(
-                SymptomInfo(
-                    symptom_id=symptom.id,
-                    symptom_name=symptom.name,
-                    probability=ds.probability,
-                    is_primary=ds.is_primary,
-                )
-            )
+    symptom_infos = [
+        SymptomInfo(
+            symptom_id=row.symptom_id,
+            symptom_name=row.name,
+            probability=row.probability,
+            is_primary=row.is_primary,
+        )
+        for row in rows
+    ]
 
     return DiseaseSymptomResponse(
         disease_id=disease.id, disease_name=disease.name, symptoms=symptom_infos
@@ -132,6 +153,7 @@ def get_disease_symptoms(disease_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{disease_id}/symptoms", status_code=201)
+@query_budget(10)
 def add_disease_symptom(
     disease_id: int, symptom_data: DiseaseSymptomCreate, db: Session = Depends(get_db)
 ):
@@ -163,6 +185,7 @@ def add_disease_symptom(
         existing.probability = symptom_data.probability
         existing.is_primary = symptom_data.is_primary
         db.commit()
+        notify_disease_changed(db, disease_id)
         db.refresh(existing)
         return {
             "message": "질병-증상 연결이 업데이트되었습니다",
@@ -178,6 +201,7 @@ def add_disease_symptom(
         )
         db.add(new_ds)
         db.commit()
+        notify_disease_changed(db, disease_id)
         db.refresh(new_ds)
         return {
             "message": "질병-증상 연결이 생성되었습니다",
@@ -186,6 +210,7 @@ def add_disease_symptom(
 
 
 @router.delete("/{disease_id}/symptoms/{symptom_id}")
+@query_budget(7)
 def remove_disease_symptom(disease_id: int, symptom_id: int, db: Session = Depends(get_db)):
     """질병-증상 연결 해제"""
     # 연결 확인
@@ -203,10 +228,12 @@ def remove_disease_symptom(disease_id: int, symptom_id: int, db: Session = Depen
 
     db.delete(disease_symptom)
     db.commit()
+    notify_disease_changed(db, disease_id)
     return {"message": "질병-증상 연결이 성공적으로 해제되었습니다"}
 
 
 @router.put("/{disease_id}/symptoms/bulk")
+@query_budget(9)
 def bulk_update_disease_symptoms(
     disease_id: int, bulk_data: DiseaseSymptomsBulkUpdate, db: Session = Depends(get_db)
 ):
@@ -230,17 +257,23 @@ def bulk_update_disease_symptoms(
     # 기존 연결 모두 삭제
     db.query(DiseaseSymptom).filter(DiseaseSymptom.disease_id == disease_id).delete()
 
-    # 새 연결 생성
-    for symptom_data in bulk_data.symptoms:
-        new_ds = DiseaseSymptom(
-            disease_id=disease_id,
-            symptom_id=symptom_data.symptom_id,
-            probability=symptom_data.probability,
-            is_primary=symptom_data.is_primary,
+    # 새 연결 생성 (객체마다 INSERT하지 않고 executemany 한 번)
+    if bulk_data.symptoms:
+        db.execute(
+            insert(DiseaseSymptom),
+            [
+                {
+                    "disease_id": disease_id,
+                    "symptom_id": symptom_data.symptom_id,
+                    "probability": symptom_data.probability,
+                    "is_primary": symptom_data.is_primary,
+                }
+                for symptom_data in bulk_data.symptoms
+            ],
         )
-        db.add(new_ds)
 
     db.commit()
+    notify_disease_changed(db, disease_id)
     return {
         "message": f"{len(bulk_data.symptoms)}개의 증상이 질병에 연결되었습니다",
         "disease_id": disease_id,
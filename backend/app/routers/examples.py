@@ -4,16 +4,21 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import Example
 from app.schemas import ExampleCreate, ExampleResponse
+from app.services.query_budget import QueryBudgetRoute, query_budget
 
-router = APIRouter(prefix="/api/examples", tags=["examples"])
+router = APIRouter(
+    prefix="/api/examples", tags=["examples"], route_class=QueryBudgetRoute
+)
 
 
 @router.get("/", response_model=list[ExampleResponse])
+@query_budget(1)
 def get_examples(db: Session = Depends(get_db)):
     return db.query(Example).all()
 
 
 @router.get("/{example_id}", response_model=ExampleResponse)
+@query_budget(1)
 def get_example(example_id: int, db: Session = Depends(get_db)):
     example = db.query(Example).filter(Example.id == example_id).first()
     if not example:
@@ -22,6 +27,7 @@ def get_example(example_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=ExampleResponse)
+@query_budget(2)
 def create_example(example: ExampleCreate, db: Session = Depends(get_db)):
     db_example = Example(**example.model_dump())
     db.add(db_example)
@@ -31,6 +37,7 @@ def create_example(example: ExampleCreate, db: Session = Depends(get_db)):
 
 
 @router.delete("/{example_id}")
+@query_budget(2)
 def delete_example(example_id: int, db: Session = Depends(get_db)):
     example = db.query(Example).filter(Example.id == example_id).first()
     if not example:
@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import metrics_registry
+from app.services.query_budget import QueryBudgetRoute, query_budget
+
+router = APIRouter(
+    prefix="/api/metrics", tags=["metrics"], route_class=QueryBudgetRoute
+)
+
+# PlainTextResponse가 "; charset=utf-8"을 덧붙임
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+@router.get("", response_class=PlainTextResponse)
+@query_budget(0)
+async def get_metrics():
+    """
+    요청 지표 (Prometheus 텍스트 형식)
+
+    경로별 요청 수, 응답 시간 히스토그램, 처리 중인 요청 수, 상태 코드와
+    요청당 SQL 문장 수/DB 시간 히스토그램을 제공합니다.
+    (http_request_sql_statements가 늘어나면 N+1 쿼리 회귀를 의심)
+
+    스레드 풀이 밀려 있어도 수집이 지연되지 않도록 이벤트 루프에서 바로 응답합니다.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,142 +1,393 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Dict, List
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+from typing import AsyncIterator, List, Optional, Tuple, Union
 
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db, get_async_db
 from app.schemas.prediction import (
+    PredictOptions,
     PredictRequest,
     PredictResponse,
-    DiseasePredictor,
-    MatchedSymptom,
+    ExtractRequest,
+    ExtractedSymptomItem,
+    ExtractResponse,
+    PredictTextRequest,
+    PredictTextResponse,
+    RetrievalStats,
+    BatchPredictRequest,
+    BatchPredictResponse,
 )
-from app.models.symptom import Symptom
-from app.models.disease import Disease
-from app.models.disease_symptom import DiseaseSymptom
+from app.services.catalog import (
+    CatalogSnapshot,
+    check_index_consistency,
+    get_catalog_snapshot,
+    get_catalog_snapshot_async,
+)
+from app.services.extraction import ExtractedSymptom, symptom_extractors
+from app.services.prediction import (
+    build_response,
+    categories_error,
+    estimate_response_bytes,
+    score_items,
+    score_one,
+    scorer_error,
+)
+from app.services.prediction_cache import normalize_symptom_ids, prediction_cache
+from app.services.query_budget import QueryBudgetRoute, query_budget
+from app.services.scorers import DEFAULT_SCORER, resolve_scorer_name
 
-router = APIRouter(prefix="/api/predict", tags=["Prediction"])
+router = APIRouter(
+    prefix="/api/predict", tags=["Prediction"], route_class=QueryBudgetRoute
+)
+
+# 스트리밍 입력 한 줄의 최대 크기 (넘으면 해당 줄만 오류 처리하고 버림)
+_MAX_STREAM_LINE_BYTES = 64 * 1024
 
 
 @router.post("", response_model=PredictResponse)
-def predict_disease(request: PredictRequest, db: Session = Depends(get_db)):
+@query_budget(1)
+async def predict_disease(
+    request: PredictRequest,
+    explain: bool = Query(False, description="질병별 점수 계산 내역 포함 여부"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     입력된 증상들을 기반으로 질병을 예측합니다.
 
     ## 예측 알고리즘:
     1. 입력된 증상 ID 목록 검증
-    2. 모든 질병을 순회하면서:
-       - 해당 질병의 모든 증상들 가져오기
-       - 입력된 증상과 일치하는 증상들의 probability 평균 계산
+    2. 질병×증상 확률 희소 행렬(CSR)에서 입력된 증상 열만 합산하여 벡터 연산으로:
+       - 입력된 증상과 일치하는 질병별 증상들의 probability 평균 계산
        - 사용자 커버리지 = (일치하는 증상 수 / 입력된 증상 수)
        - 최종 점수 = (probability 평균) * (사용자 커버리지) * (1 + 일치 증상 수 * 0.1)
     3. 점수가 높은 순으로 정렬
-    4. 상위 3개 반환
+    4. 상위 top_k개 반환 (기본 3개, min_score 미만 제외)
+
+    같은 증상 세트(정렬·중복 제거 기준)의 결과는 LRU 캐시에서 바로 반환하며,
+    카탈로그가 변경되면 캐시가 비워집니다.
+
+    모든 계산은 요청 시작 시점의 카탈로그 스냅샷 한 세대에서 이루어지며,
+    응답의 catalog_generation으로 어느 세대에서 계산되었는지 알 수 있습니다.
+
+    pruning=true이면 질병별/증상별 점수 상한으로 대부분의 후보를 건너뛰는
+    top-k 검색을 사용하고, 응답의 retrieval_stats에 가지치기 통계를 담습니다.
+    (점수 상한은 heuristic 점수 기준이므로 다른 점수 방식과는 함께 쓸 수 없습니다.
+    benchmarks/bench_predict.py 측정으로는 벡터 연산 엔진보다 빠르지 않아 기본값은 false입니다.)
+
+    예측 색인은 질병 카테고리별 샤드로도 나뉘어 있어, categories를 지정하면
+    해당 카테고리 샤드만 계산하고(나머지 샤드는 통째로 건너뜀) 샤드별 결과를 병합해
+    전체 순위 기준 상위 top_k개를 반환합니다. (샤드별 점수가 전체 점수와 같은
+    heuristic 계열 점수 방식에서만 사용할 수 있습니다.)
+    include_category_counts=true이거나 categories를 지정하면 응답의 category_counts에
+    필터와 무관하게 카테고리별 일치 질병 수를 담습니다. (전체 질병에 대한 추가 계산이므로
+    요청하지 않으면 생략 - pruning/heuristic_lsh처럼 일부 질병만 계산하는 경로를 느리게 하지 않음)
+
+    scorer로 점수 계산 방식을 고를 수 있습니다 (생략하면 PREDICTION_SCORER 기본값).
+    - heuristic     : 위 2단계의 점수
+    - heuristic_lsh : MinHash/LSH로 고른 근사 후보만 heuristic 점수로 재계산 (매우 큰 카탈로그용)
+    - naive_bayes   : 입력 증상은 존재, 나머지 증상은 부재로 보는 나이브 베이즈 사후 확률
+
+    explain=true이면 각 예측 결과에 점수 계산 내역(score_breakdown)을 담습니다.
+    (naive_bayes는 커버리지/보너스 대신 로그 가능도와 정규화 상수)
+
+    비동기 경로: 카탈로그 버전 확인은 비동기 세션으로 하고, 캐시 적중은 이벤트 루프에서
+    바로 반환합니다. 캐시 미스의 점수 계산은 CPU 연산이므로 스레드 풀에서 수행해
+    큰 카탈로그에서도 같은 워커의 다른 요청을 막지 않습니다.
     """
     symptom_ids = request.symptom_ids
 
-    # 1. 입력된 증상 ID 검증
-    if not symptom_ids:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="symptom_ids는 비어있을 수 없습니다.",
-        )
+    # 1. 입력된 증상 ID 검증 (빈 목록은 PredictRequest 검증에서 422)
+    _check_options(request)
 
-    # 입력된 증상들이 실제 존재하는지 확인
-    existing_symptoms = db.query(Symptom).filter(Symptom.id.in_(symptom_ids)).all()
-    existing_symptom_ids = {symptom.id for symptom in existing_symptoms}
+    # 카탈로그 스냅샷 (잠금 없이 현재 세대를 잡고 끝까지 사용)
+    snapshot = await get_catalog_snapshot_async(db)
 
     # 존재하지 않는 증상 ID 체크
-    invalid_ids = set(symptom_ids) - existing_symptom_ids
+    invalid_ids = snapshot.index.missing_symptom_ids(symptom_ids)
     if invalid_ids:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"존재하지 않는 증상 ID: {list(invalid_ids)}",
         )
 
-    # 2. 모든 질병 가져오기
-    all_diseases = db.query(Disease).all()
-    total_diseases_checked = len(all_diseases)
+    return await _cached_predict(request, snapshot, explain)
+
+
+@router.post("/extract", response_model=ExtractResponse)
+@query_budget(1)
+async def extract_symptoms(request: ExtractRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    자유 텍스트 주호소에서 증상을 찾습니다. ("어제부터 고열이랑 기침, 목이 아파요" → 고열, 기침, 인후통)
+
+    증상 이름과 다른 이름(/api/symptoms/{id}/aliases)으로 만든 Aho–Corasick 자동자로
+    텍스트를 한 번 훑어 일치하는 증상과 입력 텍스트 기준 위치를 반환합니다.
+    공백·대소문자는 무시하고, 겹치는 일치는 먼저 시작하는 것(같으면 더 긴 것)만 남깁니다.
+    자동자는 카탈로그 스냅샷 세대가 바뀐 뒤 첫 요청에서 한 번만 다시 만듭니다.
+    """
+    snapshot = await get_catalog_snapshot_async(db)
+    matches = await _extract(request.text, snapshot)
+    return ExtractResponse(
+        symptom_ids=list(dict.fromkeys(match.symptom_id for match in matches)),
+        matches=[ExtractedSymptomItem(**match._asdict()) for match in matches],
+        catalog_generation=snapshot.generation,
+    )
+
+
+@router.post("/text", response_model=PredictTextResponse)
+@query_budget(1)
+async def predict_disease_from_text(
+    request: PredictTextRequest,
+    explain: bool = Query(False, description="질병별 점수 계산 내역 포함 여부"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    자유 텍스트 주호소로 질병을 예측합니다.
+
+    /extract와 같은 방법으로 텍스트에서 증상을 찾은 뒤(처음 나온 순서, 중복 제거)
+    그 증상 ID로 POST /api/predict와 같은 예측을 수행합니다 (같은 결과 캐시 사용).
+    증상을 하나도 찾지 못하면 400을 반환합니다.
+    """
+    _check_options(request)
+    snapshot = await get_catalog_snapshot_async(db)
+    matches = await _extract(request.text, snapshot)
+    symptom_ids = list(dict.fromkeys(match.symptom_id for match in matches))
+    if not symptom_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="텍스트에서 증상을 찾지 못했습니다.",
+        )
+
+    predict_request = PredictRequest(
+        symptom_ids=symptom_ids, **request.model_dump(exclude={"text"})
+    )
+    response = await _cached_predict(predict_request, snapshot, explain)
+    return PredictTextResponse(
+        **response.model_dump(),
+        extracted=[ExtractedSymptomItem(**match._asdict()) for match in matches],
+    )
+
+
+async def _extract(text: str, snapshot: CatalogSnapshot) -> List[ExtractedSymptom]:
+    """snapshot 세대 이후의 자동자로 찾은 증상 중 snapshot에 있는 것"""
+    extractor = await symptom_extractors.current_async(snapshot)
+    # 그 사이 더 새 세대로 만든 자동자면 이 스냅샷에서 삭제된 증상이 나올 수 있음
+    return [
+        match for match in extractor.extract(text) if match.symptom_id in snapshot.index.symptoms
+    ]
 
-    # 3. 각 질병별 예측 점수 계산
-    predictions: List[Dict] = []
 
-    for disease in all_diseases:
-        # 해당 질병의 모든 증상-확률 정보 가져오기
-        disease_symptom_relations = (
-            db.query(DiseaseSymptom)
-            .filter(DiseaseSymptom.disease_id == disease.id)
-            .all()
+def _check_options(request: PredictOptions) -> None:
+    """등록되지 않은 점수 방식이거나 pruning/categories를 쓸 수 없는 점수 방식이면 400"""
+    scorer = resolve_scorer_name(request.scorer)
+    error = scorer_error(scorer)
+    if error is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    if request.pruning and scorer != DEFAULT_SCORER:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"pruning은 {DEFAULT_SCORER} 점수 방식에서만 사용할 수 있습니다.",
         )
+    if request.categories is not None:
+        error = categories_error(request, scorer)
+        if error is not None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
+async def _cached_predict(
+    request: PredictRequest, snapshot: CatalogSnapshot, explain: bool = False
+) -> PredictResponse:
+    """결과 캐시를 거치는 단건 예측 (옵션·증상 ID는 검증된 상태, 캐시 미스는 스레드에서 계산)"""
+    symptom_ids = request.symptom_ids
+    scorer = resolve_scorer_name(request.scorer)
 
-        if not disease_symptom_relations:
-            # 증상이 없는 질병은 스킵
-            continue
-
-        # 일치하는 증상 찾기
-        matched_symptoms = []
-        matched_probabilities = []
-
-        for ds_relation in disease_symptom_relations:
-            if ds_relation.symptom_id in symptom_ids:
-                # 증상 정보 가져오기
-                symptom = db.query(Symptom).filter(Symptom.id == ds_relation.symptom_id).first()
-                matched_symptoms.append(
-                    MatchedSymptom(
-                        id=symptom.id,
-                        name=symptom.name,
-                        probability=ds_relation.probability,
-                    )
-                )
-                matched_probabilities.append(ds_relation.probability)
-
-        # 일치하는 증상이 없으면 스킵
-        if not matched_symptoms:
-            continue
-
-        # 최종 점수 계산
-        # 1. 입력한 증상 중 얼마나 이 질병과 일치하는가? (사용자 관점)
-        user_coverage = len(matched_symptoms) / len(symptom_ids)
-
-        # 2. 일치한 증상들의 평균 확률
-        avg_probability = sum(matched_probabilities) / len(matched_probabilities)
-
-        # 3. 일치한 증상 수에 따른 가중치 (많이 일치할수록 보너스)
-        match_count_bonus = 1 + len(matched_symptoms) * 0.1
-
-        # 4. 최종 점수
-        final_score = user_coverage * avg_probability * match_count_bonus
-
-        # 디버깅 로그
-        print(f"질병: {disease.name}")
-        print(f"  일치 증상: {len(matched_symptoms)}/{len(symptom_ids)}")
-        print(f"  사용자 커버리지: {user_coverage:.2f}")
-        print(f"  평균 확률: {avg_probability:.2f}")
-        print(f"  가중치 보너스: {match_count_bonus:.2f}")
-        print(f"  최종 점수: {final_score:.4f}")
-        print()
-
-        predictions.append(
-            {
-                "disease_id": disease.id,
-                "disease_name": disease.name,
-                "description": disease.description,
-                "category": disease.category,
-                "probability": round(final_score, 4),
-                "matched_symptoms": matched_symptoms,
-            }
+    # 정규화된 증상 세트 기준 결과 캐시 조회 (커버리지 계산을 위해 입력 개수도 키에 포함)
+    cache_key = (
+        normalize_symptom_ids(symptom_ids),
+        len(symptom_ids),
+        request.top_k,
+        request.min_score,
+        request.pruning,
+        scorer,
+        tuple(sorted(set(request.categories))) if request.categories is not None else None,
+        _wants_category_counts(request),
+        explain,
+    )
+    cached = prediction_cache.get(cache_key, snapshot.generation)
+    if cached is not None:
+        return cached
+
+    response = await anyio.to_thread.run_sync(_predict, request, snapshot, explain)
+    prediction_cache.put(
+        cache_key, response, estimate_response_bytes(response), snapshot.generation
+    )
+    return response
+
+
+def _predict(
+    request: PredictRequest, snapshot: CatalogSnapshot, explain: bool = False
+) -> PredictResponse:
+    """
+    캐시를 거치지 않는 단건 예측
+
+    pruning은 heuristic, categories는 샤드로 나눌 수 있는 점수 방식에서만 사용합니다
+    (categories_error로 사전 검증).
+    """
+    symptom_ids = request.symptom_ids
+    scorer = resolve_scorer_name(request.scorer)
+
+    if request.pruning:
+        # 2~4. 점수 상한으로 후보를 건너뛰며 상위 top_k개만 전체 점수 계산
+        top_predictions, stats = snapshot.retriever.search(
+            symptom_ids, request.top_k, request.min_score
         )
+        response = build_response(top_predictions, snapshot, explain)
+        response.retrieval_stats = RetrievalStats(**stats._asdict())
+    else:
+        # 2~4. 질병×증상 희소 행렬에서 입력 증상 열만 합산해 점수 계산 후 상위 top_k개 선택
+        # (categories가 있으면 해당 카테고리 샤드만 계산해 병합)
+        top_predictions = score_one(request, snapshot, scorer)
 
-    # 4. 점수 높은 순으로 정렬하고 상위 3개 선택
-    predictions.sort(key=lambda x: x["probability"], reverse=True)
-    top_predictions = predictions[:3]
+        # 5~6. 순위 추가 및 응답 생성
+        response = build_response(top_predictions, snapshot, explain, scorer)
 
-    # 5. 순위 추가
-    for rank, pred in enumerate(top_predictions, start=1):
-        pred["rank"] = rank
+    if _wants_category_counts(request):
+        response.category_counts = snapshot.category_shards.category_counts(symptom_ids)
+    return response
+
+
+def _wants_category_counts(request: PredictOptions) -> bool:
+    """카테고리별 일치 질병 수를 계산할 요청인지 (명시적 요청 또는 카테고리 필터)"""
+    return request.include_category_counts or request.categories is not None
+
+
+@router.post("/batch", response_model=BatchPredictResponse)
+@query_budget(1)
+def predict_disease_batch(request: BatchPredictRequest, db: Session = Depends(get_db)):
+    """
+    여러 증상 세트를 한 번에 예측합니다.
+
+    모든 요청을 희소 질의 행렬로 쌓아 질병 행렬과 한 번에 곱한 뒤
+    요청 순서대로 PredictResponse를 반환합니다.
+    존재하지 않는 증상 ID가 포함된 요청은 전체를 실패시키지 않고 해당 항목에만 error를 담습니다.
+    """
+    snapshot = get_catalog_snapshot(db)
+    items = score_items(list(enumerate(request.requests)), snapshot)
+    return BatchPredictResponse(results=items)
+
+
+@router.post("/stream")
+@query_budget(None)  # 마이크로 배치마다 카탈로그 버전 확인 - 입력 크기에 비례
+async def predict_disease_stream(
+    request: Request,
+    batch_size: int = Query(256, ge=1, le=1000, description="한 번에 점수를 계산할 요청 수"),
+):
+    """
+    NDJSON 스트리밍 일괄 예측
 
-    # 6. 응답 생성
-    result = PredictResponse(
-        predictions=[DiseasePredictor(**pred) for pred in top_predictions],
-        total_diseases_checked=total_diseases_checked,
+    요청 본문의 각 줄(PredictRequest JSON)을 읽는 대로 batch_size개씩 묶어 계산하고,
+    결과를 BatchPredictItem JSON 한 줄씩(application/x-ndjson) 입력 순서대로 내보냅니다.
+    - index: 빈 줄을 제외한 입력 줄 순서 (0부터)
+    - 형식이 잘못된 줄이나 존재하지 않는 증상 ID가 있는 줄은 해당 줄에만 error를 담음
+    한 묶음의 결과를 클라이언트가 받아 가야 다음 입력을 읽으므로(역압),
+    서버 메모리는 입력 크기와 무관하게 묶음 하나 분량으로 유지됩니다.
+    클라이언트는 입력을 보내는 동안 응답도 함께 읽어야 합니다 (benchmarks/bench_stream.py 참고).
+    묶음마다 그 시점의 카탈로그 스냅샷을 사용합니다 (결과의 catalog_generation 참고).
+    """
+    return _DuplexStreamingResponse(
+        _stream_predictions(request, batch_size), media_type="application/x-ndjson"
     )
 
-    return result
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    요청 본문을 읽으면서 응답을 내보내는 스트리밍 응답
+
+    StreamingResponse는 응답 중 연결 종료를 감지하려고 receive()를 계속 호출하는데,
+    그러면 아직 읽지 않은 요청 본문 조각을 가로채므로 응답 전송만 수행합니다.
+    (연결 종료는 요청 본문을 읽다가 ClientDisconnect로 감지)
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _stream_predictions(request: Request, batch_size: int) -> AsyncIterator[bytes]:
+    """입력 줄을 batch_size개씩 계산해 결과 NDJSON 묶음을 차례로 생성"""
+    batch: List[Tuple[int, Union[PredictRequest, str]]] = []
+    index = 0
+    try:
+        async for line in _ndjson_lines(request.stream()):
+            if line is not None and not line.strip():
+                continue
+            batch.append((index, _parse_stream_line(line)))
+            index += 1
+            if len(batch) >= batch_size:
+                yield await _score_stream_batch(batch)
+                batch = []
+    except ClientDisconnect:
+        return
+    if batch:
+        yield await _score_stream_batch(batch)
+
+
+async def _ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[bytes]]:
+    """본문 조각 → 줄 단위 (최대 길이를 넘은 줄은 None)"""
+    buffer = b""
+    oversized = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield None if oversized or len(line) > _MAX_STREAM_LINE_BYTES else line
+            oversized = False
+        if len(buffer) > _MAX_STREAM_LINE_BYTES:
+            oversized = True
+            buffer = b""
+    if buffer or oversized:
+        yield None if oversized or len(buffer) > _MAX_STREAM_LINE_BYTES else buffer
+
+
+def _parse_stream_line(line: Optional[bytes]) -> Union[PredictRequest, str]:
+    """입력 한 줄 → PredictRequest (잘못된 줄은 오류 메시지)"""
+    if line is None:
+        return f"요청 한 줄의 크기가 {_MAX_STREAM_LINE_BYTES} bytes를 넘습니다."
+    try:
+        return PredictRequest.model_validate_json(line)
+    except ValidationError as e:
+        error = e.errors(include_url=False)[0]
+        location = ".".join(str(part) for part in error["loc"])
+        detail = f"{location} {error['msg']}" if location else error["msg"]
+        return f"잘못된 요청 형식: {detail}"
+
+
+async def _score_stream_batch(batch: List[Tuple[int, Union[PredictRequest, str]]]) -> bytes:
+    """묶음 하나를 현재 스냅샷으로 계산해 NDJSON 바이트로 직렬화 (계산은 스레드에서)"""
+    async with AsyncSessionLocal() as db:
+        snapshot = await get_catalog_snapshot_async(db)
+
+    def score() -> bytes:
+        items = score_items(batch, snapshot)
+        return b"".join(item.model_dump_json().encode("utf-8") + b"\n" for item in items)
+
+    return await anyio.to_thread.run_sync(score)
+
+
+@router.get("/index/consistency")
+@query_budget(4)
+def check_prediction_index_consistency(db: Session = Depends(get_db)):
+    """증분 유지 중인 예측 색인을 DB 전체 재생성 결과와 비교"""
+    return check_index_consistency(db)
+
+
+@router.get("/cache/stats")
+@query_budget(0)
+def get_prediction_cache_stats():
+    """예측 결과 캐시 통계 (적중/미스/제거 횟수, 항목 수, 바이트 크기)"""
+    return prediction_cache.stats()
@@ -1,21 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import Symptom
-from app.schemas import SymptomCreate, SymptomUpdate, SymptomResponse
-
-router = APIRouter(prefix="/api/symptoms", tags=["symptoms"])
+from app.database import get_db, get_async_db
+from app.models import Symptom, SymptomAlias
+from app.schemas import (
+    SymptomCreate,
+    SymptomUpdate,
+    SymptomResponse,
+    SymptomSuggestion,
+    SymptomMatch,
+    SymptomAliasCreate,
+    SymptomAliasResponse,
+)
+from app.services.autocomplete import AUTOCOMPLETE_MAX_RESULTS
+from app.services.catalog import get_catalog_snapshot_async, notify_symptom_changed
+from app.services.fuzzy import FUZZY_MAX_RESULTS
+from app.services.query_budget import QueryBudgetRoute, query_budget
+
+router = APIRouter(
+    prefix="/api/symptoms", tags=["symptoms"], route_class=QueryBudgetRoute
+)
 
 
 @router.get("/", response_model=list[SymptomResponse])
-def get_symptoms(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@query_budget(1)
+async def get_symptoms(
+    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)
+):
     """모든 증상 목록 조회"""
-    symptoms = db.query(Symptom).offset(skip).limit(limit).all()
-    return symptoms
+    result = await db.execute(select(Symptom).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+# /{symptom_id}보다 먼저 선언해야 "autocomplete", "search"가 증상 ID로 해석되지 않음
+@router.get("/autocomplete", response_model=list[SymptomSuggestion])
+@query_budget(1)
+async def autocomplete_symptoms(
+    q: str = Query(..., max_length=100, description="증상 이름 접두사 또는 초성 (예: 두, ㄷㅌ)"),
+    limit: int = Query(10, ge=1, le=AUTOCOMPLETE_MAX_RESULTS, description="최대 제안 수"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    증상 이름 자동 완성
+
+    이름 또는 한글 초성이 q로 시작하는 증상을 연결된 질병 수가 많은 순으로 반환합니다.
+    (공백·대소문자 무시, "ㄷㅌ" → 두통)
+    카탈로그 스냅샷의 메모리 접두사 색인을 사용하며, 증상 생성/수정/삭제와
+    질병-증상 연결 변경은 다음 세대 스냅샷에 바로 반영됩니다.
+    """
+    snapshot = await get_catalog_snapshot_async(db)
+    return [
+        SymptomSuggestion(
+            id=suggestion.symptom_id,
+            name=suggestion.name,
+            disease_count=suggestion.disease_count,
+        )
+        for suggestion in snapshot.autocomplete.search(q, limit)
+    ]
+
+
+@router.get("/search", response_model=list[SymptomMatch])
+@query_budget(1)
+async def search_symptoms(
+    q: str = Query(..., max_length=100, description="증상 이름 (오타 허용, 예: 두퉁)"),
+    limit: int = Query(10, ge=1, le=FUZZY_MAX_RESULTS, description="최대 결과 수"),
+    min_similarity: float = Query(0.3, gt=0, le=1, description="최소 유사도"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    오타를 허용하는 증상 이름 검색
+
+    이름을 한글 자모로 풀어 만든 n-gram이 q와 많이 겹치는 증상을 유사도 순으로 반환합니다.
+    (공백·대소문자 무시, "두퉁" → 두통, "소화불랑" → 소화불량)
+    카탈로그 스냅샷의 메모리 n-gram 역색인을 사용하며, 증상 생성/수정/삭제는
+    다음 세대 스냅샷에 바로 반영됩니다.
+    """
+    snapshot = await get_catalog_snapshot_async(db)
+    return [
+        SymptomMatch(id=match.symptom_id, name=match.name, similarity=match.similarity)
+        for match in snapshot.fuzzy.search(q, limit, min_similarity)
+    ]
 
 
 @router.get("/{symptom_id}", response_model=SymptomResponse)
+@query_budget(1)
 def get_symptom(symptom_id: int, db: Session = Depends(get_db)):
     """특정 증상 조회"""
     symptom = db.query(Symptom).filter(Symptom.id == symptom_id).first()
@@ -25,6 +95,7 @@ def get_symptom(symptom_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=SymptomResponse, status_code=201)
+@query_budget(8)
 def create_symptom(symptom: SymptomCreate, db: Session = Depends(get_db)):
     """새로운 증상 생성"""
     # 중복 체크
@@ -35,11 +106,13 @@ def create_symptom(symptom: SymptomCreate, db: Session = Depends(get_db)):
     db_symptom = Symptom(**symptom.model_dump())
     db.add(db_symptom)
     db.commit()
+    notify_symptom_changed(db, db_symptom.id)
     db.refresh(db_symptom)
     return db_symptom
 
 
 @router.put("/{symptom_id}", response_model=SymptomResponse)
+@query_budget(8)
 def update_symptom(symptom_id: int, symptom: SymptomUpdate, db: Session = Depends(get_db)):
     """증상 정보 수정"""
     db_symptom = db.query(Symptom).filter(Symptom.id == symptom_id).first()
@@ -57,17 +130,83 @@ def update_symptom(symptom_id: int, symptom: SymptomUpdate, db: Session = Depend
         setattr(db_symptom, key, value)
 
     db.commit()
+    notify_symptom_changed(db, symptom_id)
     db.refresh(db_symptom)
     return db_symptom
 
 
 @router.delete("/{symptom_id}")
+@query_budget(8)
 def delete_symptom(symptom_id: int, db: Session = Depends(get_db)):
-    """증상 삭제"""
+    """증상 삭제 (다른 이름도 함께 삭제)"""
     symptom = db.query(Symptom).filter(Symptom.id == symptom_id).first()
     if not symptom:
         raise HTTPException(status_code=404, detail="증상을 찾을 수 없습니다")
 
+    db.query(SymptomAlias).filter(SymptomAlias.symptom_id == symptom_id).delete(
+        synchronize_session=False
+    )
     db.delete(symptom)
     db.commit()
+    notify_symptom_changed(db, symptom_id)
     return {"message": "증상이 성공적으로 삭제되었습니다"}
+
+
+@router.get("/{symptom_id}/aliases", response_model=list[SymptomAliasResponse])
+@query_budget(2)
+def get_symptom_aliases(symptom_id: int, db: Session = Depends(get_db)):
+    """증상의 다른 이름 목록 조회 (자유 텍스트 증상 추출에 사용)"""
+    symptom = db.query(Symptom).filter(Symptom.id == symptom_id).first()
+    if not symptom:
+        raise HTTPException(status_code=404, detail="증상을 찾을 수 없습니다")
+    return (
+        db.query(SymptomAlias)
+        .filter(SymptomAlias.symptom_id == symptom_id)
+        .order_by(SymptomAlias.id)
+        .all()
+    )
+
+
+@router.post("/{symptom_id}/aliases", response_model=SymptomAliasResponse, status_code=201)
+@query_budget(9)
+def create_symptom_alias(
+    symptom_id: int, alias: SymptomAliasCreate, db: Session = Depends(get_db)
+):
+    """증상의 다른 이름 추가 (예: 인후통 ← 목이 아파)"""
+    symptom = db.query(Symptom).filter(Symptom.id == symptom_id).first()
+    if not symptom:
+        raise HTTPException(status_code=404, detail="증상을 찾을 수 없습니다")
+
+    # 중복 체크 (다른 이름끼리, 증상 이름과)
+    existing = db.query(SymptomAlias).filter(SymptomAlias.alias == alias.alias).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="이미 존재하는 다른 이름입니다")
+    existing = db.query(Symptom).filter(Symptom.name == alias.alias).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="증상 이름과 같은 다른 이름은 추가할 수 없습니다")
+
+    db_alias = SymptomAlias(symptom_id=symptom_id, alias=alias.alias)
+    db.add(db_alias)
+    db.commit()
+    # 카탈로그 버전을 올려 증상 추출 자동자가 다음 요청에서 다시 만들어지도록 함
+    notify_symptom_changed(db, symptom_id)
+    db.refresh(db_alias)
+    return db_alias
+
+
+@router.delete("/{symptom_id}/aliases/{alias_id}")
+@query_budget(7)
+def delete_symptom_alias(symptom_id: int, alias_id: int, db: Session = Depends(get_db)):
+    """증상의 다른 이름 삭제"""
+    alias = (
+        db.query(SymptomAlias)
+        .filter(SymptomAlias.id == alias_id, SymptomAlias.symptom_id == symptom_id)
+        .first()
+    )
+    if not alias:
+        raise HTTPException(status_code=404, detail="다른 이름을 찾을 수 없습니다")
+
+    db.delete(alias)
+    db.commit()
+    notify_symptom_changed(db, symptom_id)
+    return {"message": "다른 이름이 성공적으로 삭제되었습니다"}
@@ -1,5 +1,13 @@
 from app.schemas.example import ExampleCreate, ExampleResponse
-from app.schemas.symptom import SymptomCreate, SymptomUpdate, SymptomResponse
+from app.schemas.symptom import (
+    SymptomCreate,
+    SymptomUpdate,
+    SymptomResponse,
+    SymptomSuggestion,
+    SymptomMatch,
+    SymptomAliasCreate,
+    SymptomAliasResponse,
+)
 from app.schemas.disease import DiseaseCreate, DiseaseUpdate, DiseaseResponse
 from app.schemas.disease_symptom import (
     DiseaseSymptomCreate,
@@ -10,8 +18,18 @@ from app.schemas.disease_symptom import (
 from app.schemas.prediction import (
     PredictRequest,
     PredictResponse,
+    ExtractRequest,
+    ExtractedSymptomItem,
+    ExtractResponse,
+    PredictTextRequest,
+    PredictTextResponse,
     DiseasePredictor,
     MatchedSymptom,
+    ScoreBreakdown,
+    RetrievalStats,
+    BatchPredictRequest,
+    BatchPredictItem,
+    BatchPredictResponse,
 )
 
 __all__ = [
@@ -20,6 +38,10 @@ __all__ = [
     "SymptomCreate",
     "SymptomUpdate",
     "SymptomResponse",
+    "SymptomSuggestion",
+    "SymptomMatch",
+    "SymptomAliasCreate",
+    "SymptomAliasResponse",
     "DiseaseCreate",
     "DiseaseUpdate",
     "DiseaseResponse",
@@ -29,6 +51,16 @@ __all__ = [
     "SymptomInfo",
     "PredictRequest",
     "PredictResponse",
+    "ExtractRequest",
+    "ExtractedSymptomItem",
+    "ExtractResponse",
+    "PredictTextRequest",
+    "PredictTextResponse",
     "DiseasePredictor",
     "MatchedSymptom",
+    "ScoreBreakdown",
+    "RetrievalStats",
+    "BatchPredictRequest",
+    "BatchPredictItem",
+    "BatchPredictResponse",
 ]
@@ -1,12 +1,66 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional
 
 
-class PredictRequest(BaseModel):
+class PredictOptions(BaseModel):
+    """예측 옵션 (증상 ID 예측과 텍스트 예측 공통)"""
+    top_k: int = Field(3, ge=1, le=100, description="반환할 최대 질병 수")
+    min_score: float = Field(0.0, ge=0.0, description="최소 예측 점수 (미만이면 제외)")
+    pruning: bool = Field(
+        False, description="점수 상한 기반 가지치기 top-k 검색 사용 여부 (단건 예측에만 적용)"
+    )
+    scorer: Optional[str] = Field(
+        None,
+        description="점수 계산 방식 (heuristic, heuristic_bitset, heuristic_lsh, naive_bayes / 생략하면 서버 기본값, 등록되지 않은 이름은 400)",
+    )
+    categories: Optional[List[str]] = Field(
+        None,
+        min_length=1,
+        description="예측 대상 질병 카테고리 (생략하면 전체 / naive_bayes·pruning과는 함께 쓸 수 없음)",
+    )
+    include_category_counts: bool = Field(
+        False,
+        description="응답에 카테고리별 일치 질병 수(category_counts) 포함 여부 (categories를 지정하면 항상 포함)",
+    )
+
+
+class PredictRequest(PredictOptions):
     """예측 요청 스키마"""
     symptom_ids: List[int] = Field(..., min_length=1, description="증상 ID 목록 (최소 1개)")
 
 
+class ExtractRequest(BaseModel):
+    """자유 텍스트 증상 추출 요청"""
+    text: str = Field(
+        ..., min_length=1, max_length=2000,
+        description="주호소 텍스트 (예: 어제부터 고열이랑 기침, 목이 아파요)",
+    )
+
+
+class ExtractedSymptomItem(BaseModel):
+    """텍스트에서 찾은 증상 (start:end는 입력 텍스트 기준 위치)"""
+    symptom_id: int
+    name: str = Field(..., description="증상 이름")
+    start: int = Field(..., ge=0, description="일치 시작 위치 (글자 단위)")
+    end: int = Field(..., ge=1, description="일치 끝 위치 (포함하지 않음)")
+    matched: str = Field(..., description="입력 텍스트에서 일치한 부분 (증상 이름 또는 다른 이름)")
+
+
+class ExtractResponse(BaseModel):
+    """자유 텍스트 증상 추출 응답"""
+    symptom_ids: List[int] = Field(..., description="찾은 증상 ID (처음 나온 순서, 중복 제거)")
+    matches: List[ExtractedSymptomItem] = Field(..., description="일치 목록 (텍스트 순서)")
+    catalog_generation: int = Field(..., ge=1, description="추출에 사용된 카탈로그 스냅샷 세대")
+
+
+class PredictTextRequest(PredictOptions):
+    """자유 텍스트 예측 요청 스키마"""
+    text: str = Field(
+        ..., min_length=1, max_length=2000,
+        description="주호소 텍스트 (증상을 추출한 뒤 예측)",
+    )
+
+
 class MatchedSymptom(BaseModel):
     """매칭된 증상 정보"""
     id: int
@@ -17,21 +71,96 @@ class MatchedSymptom(BaseModel):
         from_attributes = True
 
 
+class ScoreBreakdown(BaseModel):
+    """
+    질병별 점수 계산 내역 (explain=true 요청 시에만 포함)
+
+    heuristic 계열은 user_coverage/avg_probability/match_count_bonus,
+    naive_bayes는 log_likelihood/log_evidence를 담습니다 (final_score = exp(log_likelihood - log_evidence)).
+    """
+    matched_count: int = Field(..., ge=1, description="일치한 증상 수")
+    query_size: int = Field(..., ge=1, description="입력된 증상 수")
+    user_coverage: Optional[float] = Field(None, description="사용자 커버리지 (일치 수 / 입력 수)")
+    avg_probability: Optional[float] = Field(None, description="일치한 증상들의 평균 확률")
+    match_count_bonus: Optional[float] = Field(
+        None, description="일치 증상 수 가중치 (1 + 일치 수 * 0.1)"
+    )
+    final_score: float = Field(..., description="최종 점수 (반올림 전)")
+    log_likelihood: Optional[float] = Field(
+        None, description="로그 가능도 (naive_bayes 점수 방식에서만)"
+    )
+    log_evidence: Optional[float] = Field(
+        None, description="전체 질병 로그 가능도의 log-sum-exp (naive_bayes 사후 확률의 정규화 상수)"
+    )
+
+
 class DiseasePredictor(BaseModel):
     """질병 예측 결과"""
     disease_id: int
     disease_name: str
     description: str
     category: str = Field(..., description="질병 카테고리")
-    probability: float = Field(..., ge=0.0, le=1.0, description="최종 예측 확률")
+    probability: float = Field(
+        ..., ge=0.0, le=1.0, description="최종 예측 확률 (점수가 1.0을 넘으면 1.0, 순위는 원래 점수 기준)"
+    )
     rank: int = Field(..., ge=1, description="순위")
     matched_symptoms: List[MatchedSymptom] = Field(..., description="일치한 증상 목록")
+    score_breakdown: Optional[ScoreBreakdown] = Field(
+        None, description="점수 계산 내역 (explain=true 시)"
+    )
 
     class Config:
         from_attributes = True
 
 
+class RetrievalStats(BaseModel):
+    """가지치기 top-k 검색 통계"""
+    candidates: int = Field(..., ge=0, description="입력 증상과 하나 이상 일치하는 질병 수")
+    fully_scored: int = Field(..., ge=0, description="전체 점수를 계산한 질병 수")
+    pruned: int = Field(..., ge=0, description="점수 상한 검사로 제외된 질병 수")
+
+
 class PredictResponse(BaseModel):
     """예측 응답 스키마"""
-    predictions: List[DiseasePredictor] = Field(..., description="예측된 질병 목록 (상위 3개)")
+    predictions: List[DiseasePredictor] = Field(
+        ..., description="예측된 질병 목록 (상위 top_k개, 기본 3개)"
+    )
     total_diseases_checked: int = Field(..., ge=0, description="검사한 전체 질병 수")
+    catalog_generation: int = Field(..., ge=1, description="예측에 사용된 카탈로그 스냅샷 세대")
+    scorer: str = Field("heuristic", description="사용한 점수 계산 방식")
+    retrieval_stats: Optional[RetrievalStats] = Field(
+        None, description="가지치기 검색 통계 (pruning 사용 시)"
+    )
+    category_counts: Optional[Dict[str, int]] = Field(
+        None,
+        description=(
+            "카테고리별 입력 증상과 하나 이상 일치하는 질병 수 "
+            "(단건 예측에서 include_category_counts 또는 categories 지정 시, categories 필터와 무관)"
+        ),
+    )
+
+
+class PredictTextResponse(PredictResponse):
+    """자유 텍스트 예측 응답 스키마"""
+    extracted: List[ExtractedSymptomItem] = Field(
+        ..., description="텍스트에서 찾아 예측에 사용한 증상 (텍스트 순서)"
+    )
+
+
+class BatchPredictRequest(BaseModel):
+    """일괄 예측 요청 스키마"""
+    requests: List[PredictRequest] = Field(
+        ..., min_length=1, max_length=1000, description="예측 요청 목록 (최대 1000개)"
+    )
+
+
+class BatchPredictItem(BaseModel):
+    """일괄 예측 개별 결과 (result 또는 error 중 하나)"""
+    index: int = Field(..., ge=0, description="요청 목록 내 순서")
+    result: Optional[PredictResponse] = Field(None, description="예측 결과")
+    error: Optional[str] = Field(None, description="개별 요청 오류 메시지")
+
+
+class BatchPredictResponse(BaseModel):
+    """일괄 예측 응답 스키마"""
+    results: List[BatchPredictItem] = Field(..., description="요청 순서와 동일한 결과 목록")
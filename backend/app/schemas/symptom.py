@@ -21,3 +21,29 @@ class SymptomResponse(SymptomBase):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class SymptomAliasCreate(BaseModel):
+    alias: str = Field(..., min_length=1, max_length=100, description="증상의 다른 이름 (예: 목이 아파)")
+
+
+class SymptomAliasResponse(SymptomAliasCreate):
+    id: int
+    symptom_id: int
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class SymptomSuggestion(BaseModel):
+    """증상 자동 완성 제안"""
+    id: int
+    name: str
+    disease_count: int = Field(..., ge=0, description="이 증상과 연결된 서로 다른 질병 수 (정렬 기준)")
+
+
+class SymptomMatch(BaseModel):
+    """오타 허용 증상 검색 결과"""
+    id: int
+    name: str
+    similarity: float = Field(..., ge=0, le=1, description="자모 n-gram 다이스 유사도")
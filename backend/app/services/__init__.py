@@ -0,0 +1,147 @@
+from app.services.prediction_index import (
+    PredictionIndex,
+    Posting,
+    DiseaseLink,
+    DiseaseInfo,
+    ScoredDisease,
+)
+from app.services.sparse_engine import SparseScoringEngine
+from app.services.topk import PrunedTopKRetriever
+from app.services.naive_bayes import NaiveBayesScorer
+from app.services.bitset import SymptomBitsets, BitsetScorer
+from app.services.lsh import MinHashLSH, LshScorer
+from app.services.scorers import (
+    Scorer,
+    register_scorer,
+    available_scorers,
+    is_shardable,
+    create_scorer,
+)
+from app.services.category_shards import CategoryShards
+from app.services.autocomplete import SymptomAutocomplete, Suggestion
+from app.services.fuzzy import SymptomFuzzyIndex, FuzzyMatch
+from app.services.prediction_cache import (
+    PredictionCache,
+    normalize_symptom_ids,
+    prediction_cache,
+)
+from app.services.catalog_version import (
+    get_catalog_version,
+    get_catalog_version_async,
+    bump_catalog_version,
+)
+from app.services.catalog_artifact import (
+    CatalogArtifact,
+    ArtifactError,
+    compile_catalog,
+    open_artifact,
+    load_or_compile,
+)
+from app.services.catalog import (
+    CatalogSnapshot,
+    CatalogStore,
+    catalog_store,
+    get_catalog_snapshot,
+    get_catalog_snapshot_async,
+    notify_catalog_changed,
+    notify_disease_changed,
+    notify_symptom_changed,
+    check_index_consistency,
+)
+from app.services.extraction import (
+    AhoCorasick,
+    ExtractedSymptom,
+    SymptomExtractor,
+    SymptomExtractorCache,
+    load_aliases,
+    symptom_extractors,
+)
+from app.services.sql_stats import (
+    SqlStats,
+    current_sql_stats,
+    track_sql,
+    budget_exempt,
+    instrument_engine,
+    QueryBudgetExceeded,
+)
+from app.services.query_budget import QueryBudgetRoute, query_budget
+from app.services.prediction import (
+    build_response,
+    categories_error,
+    estimate_response_bytes,
+    score_items,
+    score_one,
+    scorer_error,
+)
+from app.services.metrics import MetricsRegistry, metrics_registry
+from app.services.profiler import Profile, SamplingProfiler, save_profile
+
+__all__ = [
+    "PredictionIndex",
+    "Posting",
+    "DiseaseLink",
+    "DiseaseInfo",
+    "ScoredDisease",
+    "SparseScoringEngine",
+    "PrunedTopKRetriever",
+    "NaiveBayesScorer",
+    "SymptomBitsets",
+    "BitsetScorer",
+    "MinHashLSH",
+    "LshScorer",
+    "Scorer",
+    "register_scorer",
+    "available_scorers",
+    "is_shardable",
+    "create_scorer",
+    "CategoryShards",
+    "SymptomAutocomplete",
+    "Suggestion",
+    "SymptomFuzzyIndex",
+    "FuzzyMatch",
+    "PredictionCache",
+    "normalize_symptom_ids",
+    "prediction_cache",
+    "get_catalog_version",
+    "get_catalog_version_async",
+    "bump_catalog_version",
+    "CatalogArtifact",
+    "ArtifactError",
+    "compile_catalog",
+    "open_artifact",
+    "load_or_compile",
+    "CatalogSnapshot",
+    "CatalogStore",
+    "catalog_store",
+    "get_catalog_snapshot",
+    "get_catalog_snapshot_async",
+    "notify_catalog_changed",
+    "notify_disease_changed",
+    "notify_symptom_changed",
+    "check_index_consistency",
+    "AhoCorasick",
+    "ExtractedSymptom",
+    "SymptomExtractor",
+    "SymptomExtractorCache",
+    "load_aliases",
+    "symptom_extractors",
+    "SqlStats",
+    "current_sql_stats",
+    "track_sql",
+    "budget_exempt",
+    "instrument_engine",
+    "QueryBudgetExceeded",
+    "QueryBudgetRoute",
+    "query_budget",
+    "build_response",
+    "categories_error",
+    "estimate_response_bytes",
+    "score_items",
+    "score_one",
+    "scorer_error",
+    "MetricsRegistry",
+    "metrics_registry",
+    "Profile",
+    "SamplingProfiler",
+    "save_profile",
+]
@@ -0,0 +1,173 @@
+"""증상 이름 자동 완성용 메모리 접두사 색인 (한글 초성 검색 포함)"""
+import heapq
+import os
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.services.prediction_index import PredictionIndex
+
+# 한 번에 반환할 수 있는 최대 제안 수
+AUTOCOMPLETE_MAX_RESULTS = int(os.getenv("AUTOCOMPLETE_MAX_RESULTS", "20"))
+
+# 일치 항목이 이보다 많은 접두사(짧은 접두사)는 상위 결과를 기억해 다음 조회에 재사용
+_MEMO_MIN_MATCHES = 64
+
+# 세대마다 바뀐 연결 질병 수를 따로 두다가 이보다 많아지면 공유 사전에 합쳐 새로 만듦
+_COUNT_PATCH_LIMIT = 256
+
+_CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+# 초성 하나에 딸린 음절 수 (중성 21 × 종성 28)
+_SYLLABLES_PER_CHOSUNG = 21 * 28
+# 접두사 범위의 끝 (모든 키 문자보다 뒤)
+_KEY_END = "\U0010ffff"
+
+
+class Suggestion(NamedTuple):
+    """자동 완성 제안 한 건"""
+    symptom_id: int
+    name: str
+    disease_count: int  # disease_symptoms에서 이 증상과 연결된 서로 다른 질병 수
+
+
+def normalize(text: str) -> str:
+    """비교용 정규화 (NFC 조합, 소문자, 공백 제거)"""
+    return "".join(unicodedata.normalize("NFC", text).lower().split())
+
+
+def chosung(text: str) -> str:
+    """한글 음절을 초성으로 바꾼 문자열 (그 외 문자는 그대로, 예: 두통 → ㄷㅌ)"""
+    return "".join(
+        _CHOSUNG[(ord(char) - _HANGUL_FIRST) // _SYLLABLES_PER_CHOSUNG]
+        if _HANGUL_FIRST <= ord(char) <= _HANGUL_LAST
+        else char
+        for char in text
+    )
+
+
+def _disease_count(postings) -> int:
+    """연결된 서로 다른 질병 수 (같은 질병·증상 연결이 여러 행이어도 한 번)"""
+    return len({posting.disease_id for posting in postings})
+
+
+def _keys(name: str) -> Tuple[str, ...]:
+    """증상 이름의 색인 키 (정규화된 이름, 한글이 있으면 초성 문자열)"""
+    key = normalize(name)
+    initials = chosung(key)
+    return (key,) if initials == key else (key, initials)
+
+
+class SymptomAutocomplete:
+    """
+    증상 이름 접두사 색인.
+
+    (키, 증상 ID)를 정렬한 배열 하나에 증상마다 정규화된 이름과 초성 문자열을 넣어 두고,
+    질의 접두사의 범위를 이진 탐색으로 찾습니다 ("ㄷㅌ" → 두통).
+    결과는 연결된 서로 다른 질병 수(많은 순) → 이름 → ID 순서입니다.
+
+    일치 항목이 많은 짧은 접두사는 상위 AUTOCOMPLETE_MAX_RESULTS개를 기억해 두므로
+    대부분의 조회는 이진 탐색 한 번과 목록 복사로 끝납니다.
+    카탈로그 변경은 clone() 후 refresh_*로 반영합니다 (copy-on-write, 원본은 그대로).
+    clone()은 키 배열과 질병 수 사전을 복사하지 않고 공유합니다.
+    - 키 배열(entries, _keys_by_id): 증상 이름이 바뀔 때(refresh_symptom) 처음 한 번 복사
+    - 질병 수: 공유 사전 + 세대별 변경분(최대 _COUNT_PATCH_LIMIT개, 넘으면 합쳐 새 사전)
+    따라서 질병 쓰기(refresh_disease_counts)는 영향받은 증상 수에 비례합니다.
+    """
+
+    def __init__(self, index: PredictionIndex):
+        self.index = index
+        self._keys_by_id: Dict[int, Tuple[str, ...]] = {
+            symptom_id: _keys(name) for symptom_id, name in index.symptoms.items()
+        }
+        self.entries: List[Tuple[str, int]] = sorted(
+            (key, symptom_id)
+            for symptom_id, keys in self._keys_by_id.items()
+            for key in keys
+        )
+        self._owns_entries = True
+        # 공유 사전 (다른 세대와 공유하므로 수정하지 않음)과 이 세대의 변경분 (0 = 연결 없음)
+        self._counts: Dict[int, int] = {
+            symptom_id: _disease_count(postings)
+            for symptom_id, postings in index.postings.items()
+        }
+        self._count_patch: Dict[int, int] = {}
+        self._memo: Dict[str, List[int]] = {}
+
+    def clone(self, index: PredictionIndex) -> "SymptomAutocomplete":
+        """새 세대 색인을 가리키는 복사본 (키 배열·질병 수는 공유, 기억해 둔 상위 결과는 버림)"""
+        clone = object.__new__(SymptomAutocomplete)
+        clone.index = index
+        clone._keys_by_id = self._keys_by_id
+        clone.entries = self.entries
+        clone._owns_entries = False
+        clone._counts = self._counts
+        clone._count_patch = dict(self._count_patch)
+        clone._memo = {}
+        return clone
+
+    def disease_count(self, symptom_id: int) -> int:
+        """증상과 연결된 서로 다른 질병 수"""
+        count = self._count_patch.get(symptom_id)
+        return self._counts.get(symptom_id, 0) if count is None else count
+
+    def refresh_symptom(self, symptom_id: int) -> None:
+        """증상 하나의 이름 변경/생성/삭제 반영 (index.symptoms 기준)"""
+        if not self._owns_entries:
+            self._keys_by_id = dict(self._keys_by_id)
+            self.entries = list(self.entries)
+            self._owns_entries = True
+        for key in self._keys_by_id.pop(symptom_id, ()):
+            position = bisect_left(self.entries, (key, symptom_id))
+            del self.entries[position]
+        name = self.index.symptoms.get(symptom_id)
+        if name is not None:
+            self._keys_by_id[symptom_id] = _keys(name)
+            for key in self._keys_by_id[symptom_id]:
+                insort(self.entries, (key, symptom_id))
+
+    def refresh_disease_counts(self, symptom_ids: Iterable[int]) -> None:
+        """연결이 바뀐 증상들의 연결 질병 수 반영 (index.postings 기준)"""
+        for symptom_id in symptom_ids:
+            self._count_patch[symptom_id] = _disease_count(
+                self.index.postings.get(symptom_id, ())
+            )
+        if len(self._count_patch) > _COUNT_PATCH_LIMIT:
+            counts = {**self._counts, **self._count_patch}
+            self._counts = {
+                symptom_id: count for symptom_id, count in counts.items() if count
+            }
+            self._count_patch = {}
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Suggestion]:
+        """이름 또는 초성이 query로 시작하는 증상 (연결 질병 수가 많은 순, 최대 limit개)"""
+        limit = min(limit or AUTOCOMPLETE_MAX_RESULTS, AUTOCOMPLETE_MAX_RESULTS)
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        top = self._memo.get(prefix)
+        if top is None:
+            start = bisect_left(self.entries, (prefix,))
+            end = bisect_left(self.entries, (prefix + _KEY_END,), start)
+            # 이름과 초성 키가 모두 일치하는 증상은 한 번만 (예: "a" → A형간염)
+            matched = dict.fromkeys(symptom_id for _, symptom_id in self.entries[start:end])
+            top = heapq.nsmallest(AUTOCOMPLETE_MAX_RESULTS, matched, key=self._rank)
+            if end - start >= _MEMO_MIN_MATCHES:
+                self._memo[prefix] = top
+
+        return [
+            Suggestion(
+                symptom_id,
+                self.index.symptoms[symptom_id],
+                self.disease_count(symptom_id),
+            )
+            for symptom_id in top[:limit]
+        ]
+
+    def _rank(self, symptom_id: int):
+        return (
+            -self.disease_count(symptom_id),
+            self.index.symptoms[symptom_id],
+            symptom_id,
+        )
@@ -0,0 +1,127 @@
+"""질병별 증상 집합을 고정 폭 비트셋(uint64 묶음)으로 보관하고 AND + popcount로 일치 수 계산"""
+from typing import List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from app.services.prediction_index import ScoredDisease
+from app.services.sparse_engine import SparseScoringEngine
+
+WORD_BITS = 64
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def _swar_popcount(words: np.ndarray) -> np.ndarray:
+    """uint64 배열의 원소별 1 비트 수 (np.bitwise_count가 없는 numpy 1.x용)"""
+    words = words - ((words >> np.uint64(1)) & _M1)
+    words = (words & _M2) + ((words >> np.uint64(2)) & _M2)
+    words = (words + (words >> np.uint64(4))) & _M4
+    return (words * _H01) >> np.uint64(56)
+
+
+popcount = getattr(np, "bitwise_count", _swar_popcount)
+
+
+class SymptomBitsets:
+    """
+    질병×증상 연결 여부를 질병마다 고정 폭 비트셋으로 보관하는 일치 수 계산기.
+
+    - 행: 질병 (engine.disease_ids 순서), 비트: 증상 열 번호 (engine.symptom_columns)
+    - words[w, row]의 (col % 64)번째 비트 = row 질병이 col 증상과 연결됨 (w = col // 64)
+    같은 단어의 질병들이 연속되도록 단어 우선으로 저장해, 질의가 걸친 단어마다
+    질병 수 길이의 AND + popcount 한 번으로 일치 수를 셉니다.
+
+    비트셋은 같은 증상의 중복 연결을 한 번으로만 표현하므로, 기존 점수 계산과 같도록
+    중복분(연결 수 - 1)만 작은 희소 행렬(duplicates)로 따로 더합니다.
+    """
+
+    def __init__(self, engine: SparseScoringEngine):
+        indicator = engine.indicator.tocsr()
+        indicator.sum_duplicates()
+        rows_count, cols_count = indicator.shape
+        self.rows = rows_count
+        self.word_count = (cols_count + WORD_BITS - 1) // WORD_BITS
+
+        rows = np.repeat(np.arange(rows_count, dtype=np.int64), np.diff(indicator.indptr))
+        cols = indicator.indices.astype(np.int64)
+        self.words = np.zeros((self.word_count, rows_count), dtype=np.uint64)
+        np.bitwise_or.at(
+            self.words,
+            (cols // WORD_BITS, rows),
+            np.left_shift(np.uint64(1), (cols % WORD_BITS).astype(np.uint64)),
+        )
+
+        repeated = indicator.data > 1
+        self.duplicates: Optional[sparse.csc_matrix] = None
+        if repeated.any():
+            self.duplicates = sparse.csc_matrix(
+                (indicator.data[repeated] - 1, (rows[repeated], cols[repeated])),
+                shape=indicator.shape,
+            )
+
+    @property
+    def nbytes(self) -> int:
+        size = self.words.nbytes
+        if self.duplicates is not None:
+            size += (
+                self.duplicates.data.nbytes
+                + self.duplicates.indices.nbytes
+                + self.duplicates.indptr.nbytes
+            )
+        return size
+
+    def query_mask(self, cols: np.ndarray):
+        """질의 열 번호 → (걸친 단어 번호, 단어별 비트마스크)"""
+        words = cols // WORD_BITS
+        order = np.argsort(words, kind="stable")
+        words, bits = words[order], np.left_shift(
+            np.uint64(1), (cols[order] % WORD_BITS).astype(np.uint64)
+        )
+        starts = np.flatnonzero(np.r_[True, words[1:] != words[:-1]])
+        return words[starts], np.bitwise_or.reduceat(bits, starts)
+
+    def match_counts(self, cols: np.ndarray) -> np.ndarray:
+        """질병별 일치 증상 수 (cols는 중복 없는 질의 열 번호)"""
+        counts = np.zeros(self.rows, dtype=np.int32)
+        if len(cols):
+            buffer = np.empty(self.rows, dtype=np.uint64)
+            for word, mask in zip(*self.query_mask(cols)):
+                np.bitwise_and(self.words[word], mask, out=buffer)
+                np.add(counts, popcount(buffer), out=counts, casting="unsafe")
+        counts = counts.astype(np.float64)
+        if self.duplicates is not None and len(cols):
+            counts += np.asarray(self.duplicates[:, cols].sum(axis=1)).ravel()
+        return counts
+
+
+class BitsetScorer:
+    """일치 수만 비트셋으로 세는 heuristic 점수 (확률 합과 순위는 SparseScoringEngine과 같음)"""
+
+    def __init__(self, engine: SparseScoringEngine):
+        self.engine = engine
+        self.bitsets = SymptomBitsets(engine)
+
+    def score(
+        self, symptom_ids: List[int], limit: Optional[int] = None, min_score: float = 0.0
+    ) -> List[ScoredDisease]:
+        return self.engine.score(
+            symptom_ids, limit, min_score, match_counts=self.bitsets.match_counts
+        )
+
+    def score_batch(
+        self,
+        queries: List[List[int]],
+        limits: Optional[List[Optional[int]]] = None,
+        min_scores: Optional[List[float]] = None,
+    ) -> List[List[ScoredDisease]]:
+        """질의별 score() (일괄 행렬 곱 대신 질의마다 비트셋 AND)"""
+        limits = limits or [None] * len(queries)
+        min_scores = min_scores or [0.0] * len(queries)
+        return [
+            self.score(symptom_ids, limit, min_score)
+            for symptom_ids, limit, min_score in zip(queries, limits, min_scores)
+        ]
@@ -0,0 +1,451 @@
+"""버전 관리되는 카탈로그 스냅샷과 변경 알림 (copy-on-write + 원자적 교체)"""
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import anyio
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.services.autocomplete import SymptomAutocomplete
+from app.services.catalog_artifact import CATALOG_ARTIFACT_PATH, load_or_compile
+from app.services.catalog_version import (
+    bump_catalog_version,
+    get_catalog_version,
+    get_catalog_version_async,
+)
+from app.services.category_shards import CategoryShards
+from app.services.fuzzy import SymptomFuzzyIndex
+from app.services.prediction_cache import prediction_cache
+from app.services.prediction_index import PredictionIndex
+from app.services.scorers import Scorer, create_scorer
+from app.services.sparse_engine import SparseScoringEngine
+from app.services.sql_stats import budget_exempt
+from app.services.topk import PrunedTopKRetriever
+
+# 다른 워커(프로세스)의 카탈로그 쓰기를 확인하는 간격(초)
+CATALOG_VERSION_CHECK_INTERVAL = float(os.getenv("CATALOG_VERSION_CHECK_INTERVAL", "1.0"))
+
+
+class CatalogSnapshot:
+    """
+    한 세대(generation)의 불변 카탈로그 스냅샷.
+
+    예측 색인과 그로부터 파생되는 점수 엔진/top-k 검색기/점수 계산 방식/카테고리 샤드/
+    증상 자동 완성 색인/오타 허용 검색 색인을 묶어서 보관합니다.
+    파생 구조는 처음 사용할 때 한 번만 생성되며, 이후 스냅샷 내용은 바뀌지 않으므로
+    읽는 쪽은 잠금 없이 참조를 잡고 사용하면 됩니다.
+
+    symptom_generation은 증상(이름)·다른 이름이 마지막으로 바뀐 세대입니다.
+    질병·연결 쓰기는 이전 세대 값을 이어받으므로, 증상 추출 자동자처럼 증상 쪽에만
+    의존하는 구조는 이 값이 바뀔 때만 다시 만들면 됩니다.
+    """
+
+    def __init__(
+        self,
+        generation: int,
+        index: PredictionIndex,
+        engine: Optional[SparseScoringEngine] = None,
+        retriever: Optional[PrunedTopKRetriever] = None,
+        catalog_version: Optional[int] = None,
+        autocomplete: Optional[SymptomAutocomplete] = None,
+        fuzzy: Optional[SymptomFuzzyIndex] = None,
+        symptom_generation: Optional[int] = None,
+    ):
+        self.generation = generation
+        self.symptom_generation = generation if symptom_generation is None else symptom_generation
+        self.catalog_version = catalog_version
+        self.index = index
+        self._engine = engine
+        self._retriever = retriever
+        self._autocomplete = autocomplete
+        self._fuzzy = fuzzy
+        self._scorers: Dict[str, Scorer] = {}
+        self._category_shards: Optional[CategoryShards] = None
+        self._lock = threading.Lock()
+        # scorer 생성 중 engine을 만들 수 있으므로 _lock과 분리
+        self._scorer_lock = threading.Lock()
+
+    @property
+    def engine(self) -> SparseScoringEngine:
+        engine = self._engine
+        if engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = SparseScoringEngine(self.index)
+                engine = self._engine
+        return engine
+
+    @property
+    def retriever(self) -> PrunedTopKRetriever:
+        retriever = self._retriever
+        if retriever is None:
+            with self._lock:
+                if self._retriever is None:
+                    self._retriever = PrunedTopKRetriever(self.index)
+                retriever = self._retriever
+        return retriever
+
+    @property
+    def autocomplete(self) -> SymptomAutocomplete:
+        autocomplete = self._autocomplete
+        if autocomplete is None:
+            with self._lock:
+                if self._autocomplete is None:
+                    self._autocomplete = SymptomAutocomplete(self.index)
+                autocomplete = self._autocomplete
+        return autocomplete
+
+    @property
+    def fuzzy(self) -> SymptomFuzzyIndex:
+        fuzzy = self._fuzzy
+        if fuzzy is None:
+            with self._lock:
+                if self._fuzzy is None:
+                    self._fuzzy = SymptomFuzzyIndex(self.index)
+                fuzzy = self._fuzzy
+        return fuzzy
+
+    def scorer(self, name: str) -> Scorer:
+        """이름으로 등록된 점수 계산 방식 (스냅샷마다 처음 사용할 때 생성)"""
+        scorer = self._scorers.get(name)
+        if scorer is None:
+            with self._scorer_lock:
+                scorer = self._scorers.get(name)
+                if scorer is None:
+                    scorer = self._scorers[name] = create_scorer(name, self.engine)
+        return scorer
+
+    @property
+    def category_shards(self) -> CategoryShards:
+        """카테고리 샤드 (점수 방식과 무관하게 스냅샷마다 하나, 처음 사용할 때 생성)"""
+        shards = self._category_shards
+        if shards is None:
+            # engine 생성이 _lock을 쓰므로 _scorer_lock으로 보호
+            with self._scorer_lock:
+                if self._category_shards is None:
+                    self._category_shards = CategoryShards(self.engine, create_scorer)
+                shards = self._category_shards
+        return shards
+
+
+class CatalogStore:
+    """
+    현재 카탈로그 스냅샷 보관소.
+
+    - 읽기: current()로 스냅샷 참조를 가져옴 (잠금 없음)
+    - 쓰기: 현재 세대를 복제해 변경분만 반영한 다음 세대를 만들고, 참조 한 번으로 교체
+    쓰기끼리는 _write_lock으로 직렬화되며 진행 중인 읽기는 이전 세대를 끝까지 사용합니다.
+
+    첫 세대는 컴파일된 카탈로그 산출물(mmap)에서 불러오고, 산출물 경로가 비어 있으면
+    DB에서 직접 생성합니다. 다른 워커의 쓰기는 DB의 카탈로그 버전으로 감지해
+    check_interval초마다 한 번 확인하고, 버전이 다르면 새로 불러옵니다.
+    """
+
+    def __init__(
+        self,
+        artifact_path: Optional[str] = CATALOG_ARTIFACT_PATH,
+        check_interval: float = CATALOG_VERSION_CHECK_INTERVAL,
+    ):
+        self._current: Optional[CatalogSnapshot] = None
+        self._generation = 0
+        self._write_lock = threading.Lock()
+        self.artifact_path = artifact_path
+        self.check_interval = check_interval
+        self._checked_at = 0.0
+
+    def current(self, db: Session) -> CatalogSnapshot:
+        """현재 스냅샷 반환 (없거나 다른 워커가 카탈로그를 바꿨으면 새로 불러와 게시)"""
+        snapshot = self._current
+        if snapshot is None or self._check_due():
+            with self._write_lock:
+                snapshot = self._current
+                if snapshot is None:
+                    self._load(db)
+                elif self._check_due():
+                    if get_catalog_version(db) != snapshot.catalog_version:
+                        self._load(db)
+                        prediction_cache.clear()
+                    self._checked_at = time.monotonic()
+                snapshot = self._current
+        return snapshot
+
+    async def current_async(self, db: AsyncSession) -> CatalogSnapshot:
+        """
+        비동기 경로용 current()
+
+        버전 확인은 비동기 세션으로 하고, 새로 불러와야 할 때만
+        스레드에서 동기 세션으로 current()를 실행해 이벤트 루프를 막지 않습니다.
+        """
+        snapshot = self._current
+        if snapshot is not None and not self._check_due():
+            return snapshot
+        if snapshot is not None:
+            if await get_catalog_version_async(db) == snapshot.catalog_version:
+                self._checked_at = time.monotonic()
+                return snapshot
+        return await anyio.to_thread.run_sync(self._current_in_new_session)
+
+    def _current_in_new_session(self) -> CatalogSnapshot:
+        # 다시 불러오는 경로 전체(버전 재확인 포함)는 요청의 SQL 예산에서 제외
+        db = SessionLocal()
+        try:
+            with budget_exempt():
+                return self.current(db)
+        finally:
+            db.close()
+
+    def _check_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.check_interval
+
+    def peek(self) -> Optional[CatalogSnapshot]:
+        """이미 게시된 스냅샷 반환 (없으면 None, 새로 생성하지 않음)"""
+        return self._current
+
+    def _load(self, db: Session) -> None:
+        """카탈로그 전체를 불러와 새 세대로 게시 (_write_lock 안에서 호출)"""
+        # 어느 요청에서 일어날지 정해져 있지 않으므로 요청의 SQL 예산에서 제외
+        with budget_exempt():
+            self._load_catalog(db)
+        self._checked_at = time.monotonic()
+
+    def _load_catalog(self, db: Session) -> None:
+        if self.artifact_path:
+            artifact = load_or_compile(db, self.artifact_path)
+            index = artifact.build_index()
+            self._publish(
+                index, artifact.build_engine(index), catalog_version=artifact.catalog_version
+            )
+        else:
+            catalog_version = get_catalog_version(db)
+            self._publish(PredictionIndex.build(db), catalog_version=catalog_version)
+
+    def _publish(
+        self,
+        index: PredictionIndex,
+        engine: Optional[SparseScoringEngine] = None,
+        retriever: Optional[PrunedTopKRetriever] = None,
+        catalog_version: Optional[int] = None,
+        autocomplete: Optional[SymptomAutocomplete] = None,
+        fuzzy: Optional[SymptomFuzzyIndex] = None,
+        symptom_generation: Optional[int] = None,
+    ) -> None:
+        """새 세대 게시 (symptom_generation: 증상 쪽이 그대로면 이전 값, None이면 이 세대)"""
+        self._generation += 1
+        self._current = CatalogSnapshot(
+            self._generation,
+            index,
+            engine,
+            retriever,
+            catalog_version,
+            autocomplete,
+            fuzzy,
+            symptom_generation,
+        )
+
+    def invalidate(self) -> None:
+        """현재 스냅샷 폐기: 다음 읽기에서 DB로부터 새 세대를 생성"""
+        with self._write_lock:
+            self._current = None
+
+    def apply_disease_change(
+        self, db: Session, disease_id: int, catalog_version: Optional[int] = None
+    ) -> None:
+        """
+        질병 하나의 변경분만 반영한 다음 세대 게시
+
+        catalog_version은 이 쓰기로 올라간 DB 카탈로그 버전입니다.
+        점수 계산 방식(scorer)과 카테고리 샤드는 변경분을 반영하지 않고,
+        새 세대에서 처음 사용할 때 갱신된 엔진으로 다시 만듭니다.
+        """
+        with self._write_lock:
+            previous = self._current
+            if previous is None:
+                return
+            index = previous.index.clone()
+            affected = index.refresh_disease(db, disease_id)
+
+            engine = previous._engine
+            if engine is not None:
+                engine = engine.clone(index)
+                engine.refresh_disease(disease_id)
+            retriever = previous._retriever
+            if retriever is not None:
+                retriever = retriever.clone(index)
+                retriever.refresh_disease(disease_id, affected)
+            autocomplete = previous._autocomplete
+            if autocomplete is not None:
+                autocomplete = autocomplete.clone(index)
+                autocomplete.refresh_disease_counts(affected)
+            fuzzy = previous._fuzzy
+            if fuzzy is not None:
+                fuzzy = fuzzy.clone(index)
+
+            self._publish(
+                index,
+                engine,
+                retriever,
+                _next_version(previous.catalog_version, catalog_version),
+                autocomplete,
+                fuzzy,
+                # 증상·다른 이름은 그대로
+                previous.symptom_generation,
+            )
+
+    def apply_symptom_change(
+        self, db: Session, symptom_id: int, catalog_version: Optional[int] = None
+    ) -> None:
+        """
+        증상 하나의 변경분만 반영한 다음 세대 게시
+
+        catalog_version은 이 쓰기로 올라간 DB 카탈로그 버전입니다.
+        """
+        with self._write_lock:
+            previous = self._current
+            if previous is None:
+                return
+            index = previous.index.clone()
+            index.refresh_symptom(db, symptom_id)
+
+            engine = previous._engine
+            if engine is not None:
+                engine = engine.clone(index)
+                engine.refresh_symptom(symptom_id)
+            retriever = previous._retriever
+            if retriever is not None:
+                retriever = retriever.clone(index)
+            autocomplete = previous._autocomplete
+            if autocomplete is not None:
+                autocomplete = autocomplete.clone(index)
+                autocomplete.refresh_symptom(symptom_id)
+            fuzzy = previous._fuzzy
+            if fuzzy is not None:
+                fuzzy = fuzzy.clone(index)
+                fuzzy.refresh_symptom(symptom_id)
+
+            self._publish(
+                index,
+                engine,
+                retriever,
+                _next_version(previous.catalog_version, catalog_version),
+                autocomplete,
+                fuzzy,
+            )
+
+
+def _next_version(previous: Optional[int], bumped: Optional[int]) -> Optional[int]:
+    """
+    변경분 반영 후 스냅샷의 카탈로그 버전
+
+    이 쓰기 직전 버전에서 이어진 경우에만 올라간 버전을 기록합니다.
+    그 사이 다른 워커의 쓰기가 있었다면 이전 버전을 유지해 다음 확인 때 전체를 다시 불러옵니다.
+    """
+    if previous is not None and bumped is not None and bumped == previous + 1:
+        return bumped
+    return previous
+
+
+catalog_store = CatalogStore()
+
+
+def get_catalog_snapshot(db: Session) -> CatalogSnapshot:
+    """현재 카탈로그 스냅샷 반환 (최초 요청 시 DB에서 생성)"""
+    return catalog_store.current(db)
+
+
+async def get_catalog_snapshot_async(db: AsyncSession) -> CatalogSnapshot:
+    """비동기 경로용 get_catalog_snapshot"""
+    return await catalog_store.current_async(db)
+
+
+def notify_catalog_changed() -> None:
+    """카탈로그 전체가 바뀐 경우 호출: 스냅샷과 결과 캐시 무효화"""
+    catalog_store.invalidate()
+    prediction_cache.clear()
+
+
+def notify_disease_changed(db: Session, disease_id: int) -> None:
+    """
+    질병 또는 그 증상 연결의 쓰기 트랜잭션 커밋 후 호출
+
+    DB 카탈로그 버전을 올리고(다른 워커와 컴파일된 산출물이 변경을 감지하도록)
+    해당 질병의 변경분만 반영한 새 세대를 게시한 뒤 결과 캐시를 비웁니다.
+    """
+    catalog_version = bump_catalog_version(db)
+    catalog_store.apply_disease_change(db, disease_id, catalog_version)
+    prediction_cache.clear()
+
+
+def notify_symptom_changed(db: Session, symptom_id: int) -> None:
+    """증상 쓰기 트랜잭션 커밋 후 호출: 카탈로그 버전을 올리고 변경분만 반영한 새 세대를 게시"""
+    catalog_version = bump_catalog_version(db)
+    catalog_store.apply_symptom_change(db, symptom_id, catalog_version)
+    prediction_cache.clear()
+
+
+def check_index_consistency(db: Session) -> Dict:
+    """현재 스냅샷의 색인과 파생 구조를 DB 전체 재생성 결과와 비교"""
+    snapshot = catalog_store.peek()
+    if snapshot is None:
+        return {"built": False, "consistent": True, "differences": []}
+
+    fresh = PredictionIndex.build(db)
+    differences: List[str] = snapshot.index.diff(fresh)
+
+    if snapshot._engine is not None:
+        current = snapshot._engine.entries()
+        expected = SparseScoringEngine(fresh).entries()
+        for key in sorted(current.keys() | expected.keys()):
+            if not math.isclose(current.get(key, 0.0), expected.get(key, 0.0)):
+                differences.append(
+                    f"matrix[{key}]: {current.get(key)!r} != {expected.get(key)!r}"
+                )
+        # 증분 갱신된 열 슬라이싱용 CSC 사본이 CSR 행렬과 같은지
+        engine = snapshot._engine
+        for name, by_disease, by_symptom in (
+            ("matrix", engine.matrix, engine._matrix_by_symptom),
+            ("indicator", engine.indicator, engine._indicator_by_symptom),
+        ):
+            if by_symptom.shape != by_disease.shape or (by_symptom != by_disease.tocsc()).nnz:
+                differences.append(f"{name} CSC 사본 불일치")
+
+    if snapshot._retriever is not None:
+        expected_retriever = PrunedTopKRetriever(fresh)
+        for name in ("terms", "disease_bounds"):
+            mine = getattr(snapshot._retriever, name)
+            theirs = getattr(expected_retriever, name)
+            for key in sorted(mine.keys() | theirs.keys()):
+                if mine.get(key) != theirs.get(key):
+                    differences.append(f"{name}[{key}] 불일치")
+
+    if snapshot._autocomplete is not None:
+        expected_autocomplete = SymptomAutocomplete(fresh)
+        if snapshot._autocomplete.entries != expected_autocomplete.entries:
+            differences.append("autocomplete.entries 불일치")
+        mine, theirs = snapshot._autocomplete, expected_autocomplete
+        for key in sorted(snapshot.index.postings.keys() | fresh.postings.keys()):
+            if mine.disease_count(key) != theirs.disease_count(key):
+                differences.append(f"autocomplete.disease_counts[{key}] 불일치")
+
+    if snapshot._fuzzy is not None:
+        expected_fuzzy = SymptomFuzzyIndex(fresh, snapshot._fuzzy.n)
+        mine, theirs = snapshot._fuzzy.postings, expected_fuzzy.postings
+        for gram in sorted(mine.keys() | theirs.keys()):
+            if not np.array_equal(mine.get(gram, ()), theirs.get(gram, ())):
+                differences.append(f"fuzzy.postings[{gram!r}] 불일치")
+        # 삭제로 생긴 뒤쪽 빈 칸(0)은 무시하고 비교
+        if not np.array_equal(
+            np.trim_zeros(snapshot._fuzzy.sizes, "b"), np.trim_zeros(expected_fuzzy.sizes, "b")
+        ):
+            differences.append("fuzzy.sizes 불일치")
+
+    return {
+        "built": True,
+        "generation": snapshot.generation,
+        "consistent": not differences,
+        "differences": differences,
+    }
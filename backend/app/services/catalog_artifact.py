@@ -0,0 +1,470 @@
+"""
+컴파일된 카탈로그 산출물 (mmap으로 여러 워커가 같은 물리 페이지를 공유)
+
+diseases / symptoms / disease_symptoms 테이블을 연속 배열, 오프셋, 문자열 테이블로
+직렬화한 바이너리 파일입니다. 각 워커는 파일을 읽기 전용으로 mmap하고 점수 계산 행렬과
+예측 색인(질병, 연결, 포스팅)을 복사 없이 그 위에 올리므로, 워커 수가 늘어도 카탈로그 메모리는
+페이지 캐시에 한 벌만 존재합니다. 질병/연결/포스팅 객체는 조회한 행(상위 결과)만 그때그때 만듭니다.
+
+파일 구성:
+- 헤더: 매직, 포맷 버전, 카탈로그 버전, 본문 크기, 본문 SHA-256, 섹션 수
+- 본문: 섹션 테이블(이름, dtype, 오프셋, 길이) + 8바이트 정렬된 배열들
+카탈로그 버전이 DB와 다르거나 체크섬이 맞지 않으면 사용하지 않고 다시 컴파일합니다.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from app.services.catalog_version import get_catalog_version
+from app.services.prediction_index import (
+    DiseaseInfo,
+    DiseaseLink,
+    Posting,
+    PredictionIndex,
+)
+from app.services.sparse_engine import SparseScoringEngine
+
+logger = logging.getLogger(__name__)
+
+# 빈 값이면 산출물을 쓰지 않고 DB에서 직접 색인을 생성
+CATALOG_ARTIFACT_PATH = os.getenv("CATALOG_ARTIFACT_PATH", "./catalog.artifact")
+
+MAGIC = b"DXCATLG\x00"
+FORMAT_VERSION = 2
+
+# 매직, 포맷 버전, 예약, 카탈로그 버전, 본문 크기, 본문 SHA-256, 섹션 수, 예약
+_HEADER = struct.Struct("<8sIIqQ32sII")
+# 섹션 이름, dtype 문자열, 본문 내 오프셋, 원소 수
+_SECTION = struct.Struct("<24s8sQQ")
+_ALIGN = 8
+
+# 문자열 테이블 배치: 질병 i → 3i(이름), 3i+1(설명), 3i+2(카테고리), 증상 j → 3D+j(이름)
+_DISEASE_FIELDS = 3
+
+# 점수 행렬 섹션 접두사 → SparseScoringEngine 속성
+_MATRICES = {
+    "matrix": "matrix",
+    "indicator": "indicator",
+    "matrix_csc": "_matrix_by_symptom",
+    "indicator_csc": "_indicator_by_symptom",
+}
+
+
+class ArtifactError(Exception):
+    """산출물을 사용할 수 없음 (없음, 손상, 포맷/카탈로그 버전 불일치)"""
+
+
+class CatalogArtifact:
+    """
+    mmap으로 연 컴파일된 카탈로그.
+
+    arrays의 각 배열은 mmap 버퍼를 직접 가리키는 읽기 전용 뷰입니다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        catalog_version: int,
+        buffer: mmap.mmap,
+        arrays: Dict[str, np.ndarray],
+    ):
+        self.path = path
+        self.catalog_version = catalog_version
+        self.arrays = arrays
+        self._buffer = buffer
+
+    @property
+    def size(self) -> int:
+        return len(self._buffer)
+
+    def _strings(self, position: int, count: int = 1) -> List[str]:
+        """문자열 테이블의 position번째부터 count개 문자열"""
+        offsets = self.arrays["string_offsets"][position:position + count + 1].tolist()
+        blob = self.arrays["strings"][offsets[0]:offsets[-1]].tobytes()
+        base = offsets[0]
+        return [
+            blob[start - base:end - base].decode("utf-8")
+            for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def build_index(self) -> PredictionIndex:
+        """
+        배열 위의 예측 색인 (DB 조회 없음)
+
+        증상 이름만 사전으로 복원하고(자동완성·오타 교정·추출기가 전체를 순회),
+        질병/연결/포스팅은 mmap 배열을 가리키는 _ArrayTable로 조회할 때만 객체를 만듭니다.
+        """
+        arrays = self.arrays
+        symptom_ids = arrays["symptom_ids"].tolist()
+        names = self._strings(_DISEASE_FIELDS * len(arrays["disease_ids"]), len(symptom_ids))
+        symptoms = dict(zip(symptom_ids, names))
+        return PredictionIndex(
+            _DiseaseTable(self),
+            symptoms,
+            _PostingTable(self),
+            _DiseaseLinkTable(self),
+        )
+
+    def build_engine(self, index: PredictionIndex) -> SparseScoringEngine:
+        """mmap 배열을 그대로 사용하는 점수 계산 엔진 생성"""
+        arrays = self.arrays
+        shape = (len(arrays["disease_ids"]), len(arrays["symptom_ids"]))
+        matrices = {}
+        for prefix in _MATRICES:
+            matrix_type = sparse.csc_matrix if prefix.endswith("_csc") else sparse.csr_matrix
+            matrices[prefix] = matrix_type(
+                (
+                    arrays[f"{prefix}_data"],
+                    arrays[f"{prefix}_indices"],
+                    arrays[f"{prefix}_indptr"],
+                ),
+                shape=shape,
+                copy=False,
+            )
+        return SparseScoringEngine.from_matrices(
+            index,
+            arrays["disease_ids"],
+            arrays["symptom_ids"],
+            matrices["matrix"],
+            matrices["indicator"],
+            matrices["matrix_csc"],
+            matrices["indicator_csc"],
+        )
+
+
+_DELETED = object()
+_MISSING = object()
+
+
+class _ArrayTable(MutableMapping):
+    """
+    정렬된 키 배열(mmap) 위의 사전 + 이 세대의 변경분 (PredictionIndex의 diseases 등)
+
+    indptr이 주어지면 keys[i]의 값은 [indptr[i], indptr[i + 1]) 구간이고, 빈 구간의 키는 없는 것으로 봅니다.
+    값은 조회할 때마다 배열에서 만들고 보관하지 않으므로 워커 힙에는 변경분만 남습니다.
+    refresh_*의 쓰기는 _changes에만 기록되고, copy()는 배열을 공유하고 변경분만 복사합니다.
+    """
+
+    def __init__(self, artifact: CatalogArtifact, keys: np.ndarray, indptr=None):
+        self._artifact = artifact
+        self._keys = keys
+        self._indptr = indptr
+        self._changes: Dict[int, object] = {}  # 키 → 새 값 또는 _DELETED
+        self._size = (
+            len(keys) if indptr is None else int(np.count_nonzero(np.diff(indptr)))
+        )
+
+    def _row(self, key) -> Optional[int]:
+        """배열에 값이 있는 키의 행 번호 (없으면 None)"""
+        row = int(self._keys.searchsorted(key))
+        if row == len(self._keys) or self._keys[row] != key:
+            return None
+        if self._indptr is not None and self._indptr[row] == self._indptr[row + 1]:
+            return None
+        return row
+
+    def _value(self, row: int):
+        raise NotImplementedError
+
+    def __getitem__(self, key):
+        value = self._changes.get(key, _MISSING)
+        if value is _DELETED:
+            raise KeyError(key)
+        if value is not _MISSING:
+            return value
+        row = self._row(key)
+        if row is None:
+            raise KeyError(key)
+        return self._value(row)
+
+    def __contains__(self, key) -> bool:
+        value = self._changes.get(key, _MISSING)
+        if value is not _MISSING:
+            return value is not _DELETED
+        return self._row(key) is not None
+
+    def __setitem__(self, key, value) -> None:
+        if key not in self:
+            self._size += 1
+        self._changes[key] = value
+
+    def __delitem__(self, key) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._size -= 1
+        if self._row(key) is None:
+            del self._changes[key]
+        else:
+            self._changes[key] = _DELETED
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        # 사전과 같은 순서: 배열의 키(ID 오름차순) → 이 세대에 새로 추가된 키
+        keys = self._keys
+        if self._indptr is not None:
+            keys = keys[np.diff(self._indptr) > 0]
+        changes = self._changes
+        for key in keys.tolist():
+            if changes.get(key) is not _DELETED:
+                yield key
+        for key, value in list(changes.items()):
+            if value is not _DELETED and self._row(key) is None:
+                yield key
+
+    def copy(self) -> "_ArrayTable":
+        table = object.__new__(type(self))
+        table.__dict__.update(self.__dict__)
+        table._changes = dict(self._changes)
+        return table
+
+
+class _DiseaseTable(_ArrayTable):
+    """질병 ID → DiseaseInfo (문자열 테이블에서 조회할 때 디코딩)"""
+
+    def __init__(self, artifact: CatalogArtifact):
+        super().__init__(artifact, artifact.arrays["disease_ids"])
+
+    def _value(self, row: int) -> DiseaseInfo:
+        return DiseaseInfo(
+            int(self._keys[row]), *self._artifact._strings(_DISEASE_FIELDS * row, _DISEASE_FIELDS)
+        )
+
+
+class _DiseaseLinkTable(_ArrayTable):
+    """질병 ID → [DiseaseLink] (link_* 배열의 질병 행 구간, 연결 ID 순서)"""
+
+    def __init__(self, artifact: CatalogArtifact):
+        arrays = artifact.arrays
+        super().__init__(artifact, arrays["disease_ids"], arrays["link_indptr"])
+
+    def _value(self, row: int) -> List[DiseaseLink]:
+        arrays = self._artifact.arrays
+        links = slice(int(self._indptr[row]), int(self._indptr[row + 1]))
+        return [
+            DiseaseLink(*fields)
+            for fields in zip(
+                arrays["link_ids"][links].tolist(),
+                arrays["link_symptom_ids"][links].tolist(),
+                arrays["link_probabilities"][links].tolist(),
+                arrays["link_is_primary"][links].astype(bool).tolist(),
+            )
+        ]
+
+
+class _PostingTable(_ArrayTable):
+    """증상 ID → [Posting] (posting_order로 link_* 배열을 증상별·연결 ID 순서로 조회)"""
+
+    def __init__(self, artifact: CatalogArtifact):
+        arrays = artifact.arrays
+        super().__init__(artifact, arrays["posting_symptom_ids"], arrays["posting_indptr"])
+
+    def _value(self, row: int) -> List[Posting]:
+        arrays = self._artifact.arrays
+        links = arrays["posting_order"][int(self._indptr[row]):int(self._indptr[row + 1])]
+        # 연결 위치 → 질병 행 (link_indptr 구간 탐색)
+        rows = np.searchsorted(arrays["link_indptr"], links, side="right") - 1
+        return [
+            Posting(*fields)
+            for fields in zip(
+                arrays["disease_ids"][rows].tolist(),
+                arrays["link_probabilities"][links].tolist(),
+                arrays["link_is_primary"][links].astype(bool).tolist(),
+                arrays["link_ids"][links].tolist(),
+            )
+        ]
+
+
+def compile_catalog(db: Session, path: str) -> int:
+    """
+    DB 카탈로그를 산출물 파일로 컴파일하고 기록한 카탈로그 버전 반환
+
+    버전을 먼저 읽고 색인을 만들므로, 도중에 쓰기가 있었다면 산출물 버전이
+    DB보다 낮아져 다음 확인 때 다시 컴파일됩니다.
+    임시 파일에 쓴 뒤 rename으로 교체하므로 이미 mmap한 워커는 이전 파일을 계속 사용합니다.
+    """
+    catalog_version = get_catalog_version(db)
+    index = PredictionIndex.build(db)
+    engine = SparseScoringEngine(index)
+
+    strings: List[str] = []
+    for info in index.diseases.values():
+        strings.extend((info.name, info.description or "", info.category or ""))
+    strings.extend(index.symptoms.values())
+    encoded = [s.encode("utf-8") for s in strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=string_offsets[1:])
+
+    # 연결은 질병 행 순서로 이어 붙이고 질병별 시작 위치를 link_indptr에 기록
+    link_counts = [len(index.disease_links.get(d, ())) for d in index.diseases]
+    link_indptr = np.zeros(len(index.diseases) + 1, dtype=np.int64)
+    np.cumsum(link_counts, out=link_indptr[1:])
+    links = [link for d in index.diseases for link in index.disease_links.get(d, ())]
+    link_ids = _column(links, "link_id", np.int64)
+    link_symptom_ids = _column(links, "symptom_id", np.int64)
+
+    # 포스팅: 연결 위치를 (증상 ID, 연결 ID) 순서로 정렬하고 증상별 시작 위치를 posting_indptr에 기록
+    posting_order = np.lexsort((link_ids, link_symptom_ids))
+    posting_symptom_ids, posting_counts = np.unique(
+        link_symptom_ids[posting_order], return_counts=True
+    )
+    posting_indptr = np.zeros(len(posting_symptom_ids) + 1, dtype=np.int64)
+    np.cumsum(posting_counts, out=posting_indptr[1:])
+
+    sections: List[Tuple[str, np.ndarray]] = [
+        ("disease_ids", engine.disease_ids.astype(np.int64)),
+        ("symptom_ids", engine.symptom_ids()),
+        ("string_offsets", string_offsets),
+        ("strings", np.frombuffer(b"".join(encoded), dtype=np.uint8)),
+        ("link_indptr", link_indptr),
+        ("link_ids", link_ids),
+        ("link_symptom_ids", link_symptom_ids),
+        ("link_probabilities", _column(links, "probability", np.float64)),
+        ("link_is_primary", _column(links, "is_primary", np.uint8)),
+        ("posting_symptom_ids", posting_symptom_ids),
+        ("posting_indptr", posting_indptr),
+        ("posting_order", posting_order.astype(np.int64)),
+    ]
+    for prefix, attribute in _MATRICES.items():
+        matrix = getattr(engine, attribute)
+        matrix.sort_indices()
+        sections.extend(
+            (
+                (f"{prefix}_indptr", matrix.indptr),
+                (f"{prefix}_indices", matrix.indices),
+                (f"{prefix}_data", matrix.data),
+            )
+        )
+
+    payload = _pack_sections(sections)
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        catalog_version,
+        len(payload),
+        hashlib.sha256(payload).digest(),
+        len(sections),
+        0,
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".catalog-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return catalog_version
+
+
+def _column(links: List[DiseaseLink], field: str, dtype) -> np.ndarray:
+    return np.fromiter((getattr(link, field) for link in links), dtype=dtype, count=len(links))
+
+
+def _pack_sections(sections: List[Tuple[str, np.ndarray]]) -> bytes:
+    """섹션 테이블 + 정렬된 배열 데이터를 본문 바이트로 직렬화"""
+    table_size = _SECTION.size * len(sections)
+    offset = _aligned(table_size)
+    table, chunks = [], []
+    for name, array in sections:
+        array = np.ascontiguousarray(array)
+        dtype = array.dtype.newbyteorder("<") if array.dtype.byteorder == ">" else array.dtype
+        table.append(
+            _SECTION.pack(name.encode("ascii"), dtype.str.encode("ascii"), offset, len(array))
+        )
+        data = array.astype(dtype, copy=False).tobytes()
+        padding = _aligned(len(data)) - len(data)
+        chunks.append(data + b"\x00" * padding)
+        offset += len(data) + padding
+
+    head = b"".join(table)
+    return head + b"\x00" * (_aligned(table_size) - table_size) + b"".join(chunks)
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def open_artifact(path: str, expected_version: Optional[int] = None) -> CatalogArtifact:
+    """
+    산출물을 읽기 전용으로 mmap하고 헤더/체크섬 검증
+
+    expected_version이 주어지면 헤더의 카탈로그 버전과 일치해야 합니다.
+    사용할 수 없으면 ArtifactError를 발생시킵니다.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"산출물을 열 수 없음: {e}") from e
+
+    if len(buffer) < _HEADER.size:
+        raise ArtifactError("헤더가 잘린 산출물")
+    (
+        magic,
+        format_version,
+        _,
+        catalog_version,
+        payload_size,
+        checksum,
+        section_count,
+        _,
+    ) = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ArtifactError("카탈로그 산출물 파일이 아님")
+    if format_version != FORMAT_VERSION:
+        raise ArtifactError(f"포맷 버전 불일치: {format_version} != {FORMAT_VERSION}")
+    if expected_version is not None and catalog_version != expected_version:
+        raise ArtifactError(f"카탈로그 버전 불일치: {catalog_version} != {expected_version}")
+    if len(buffer) != _HEADER.size + payload_size:
+        raise ArtifactError("본문 크기 불일치")
+
+    payload = memoryview(buffer)[_HEADER.size:]
+    try:
+        if hashlib.sha256(payload).digest() != checksum:
+            raise ArtifactError("체크섬 불일치")
+
+        arrays: Dict[str, np.ndarray] = {}
+        for i in range(section_count):
+            name, dtype, offset, count = _SECTION.unpack_from(payload, i * _SECTION.size)
+            dtype = np.dtype(dtype.rstrip(b"\x00").decode("ascii"))
+            if offset + count * dtype.itemsize > payload_size:
+                raise ArtifactError("섹션 범위 초과")
+            arrays[name.rstrip(b"\x00").decode("ascii")] = np.frombuffer(
+                buffer, dtype=dtype, count=count, offset=_HEADER.size + offset
+            )
+    finally:
+        payload.release()
+
+    return CatalogArtifact(path, catalog_version, buffer, arrays)
+
+
+def load_or_compile(db: Session, path: str) -> CatalogArtifact:
+    """현재 카탈로그 버전의 산출물을 mmap (없거나 오래됐거나 손상됐으면 다시 컴파일)"""
+    catalog_version = get_catalog_version(db)
+    try:
+        return open_artifact(path, catalog_version)
+    except ArtifactError as e:
+        logger.info("카탈로그 산출물 재컴파일 (%s): %s", path, e)
+
+    compiled_version = compile_catalog(db, path)
+    return open_artifact(path, compiled_version)
+
@@ -0,0 +1,50 @@
+"""DB에 영속되는 카탈로그 버전 (워커 간 변경 감지 및 컴파일 산출물 유효성 확인용)"""
+import time
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.catalog_version import CatalogVersion
+
+_ROW_ID = 1
+
+
+def get_catalog_version(db: Session) -> int:
+    """
+    현재 카탈로그 버전 반환
+
+    행이 없으면(새로 만든 DB) 현재 시각 기반 값으로 초기화하므로,
+    DB를 다시 시드해도 이전 DB의 버전과 겹치지 않습니다.
+    """
+    version = db.query(CatalogVersion.version).filter(CatalogVersion.id == _ROW_ID).scalar()
+    if version is not None:
+        return version
+
+    db.add(CatalogVersion(id=_ROW_ID, version=time.time_ns() // 1000))
+    try:
+        db.commit()
+    except IntegrityError:
+        # 다른 워커가 먼저 초기화한 경우
+        db.rollback()
+    return db.query(CatalogVersion.version).filter(CatalogVersion.id == _ROW_ID).scalar()
+
+
+async def get_catalog_version_async(db: AsyncSession) -> Optional[int]:
+    """비동기 세션으로 현재 카탈로그 버전 조회 (행이 없으면 None, 초기화는 동기 경로에서)"""
+    result = await db.execute(
+        select(CatalogVersion.version).where(CatalogVersion.id == _ROW_ID)
+    )
+    return result.scalar()
+
+
+def bump_catalog_version(db: Session) -> int:
+    """카탈로그 쓰기 후 호출: 버전을 1 올리고 새 버전 반환"""
+    get_catalog_version(db)
+    db.query(CatalogVersion).filter(CatalogVersion.id == _ROW_ID).update(
+        {CatalogVersion.version: CatalogVersion.version + 1}, synchronize_session=False
+    )
+    db.commit()
+    return db.query(CatalogVersion.version).filter(CatalogVersion.id == _ROW_ID).scalar()
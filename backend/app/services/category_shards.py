@@ -0,0 +1,126 @@
+"""질병 카테고리별로 나눈 예측 색인 (카테고리 필터 + 카테고리별 일치 수)"""
+import heapq
+import threading
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.prediction_index import ScoredDisease
+from app.services.scorers import Scorer
+from app.services.sparse_engine import SparseScoringEngine
+
+
+def _rank_key(scored: ScoredDisease):
+    # 반올림 점수 내림차순, 동점이면 질병 ID 순서 (SparseScoringEngine.score와 같은 규칙)
+    return -round(scored.score, 4), scored.disease.id
+
+
+class CategoryShards:
+    """
+    엔진의 질병 행을 카테고리별 샤드로 나눈 예측 색인 (스냅샷당 하나, 점수 방식과 무관).
+
+    카테고리 구분과 category_counts는 점수 방식과 무관하고, 샤드 엔진(그 카테고리 질병 행만
+    잘라 만든 SparseScoringEngine)은 카테고리마다, 샤드 scorer는 (카테고리, 점수 방식)마다
+    처음 사용할 때 한 번만 scorer_factory(점수 방식 이름, 샤드 엔진)로 생성됩니다.
+    score()는 요청한 카테고리의 샤드만 계산하고(나머지 샤드는 통째로 건너뜀)
+    샤드별 정렬 결과를 병합해 전체 순위 기준 상위 limit개를 반환합니다.
+    질병별 점수가 다른 질병과 무관한 방식(scorers.is_shardable)에서만 전체 계산 결과를
+    카테고리로 거른 것과 같습니다.
+    """
+
+    def __init__(
+        self,
+        engine: SparseScoringEngine,
+        scorer_factory: Callable[[str, SparseScoringEngine], Scorer],
+    ):
+        self.engine = engine
+        self._factory = scorer_factory
+        diseases = engine.index.diseases
+        first_seen: Dict[str, int] = {}
+        codes = np.fromiter(
+            (
+                first_seen.setdefault(diseases[disease_id].category, len(first_seen))
+                for disease_id in engine.disease_ids.tolist()
+            ),
+            dtype=np.int64,
+            count=len(engine.disease_ids),
+        )
+        # 카테고리 번호를 이름 순서로 다시 매김
+        self.categories: List[str] = sorted(first_seen)
+        remap = np.empty(len(first_seen), dtype=np.int64)
+        remap[list(first_seen.values())] = [self.categories.index(c) for c in first_seen]
+        self.codes = remap[codes]
+        # 카테고리별 행 번호 (행 순서 = 질병 ID 오름차순 유지)
+        order = np.argsort(self.codes, kind="stable")
+        bounds = np.searchsorted(self.codes[order], np.arange(len(self.categories) + 1))
+        self._rows: Dict[str, np.ndarray] = {
+            name: order[bounds[code]:bounds[code + 1]]
+            for code, name in enumerate(self.categories)
+        }
+        self._engines: Dict[str, SparseScoringEngine] = {}
+        self._shards: Dict[Tuple[str, str], Scorer] = {}
+        self._lock = threading.Lock()
+
+    def shard(self, category: str, scorer_name: str) -> Optional[Scorer]:
+        """카테고리 샤드의 scorer_name 점수 방식 scorer (그 카테고리 질병이 없으면 None)"""
+        rows = self._rows.get(category)
+        if rows is None:
+            return None
+        key = (category, scorer_name)
+        scorer = self._shards.get(key)
+        if scorer is None:
+            with self._lock:
+                scorer = self._shards.get(key)
+                if scorer is None:
+                    engine = self._engines.get(category)
+                    if engine is None:
+                        engine = self._engines[category] = self._shard_engine(rows)
+                    scorer = self._shards[key] = self._factory(scorer_name, engine)
+        return scorer
+
+    def _shard_engine(self, rows: np.ndarray) -> SparseScoringEngine:
+        engine = self.engine
+        matrix = engine.matrix[rows]
+        indicator = engine.indicator[rows]
+        return SparseScoringEngine.from_matrices(
+            engine.index,
+            engine.disease_ids[rows],
+            engine.symptom_ids(),
+            matrix,
+            indicator,
+            matrix.tocsc(),
+            indicator.tocsc(),
+        )
+
+    def score(
+        self,
+        scorer_name: str,
+        symptom_ids: List[int],
+        categories: Iterable[str],
+        limit: Optional[int] = None,
+        min_score: float = 0.0,
+    ) -> List[ScoredDisease]:
+        """categories 샤드만 계산해 병합한 상위 결과 (반올림 점수 내림차순, 동점이면 질병 ID 순)"""
+        shards = [
+            self.shard(category, scorer_name) for category in dict.fromkeys(categories)
+        ]
+        merged = heapq.merge(
+            *(
+                shard.score(symptom_ids, limit, min_score)
+                for shard in shards
+                if shard is not None
+            ),
+            key=_rank_key,
+        )
+        return list(islice(merged, limit))
+
+    def category_counts(self, symptom_ids: List[int]) -> Dict[str, int]:
+        """카테고리별 입력 증상과 하나 이상 일치하는 질병 수 (일치 질병이 없는 카테고리는 제외)"""
+        matched = self.engine.match_counts(self.engine._columns(symptom_ids)) > 0
+        counts = np.bincount(self.codes[matched], minlength=len(self.categories))
+        return {
+            category: int(count)
+            for category, count in zip(self.categories, counts.tolist())
+            if count
+        }
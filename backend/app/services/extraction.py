@@ -0,0 +1,230 @@
+"""자유 텍스트 주호소에서 증상 찾기 (증상 이름 + 다른 이름의 Aho–Corasick 자동자)"""
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import anyio
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import SymptomAlias
+from app.services.autocomplete import normalize
+from app.services.catalog import CatalogSnapshot
+from app.services.sql_stats import budget_exempt
+
+
+class ExtractedSymptom(NamedTuple):
+    """텍스트에서 찾은 증상 한 건 (start:end는 입력 텍스트 기준 위치)"""
+    symptom_id: int
+    name: str
+    start: int
+    end: int
+    matched: str  # 입력 텍스트에서 일치한 부분
+
+
+class AhoCorasick:
+    """
+    여러 패턴을 한 번에 찾는 Aho–Corasick 자동자.
+
+    패턴 트라이에 실패 링크(일치가 끊겼을 때 이어 갈 가장 긴 접미사 노드)와
+    출력 링크(패턴이 끝나는 가장 가까운 접미사 노드)를 붙여, 텍스트를 한 번 훑는 동안
+    모든 패턴의 모든 출현 위치를 찾습니다 (텍스트 길이 + 일치 수에 비례).
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        # 노드별 전이, 실패 링크, 끝나는 패턴 (길이, 값), 출력 링크
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._match: List[Optional[Tuple[int, int]]] = [None]
+        self._output: List[int] = [0]
+        self.size = 0
+
+        for pattern, value in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._match.append(None)
+                    self._output.append(0)
+                node = next_node
+            # 같은 패턴이 여러 번이면 먼저 넣은 값 사용 (증상 이름이 다른 이름보다 우선)
+            if self._match[node] is None:
+                self._match[node] = (len(pattern), value)
+                self.size += 1
+
+        # 너비 우선으로 실패 링크·출력 링크 계산 (루트 = 0, 출력 링크 0 = 없음)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._output[child] = fail if self._match[fail] is not None else self._output[fail]
+                queue.append(child)
+
+    def iter(self, text: str) -> Iterable[Tuple[int, int, int]]:
+        """text에 나타나는 모든 패턴의 (시작, 끝, 값) (끝 위치 순서)"""
+        goto, fail, match, output = self._goto, self._fail, self._match, self._output
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found = node if match[node] is not None else output[node]
+            while found:
+                length, value = match[found]
+                yield end - length, end, value
+                found = output[found]
+
+
+def _nfc_segments(text: str) -> Iterable[Tuple[int, int]]:
+    """
+    NFC 정규화가 서로 영향을 주지 않는 구간 (시작, 끝) 목록
+
+    결합 문자나 앞 글자와 조합되는 글자(예: 한글 자모 "ㅎ+ㅏ+ㄴ" → "한")는 앞 구간에 붙이므로
+    구간별 NFC 결과를 이어 붙이면 전체 텍스트의 NFC 결과와 같습니다.
+    """
+    if unicodedata.is_normalized("NFC", text):
+        # 대부분의 입력 - 글자마다 한 구간
+        yield from ((position, position + 1) for position in range(len(text)))
+        return
+    start = 0
+    for position in range(1, len(text) + 1):
+        if position < len(text):
+            char = text[position]
+            segment = text[start:position]
+            if unicodedata.combining(char) or unicodedata.normalize(
+                "NFC", segment + char
+            ) != unicodedata.normalize("NFC", segment) + unicodedata.normalize("NFC", char):
+                continue
+        yield start, position
+        start = position
+
+
+def _fold(text: str) -> Tuple[str, List[int], List[int]]:
+    """
+    normalize()와 같은 규칙(NFC 조합, 소문자, 공백 제거)의 비교용 문자열과 글자별 원래 위치(시작, 끝)
+
+    NFC 조합은 서로 영향을 주지 않는 구간 단위로 하므로, 조합된 글자는 그 구간의 원래 위치로
+    추적됩니다 (NFD로 입력된 "두통"도 찾고, 위치는 입력 텍스트 기준).
+    """
+    chars: List[str] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    for start, end in _nfc_segments(text):
+        for char in unicodedata.normalize("NFC", text[start:end]):
+            if char.isspace():
+                continue
+            for folded in char.lower():
+                chars.append(folded)
+                starts.append(start)
+                ends.append(end)
+    return "".join(chars), starts, ends
+
+
+class SymptomExtractor:
+    """
+    증상 이름과 다른 이름(symptom_aliases)으로 만든 자동자로 자유 텍스트의 증상을 찾습니다.
+
+    패턴과 텍스트 모두 공백·대소문자를 무시하고 비교하며 ("목이 아파" = "목이아파"),
+    겹치는 일치는 먼저 시작하는 것, 같은 위치면 더 긴 것만 남깁니다
+    ("목통증"에서 통증은 제외). 조사가 붙어도 찾습니다 ("고열이랑" → 고열).
+    generation은 자동자를 만든 카탈로그 스냅샷의 증상 세대(symptom_generation)입니다.
+    """
+
+    def __init__(
+        self,
+        symptoms: Dict[int, str],
+        aliases: Iterable[Tuple[str, int]] = (),
+        generation: int = 0,
+    ):
+        self.symptoms = symptoms
+        self.generation = generation
+        patterns = [(normalize(name), symptom_id) for symptom_id, name in symptoms.items()]
+        patterns += [
+            (normalize(alias), symptom_id)
+            for alias, symptom_id in aliases
+            if symptom_id in symptoms
+        ]
+        self.automaton = AhoCorasick(patterns)
+
+    def extract(self, text: str) -> List[ExtractedSymptom]:
+        """text에서 찾은 증상 (텍스트 순서, 겹치는 일치 제외)"""
+        folded, starts, ends = _fold(text)
+        found = sorted(self.automaton.iter(folded), key=lambda m: (m[0], m[0] - m[1]))
+        results: List[ExtractedSymptom] = []
+        covered = 0
+        for start, end, symptom_id in found:
+            if start < covered:
+                continue
+            covered = end
+            begin, finish = starts[start], ends[end - 1]
+            results.append(
+                ExtractedSymptom(
+                    symptom_id, self.symptoms[symptom_id], begin, finish, text[begin:finish]
+                )
+            )
+        return results
+
+
+def load_aliases(db: Session) -> List[Tuple[str, int]]:
+    """symptom_aliases 전체 (다른 이름, 증상 ID)"""
+    return [
+        (alias, symptom_id)
+        for alias, symptom_id in db.execute(
+            select(SymptomAlias.alias, SymptomAlias.symptom_id).order_by(SymptomAlias.id)
+        )
+    ]
+
+
+class SymptomExtractorCache:
+    """
+    증상 세대별 SymptomExtractor 하나를 보관
+
+    스냅샷의 증상 세대(symptom_generation)가 바뀌면(이 워커의 증상·다른 이름 쓰기, 또는
+    다른 워커의 카탈로그 쓰기로 카탈로그 전체를 다시 불러온 경우) 다음 요청에서 자동자를
+    한 번만 다시 만듭니다. 질병·연결 쓰기로는 다시 만들지 않습니다.
+    """
+
+    def __init__(self):
+        self._extractor: Optional[SymptomExtractor] = None
+        self._lock = threading.Lock()
+
+    def current(self, snapshot: CatalogSnapshot) -> SymptomExtractor:
+        """snapshot 증상 세대 이후에 만든 자동자 (없으면 새로 만듦)"""
+        extractor = self._extractor
+        if extractor is None or extractor.generation < snapshot.symptom_generation:
+            with self._lock:
+                extractor = self._extractor
+                if extractor is None or extractor.generation < snapshot.symptom_generation:
+                    extractor = self._extractor = self._compile(snapshot)
+        return extractor
+
+    async def current_async(self, snapshot: CatalogSnapshot) -> SymptomExtractor:
+        """비동기 경로용 current() (다시 만들어야 할 때만 스레드에서 실행)"""
+        extractor = self._extractor
+        if extractor is not None and extractor.generation >= snapshot.symptom_generation:
+            return extractor
+        return await anyio.to_thread.run_sync(self.current, snapshot)
+
+    def _compile(self, snapshot: CatalogSnapshot) -> SymptomExtractor:
+        # 어느 요청에서 일어날지 정해져 있지 않으므로 요청의 SQL 예산에서 제외
+        db = SessionLocal()
+        try:
+            with budget_exempt():
+                aliases = load_aliases(db)
+        finally:
+            db.close()
+        return SymptomExtractor(snapshot.index.symptoms, aliases, snapshot.symptom_generation)
+
+
+symptom_extractors = SymptomExtractorCache()
@@ -0,0 +1,158 @@
+"""오타를 허용하는 증상 이름 검색 (한글 자모 n-gram 역색인)"""
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.services.autocomplete import normalize
+from app.services.prediction_index import PredictionIndex
+
+# 한 번에 반환할 수 있는 최대 결과 수
+FUZZY_MAX_RESULTS = int(os.getenv("FUZZY_MAX_RESULTS", "20"))
+# 자모 n-gram 길이 (2: 짧은 이름의 오타에 강함, 3: 역색인 목록이 짧아 큰 카탈로그에서 빠름)
+FUZZY_NGRAM = int(os.getenv("FUZZY_NGRAM", "2"))
+
+_CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSUNG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+# 이름 앞뒤 표시 (첫/마지막 자모도 n-gram 하나 이상에 들어가도록)
+_PAD = "\x00"
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class FuzzyMatch(NamedTuple):
+    """오타 허용 검색 결과 한 건"""
+    symptom_id: int
+    name: str
+    similarity: float  # 자모 n-gram 다이스 계수 (0~1, 1이면 정규화한 이름이 같음)
+
+
+def jamo(text: str) -> str:
+    """한글 음절을 초성·중성·종성 자모로 풀어 쓴 문자열 (예: 두통 → ㄷㅜㅌㅗㅇ)"""
+    chars = []
+    for char in text:
+        code = ord(char) - _HANGUL_FIRST
+        if 0 <= code <= _HANGUL_LAST - _HANGUL_FIRST:
+            initial, rest = divmod(code, 21 * 28)
+            medial, final = divmod(rest, 28)
+            chars.append(_CHOSUNG[initial])
+            chars.append(_JUNGSUNG[medial])
+            if final:
+                chars.append(_JONGSUNG[final])
+        else:
+            chars.append(char)
+    return "".join(chars)
+
+
+def ngrams(text: str, n: int = FUZZY_NGRAM) -> Tuple[str, ...]:
+    """정규화·자모 분해한 text의 서로 다른 n-gram (앞뒤 표시 포함)"""
+    letters = jamo(normalize(text))
+    if not letters:
+        return ()
+    padded = _PAD * (n - 1) + letters + _PAD * (n - 1)
+    return tuple(dict.fromkeys(padded[i:i + n] for i in range(len(padded) - n + 1)))
+
+
+class SymptomFuzzyIndex:
+    """
+    증상 이름의 자모 n-gram 역색인.
+
+    n-gram마다 그 n-gram이 들어 있는 증상 ID 배열을 두고, 질의 n-gram의 배열을 이어 붙여
+    bincount 한 번으로 증상별 공통 n-gram 수를 셉니다.
+    유사도는 다이스 계수 2·|공통| / (|질의| + |이름|) 이며, 자모 단위로 나누므로
+    받침 하나가 틀린 오타("두퉁", "두톧")도 대부분의 n-gram이 그대로 남습니다.
+    질의 n-gram에 해당하는 증상만 읽으므로 LIKE '%...%' 전체 탐색이 없습니다.
+
+    카탈로그 변경은 clone() 후 refresh_symptom()으로 반영합니다 (copy-on-write:
+    바뀐 n-gram의 배열만 새로 만들고 나머지는 원본과 공유).
+    """
+
+    def __init__(self, index: PredictionIndex, n: int = FUZZY_NGRAM):
+        if n < 1:
+            raise ValueError("n-gram 길이는 1 이상이어야 합니다")
+        self.index = index
+        self.n = n
+        self._grams_by_id: Dict[int, Tuple[str, ...]] = {
+            symptom_id: ngrams(name, n) for symptom_id, name in index.symptoms.items()
+        }
+        members: Dict[str, List[int]] = {}
+        for symptom_id, grams in self._grams_by_id.items():
+            for gram in grams:
+                members.setdefault(gram, []).append(symptom_id)
+        self.postings: Dict[str, np.ndarray] = {
+            gram: np.array(sorted(ids), dtype=np.int64) for gram, ids in members.items()
+        }
+        # 증상 ID → 이름의 n-gram 수 (증상 ID를 그대로 번호로 사용, 없는 ID는 0)
+        self.sizes = np.zeros(max(self._grams_by_id, default=-1) + 1, dtype=np.int64)
+        for symptom_id, grams in self._grams_by_id.items():
+            self.sizes[symptom_id] = len(grams)
+
+    def clone(self, index: PredictionIndex) -> "SymptomFuzzyIndex":
+        """새 세대 색인을 가리키는 복사본 (n-gram 배열은 바뀔 때까지 원본과 공유)"""
+        clone = object.__new__(SymptomFuzzyIndex)
+        clone.index = index
+        clone.n = self.n
+        clone._grams_by_id = dict(self._grams_by_id)
+        clone.postings = dict(self.postings)
+        clone.sizes = self.sizes.copy()
+        return clone
+
+    def refresh_symptom(self, symptom_id: int) -> None:
+        """증상 하나의 이름 변경/생성/삭제 반영 (index.symptoms 기준)"""
+        old = self._grams_by_id.pop(symptom_id, ())
+        name = self.index.symptoms.get(symptom_id)
+        new = ngrams(name, self.n) if name is not None else ()
+        if new:
+            self._grams_by_id[symptom_id] = new
+
+        for gram in set(old) - set(new):
+            ids = self.postings[gram]
+            ids = np.delete(ids, np.searchsorted(ids, symptom_id))
+            if len(ids):
+                self.postings[gram] = ids
+            else:
+                del self.postings[gram]
+        for gram in set(new) - set(old):
+            ids = self.postings.get(gram, _EMPTY)
+            self.postings[gram] = np.insert(ids, np.searchsorted(ids, symptom_id), symptom_id)
+
+        if symptom_id >= len(self.sizes):
+            self.sizes = np.concatenate(
+                [self.sizes, np.zeros(symptom_id + 1 - len(self.sizes), dtype=np.int64)]
+            )
+        self.sizes[symptom_id] = len(new)
+
+    def search(
+        self, query: str, limit: Optional[int] = None, min_similarity: float = 0.3
+    ) -> List[FuzzyMatch]:
+        """유사도가 min_similarity 이상인 증상 (유사도 내림차순, 동점이면 ID 순, 최대 limit개)"""
+        limit = min(limit or FUZZY_MAX_RESULTS, FUZZY_MAX_RESULTS)
+        grams = ngrams(query, self.n)
+        found = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not found:
+            return []
+
+        overlap = np.bincount(np.concatenate(found))
+        # 다이스 ≥ min_similarity 이려면 공통 n-gram이 적어도 이만큼 필요 (이름 길이 무관한 하한)
+        floor = max(1, int(np.ceil(min_similarity * len(grams) / 2)))
+        candidates = np.flatnonzero(overlap >= floor)
+        similarity = 2 * overlap[candidates] / (len(grams) + self.sizes[candidates])
+        keep = similarity >= min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+
+        if len(candidates) > limit:
+            top = np.argpartition(-similarity, limit - 1)[:limit]
+            # 경계 동점이 잘리지 않도록 limit번째 유사도 이상은 모두 정렬 대상에 포함
+            top = np.flatnonzero(similarity >= similarity[top].min())
+            candidates, similarity = candidates[top], similarity[top]
+        order = np.lexsort((candidates, -similarity))[:limit]
+
+        symptoms = self.index.symptoms
+        return [
+            FuzzyMatch(symptom_id, symptoms[symptom_id], round(score, 4))
+            for symptom_id, score in zip(
+                candidates[order].tolist(), similarity[order].tolist()
+            )
+        ]
@@ -0,0 +1,161 @@
+"""질병 증상 집합의 MinHash 서명 + LSH 밴드 색인으로 근사 후보를 고른 뒤 후보만 정확히 재계산"""
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.prediction_index import ScoredDisease
+from app.services.sparse_engine import SparseScoringEngine
+
+# 밴드 수(b)와 밴드당 해시 수(r): 자카드 유사도 J인 질병이 후보가 될 확률은 1 - (1 - J^r)^b
+# (b를 늘리거나 r을 줄이면 재현율↑ 후보 수↑, 반대로 하면 속도↑ 재현율↓)
+LSH_BANDS = int(os.getenv("LSH_BANDS", "32"))
+LSH_ROWS = int(os.getenv("LSH_ROWS", "3"))
+# 이보다 질병이 적은 카탈로그는 후보 생성 비용이 더 커서 LSH 색인 없이 정확히 계산
+LSH_MIN_DISEASES = int(os.getenv("LSH_MIN_DISEASES", "10000"))
+
+# 유니버설 해시 h(x) = (a * x + b) mod p (a, b < p 이므로 int64 곱셈이 넘치지 않음)
+_PRIME = (1 << 31) - 1
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+# 후보 행 재계산이 연결 하나를 읽는 비용 / 전체 엔진이 질의 열의 연결 하나를 읽는 비용
+# (행 fancy indexing + 열 선택 vs 연속된 CSC 열 합 - dense-100k에서 측정한 비율)
+_ROW_LINK_COST = 6
+
+
+def _mix(minima: np.ndarray) -> np.ndarray:
+    """밴드의 MinHash 값 rows개(첫 번째 축) → 64비트 밴드 키"""
+    minima = minima.astype(np.uint64)
+    keys = minima[0]
+    for values in minima[1:]:
+        keys = keys * _MIX + values
+    return keys
+
+
+class MinHashLSH:
+    """
+    질병별 증상 집합(engine.indicator의 행)의 MinHash 서명을 밴드로 나눈 LSH 색인.
+
+    - 서명: 해시 함수 bands * rows개 각각에 대한 증상 열 번호 해시값의 최솟값
+    - 밴드: 서명을 rows개씩 묶어 하나의 64비트 키로 섞은 값
+    밴드마다 (키, 행 번호)를 키 순서로 정렬해 두고, 질의 서명의 밴드 키와 같은 행을
+    이진 탐색으로 모읍니다. 하나 이상의 밴드에서 키가 같은 질병이 후보입니다.
+    증상 연결이 없는 질병은 색인하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        engine: SparseScoringEngine,
+        bands: int = LSH_BANDS,
+        rows: int = LSH_ROWS,
+        seed: int = 42,
+    ):
+        if bands < 1 or rows < 1:
+            raise ValueError("LSH 밴드 수와 밴드당 해시 수는 1 이상이어야 합니다")
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=(bands, rows), dtype=np.int64)
+        self._b = rng.integers(0, _PRIME, size=(bands, rows), dtype=np.int64)
+
+        indicator = engine.indicator
+        self.disease_count = indicator.shape[0]
+        linked = np.flatnonzero(np.diff(indicator.indptr))
+        starts = indicator.indptr[:-1][linked]
+        cols = indicator.indices.astype(np.int64)
+
+        # 밴드마다 해시 함수 rows개로 연결 전체를 해시해 질병별 최솟값 → 밴드 키
+        self._keys: List[np.ndarray] = []
+        self._rows: List[np.ndarray] = []
+        for band in range(bands):
+            minima = np.empty((rows, len(linked)), dtype=np.int64)
+            for j in range(rows):
+                hashed = (self._a[band, j] * cols + self._b[band, j]) % _PRIME
+                minima[j] = np.minimum.reduceat(hashed, starts) if len(linked) else hashed[:0]
+            keys = _mix(minima)
+            order = np.argsort(keys, kind="stable")
+            self._keys.append(keys[order])
+            self._rows.append(linked[order].astype(np.int32))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(keys.nbytes + rows.nbytes for keys, rows in zip(self._keys, self._rows))
+
+    def signature(self, cols: np.ndarray) -> np.ndarray:
+        """질의 열 번호 집합의 MinHash 서명 (밴드 수 × 밴드당 해시 수)"""
+        hashed = (self._a[:, :, None] * cols + self._b[:, :, None]) % _PRIME
+        return hashed.min(axis=2)
+
+    def candidates(self, cols: np.ndarray) -> np.ndarray:
+        """하나 이상의 밴드에서 질의와 키가 같은 질병 행 번호 (오름차순)"""
+        if not len(cols):
+            return np.empty(0, dtype=np.int64)
+        query_keys = _mix(self.signature(cols).T)
+        # 밴드별 후보가 겹치므로 정렬·중복 제거 대신 질병 수 길이의 표시 배열로 합집합
+        found = np.zeros(self.disease_count, dtype=bool)
+        for keys, rows, key in zip(self._keys, self._rows, query_keys):
+            start = np.searchsorted(keys, key, side="left")
+            end = np.searchsorted(keys, key, side="right")
+            found[rows[start:end]] = True
+        return np.flatnonzero(found)
+
+
+class LshScorer:
+    """
+    LSH 후보만 heuristic 점수로 정확히 재계산하는 근사 scorer.
+
+    후보에 든 질병의 점수는 SparseScoringEngine과 같고, 후보에서 빠진 질병은 결과에
+    나오지 않습니다 (재현율은 benchmarks/bench_lsh.py로 측정).
+    다음 경우에는 전체 엔진으로 정확히 계산합니다.
+    - 질병 수가 min_diseases보다 적을 때 (LSH 색인을 만들지 않음)
+    - limit이 없거나 후보가 limit개보다 적을 때 (결과가 모자라지 않도록)
+    - 후보 재계산 비용이 전체 계산 이상일 때: 전체 엔진은 질의 열의 연결만 읽으므로
+      후보 행의 연결 수 * _ROW_LINK_COST가 질의 열의 연결 수 이상이면 더 싸고 정확함
+      (질의 증상이 드물거나 후보가 많으면 LSH를 거칠 이유가 없음)
+    """
+
+    def __init__(
+        self,
+        engine: SparseScoringEngine,
+        bands: int = LSH_BANDS,
+        rows: int = LSH_ROWS,
+        min_diseases: int = LSH_MIN_DISEASES,
+    ):
+        self.engine = engine
+        self.lsh: Optional[MinHashLSH] = None
+        if len(engine.disease_ids) >= min_diseases:
+            self.lsh = MinHashLSH(engine, bands, rows)
+        self._row_links = np.diff(engine.indicator.indptr)
+        self._column_links = np.diff(engine._indicator_by_symptom.indptr)
+
+    def score(
+        self, symptom_ids: List[int], limit: Optional[int] = None, min_score: float = 0.0
+    ) -> List[ScoredDisease]:
+        cols = self.engine._columns(symptom_ids)
+        candidates = (
+            self.lsh.candidates(cols) if self.lsh is not None and limit is not None else None
+        )
+        if (
+            candidates is None
+            or len(candidates) < limit
+            or self._row_links[candidates].sum() * _ROW_LINK_COST
+            >= self._column_links[cols].sum()
+        ):
+            return self.engine.score(symptom_ids, limit, min_score)
+        return self.engine.score_rows(symptom_ids, candidates, limit, min_score)
+
+    def score_batch(
+        self,
+        queries: List[List[int]],
+        limits: Optional[List[Optional[int]]] = None,
+        min_scores: Optional[List[float]] = None,
+    ) -> List[List[ScoredDisease]]:
+        """질의별 score() (질의마다 후보 집합이 달라 행렬로 쌓지 않음)"""
+        if self.lsh is None:
+            return self.engine.score_batch(queries, limits, min_scores)
+        limits = limits or [None] * len(queries)
+        min_scores = min_scores or [0.0] * len(queries)
+        return [
+            self.score(symptom_ids, limit, min_score)
+            for symptom_ids, limit, min_score in zip(queries, limits, min_scores)
+        ]
@@ -0,0 +1,134 @@
+"""
+요청 지표 수집 및 Prometheus 텍스트 형식 출력
+
+외부 라이브러리 없이 필요한 지표만 직접 집계합니다.
+- http_requests_total               경로/메서드/상태 코드별 요청 수
+- http_request_duration_seconds     경로별 응답 시간 히스토그램
+- http_requests_in_flight           경로별 처리 중인 요청 수
+- http_request_sql_statements       요청당 SQL 문장 수 히스토그램 (N+1 감지용)
+- http_request_sql_duration_seconds 요청당 DB 시간 히스토그램
+"""
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+SQL_DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+RouteKey = Tuple[str, str]  # (method, route)
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0
+        self.sum = 0.0
+
+
+class MetricsRegistry:
+    """요청 지표 저장소 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self._in_flight: Dict[RouteKey, int] = defaultdict(int)
+        self._latency: Dict[RouteKey, _Histogram] = {}
+        self._sql_count: Dict[RouteKey, _Histogram] = {}
+        self._sql_duration: Dict[RouteKey, _Histogram] = {}
+
+    def request_started(self, method: str, route: str) -> None:
+        with self._lock:
+            self._in_flight[(method, route)] += 1
+
+    def request_finished(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        seconds: float,
+        sql_statements: int,
+        sql_seconds: float,
+    ) -> None:
+        key = (method, route)
+        with self._lock:
+            self._in_flight[key] -= 1
+            self._requests[(method, route, status_code)] += 1
+            _observe(self._latency, key, LATENCY_BUCKETS, seconds)
+            _observe(self._sql_count, key, SQL_COUNT_BUCKETS, sql_statements)
+            _observe(self._sql_duration, key, SQL_DURATION_BUCKETS, sql_seconds)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        with self._lock:
+            lines: List[str] = [
+                "# HELP http_requests_total 경로/메서드/상태 코드별 처리한 요청 수",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status_code), count in sorted(self._requests.items()):
+                labels = _labels(method=method, route=route, status=str(status_code))
+                lines.append(f"http_requests_total{labels} {count}")
+
+            lines += [
+                "# HELP http_requests_in_flight 경로별 처리 중인 요청 수",
+                "# TYPE http_requests_in_flight gauge",
+            ]
+            for (method, route), count in sorted(self._in_flight.items()):
+                lines.append(
+                    f"http_requests_in_flight{_labels(method=method, route=route)} {count}"
+                )
+
+            for name, help_text, buckets, histograms in (
+                ("http_request_duration_seconds", "경로별 응답 시간(초)",
+                 LATENCY_BUCKETS, self._latency),
+                ("http_request_sql_statements", "요청당 실행한 SQL 문장 수",
+                 SQL_COUNT_BUCKETS, self._sql_count),
+                ("http_request_sql_duration_seconds", "요청당 SQL 실행 시간(초)",
+                 SQL_DURATION_BUCKETS, self._sql_duration),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (method, route), histogram in sorted(histograms.items()):
+                    lines += _histogram_lines(name, method, route, buckets, histogram)
+        return "\n".join(lines) + "\n"
+
+
+def _observe(histograms: Dict[RouteKey, _Histogram], key: RouteKey,
+             buckets: Sequence[float], value: float) -> None:
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = _Histogram(len(buckets))
+    # 값 이상인 첫 경계의 구간에 기록 (출력할 때 누적)
+    index = bisect_left(buckets, value)
+    if index < len(buckets):
+        histogram.counts[index] += 1
+    histogram.total += 1
+    histogram.sum += value
+
+
+def _histogram_lines(name: str, method: str, route: str, buckets: Sequence[float],
+                     histogram: _Histogram) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(buckets, histogram.counts):
+        cumulative += count
+        labels = _labels(method=method, route=route, le=str(float(bound)))
+        lines.append(f"{name}_bucket{labels} {cumulative}")
+    labels = _labels(method=method, route=route, le="+Inf")
+    lines.append(f"{name}_bucket{labels} {histogram.total}")
+    lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.total}")
+    return lines
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,130 @@
+"""희소 로그 가능도 행렬 기반 나이브 베이즈 점수 계산"""
+import os
+from typing import List, Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.special import logsumexp
+
+from app.services.prediction_index import ScoredDisease, score_matches
+from app.services.sparse_engine import SparseScoringEngine
+
+# 연결되지 않은 증상이 그 질병에서 나타날 확률 (연결 확률도 [smoothing, 1 - smoothing]로 자름)
+NAIVE_BAYES_SMOOTHING = float(os.getenv("NAIVE_BAYES_SMOOTHING", "0.01"))
+
+# 사후 확률의 반올림(소수 4자리) 경계에서 순위가 바뀌지 않도록 top-k 후보에 더 포함하는 범위
+_RANK_MARGIN = 1e-4
+
+
+class NaiveBayesScorer:
+    """
+    입력 증상은 존재, 나머지 모든 증상은 부재로 보는 나이브 베이즈 점수 계산기.
+
+    p(s|d)는 질병-증상 연결 확률(연결이 없으면 smoothing)이고, 로그 가능도는
+
+        log L(d) = Σ_{s∈Q} log p(s|d) + Σ_{s∉Q} log(1 - p(s|d))
+                 = base(d) + Σ_{s∈Q} [log p(s|d) - log(1 - p(s|d))]
+
+    입니다. base(d) = Σ_s log(1 - p(s|d))는 질병마다 미리 계산하고, 질의 증상의 log-odds는
+    연결 없는 값(상수)과의 차이만 희소 행렬에 두어 질의 열만 더하므로
+    질병 × 증상 전체가 아니라 O(질의 열의 nnz + 질병 수)로 계산됩니다.
+
+    점수는 균등 사전 확률에서의 사후 확률 P(d | 입력 증상, 나머지 증상 부재)이며
+    입력 증상과 하나 이상 일치하는 질병만 결과에 포함합니다.
+    행/열 배치는 SparseScoringEngine을 그대로 따르며 (같은 질병 ID·증상 열 번호),
+    중복 연결은 엔진 행렬과 같이 확률을 합산한 값을 사용합니다.
+    """
+
+    def __init__(self, engine: SparseScoringEngine, smoothing: float = NAIVE_BAYES_SMOOTHING):
+        self.engine = engine
+        self.index = engine.index
+        self.smoothing = smoothing
+
+        matrix = engine.matrix.copy()
+        matrix.sum_duplicates()
+        probabilities = np.clip(matrix.data, smoothing, 1 - smoothing)
+        absent = np.log1p(-smoothing)
+        # 연결 없는 증상이 입력됐을 때의 log-odds (모든 질병에 같은 상수)
+        self.unlinked_log_odds = np.log(smoothing) - absent
+
+        # base(d) = 증상 수 * log(1 - smoothing) + Σ_연결 [log(1 - p) - log(1 - smoothing)]
+        absent_gain = sparse.csr_matrix(
+            (np.log1p(-probabilities) - absent, matrix.indices, matrix.indptr),
+            shape=matrix.shape,
+        )
+        self.base = matrix.shape[1] * absent + np.asarray(absent_gain.sum(axis=1)).ravel()
+
+        # 연결된 (d, s)의 log-odds - 연결 없는 log-odds
+        log_odds_gain = np.log(probabilities) - np.log1p(-probabilities) - self.unlinked_log_odds
+        self._gain_by_symptom = sparse.csr_matrix(
+            (log_odds_gain, matrix.indices, matrix.indptr), shape=matrix.shape
+        ).tocsc()
+
+    def log_likelihoods(self, symptom_ids: List[int]):
+        """(질병별 로그 가능도, 질병별 일치 증상 수) - 행 순서는 engine.disease_ids"""
+        cols = np.fromiter(
+            (self.engine.symptom_columns[sid] for sid in dict.fromkeys(symptom_ids)),
+            dtype=np.int64,
+        )
+        rows = len(self.base)
+        selected = self._gain_by_symptom[:, cols]
+        match_counts = np.bincount(selected.indices, minlength=rows)
+        gains = np.bincount(selected.indices, weights=selected.data, minlength=rows)
+        return self.base + len(cols) * self.unlinked_log_odds + gains, match_counts
+
+    def score(
+        self, symptom_ids: List[int], limit: Optional[int] = None, min_score: float = 0.0
+    ) -> List[ScoredDisease]:
+        """
+        입력 증상과 일치하는 질병의 사후 확률 계산 (점수 내림차순)
+
+        반올림 점수가 min_score 미만인 질병은 제외하고 최대 limit개를 반환합니다.
+        symptom_ids는 모두 색인에 존재해야 합니다 (missing_symptom_ids로 사전 검증).
+        """
+        log_likelihoods, match_counts = self.log_likelihoods(symptom_ids)
+        rows = np.flatnonzero(match_counts)
+        if not len(rows):
+            return []
+        log_evidence = float(logsumexp(log_likelihoods))
+        posteriors = np.exp(log_likelihoods[rows] - log_evidence)
+
+        keep = np.round(posteriors, 4) >= min_score if min_score > 0 else slice(None)
+        rows, posteriors = rows[keep], posteriors[keep]
+        if limit is not None and len(posteriors) > limit:
+            kth = np.partition(posteriors, len(posteriors) - limit)[len(posteriors) - limit]
+            keep = posteriors >= kth - _RANK_MARGIN
+            rows, posteriors = rows[keep], posteriors[keep]
+
+        # 반올림 점수 내림차순, 동점이면 질병 ID 순서 (heuristic과 같은 규칙)
+        order = np.lexsort((rows, -np.round(posteriors, 4)))[:limit]
+        query = set(symptom_ids)
+        results = []
+        for row, posterior in zip(rows[order].tolist(), posteriors[order].tolist()):
+            disease_id = int(self.engine.disease_ids[row])
+            scored = score_matches(
+                self.index.diseases[disease_id],
+                self.index.matched_symptoms(disease_id, query),
+                len(symptom_ids),
+            )
+            results.append(
+                scored._replace(
+                    score=posterior,
+                    log_likelihood=float(log_likelihoods[row]),
+                    log_evidence=log_evidence,
+                )
+            )
+        return results
+
+    def score_batch(
+        self,
+        queries: List[List[int]],
+        limits: Optional[List[Optional[int]]] = None,
+        min_scores: Optional[List[float]] = None,
+    ) -> List[List[ScoredDisease]]:
+        """질의별 score() (질의마다 질병 수 크기의 벡터가 필요해 행렬로 쌓지 않음)"""
+        limits = limits or [None] * len(queries)
+        min_scores = min_scores or [0.0] * len(queries)
+        return [
+            self.score(symptom_ids, limit, min_score)
+            for symptom_ids, limit, min_score in zip(queries, limits, min_scores)
+        ]
@@ -0,0 +1,199 @@
+"""
+질병 예측 점수 계산 → 응답 변환 (API 라우터와 오프라인 CLI 공용)
+
+- score_items : (순서, 요청 또는 오류 메시지) 목록을 점수 방식별 일괄 계산
+                (/api/predict/batch, /api/predict/stream, python -m app.cli.score)
+- score_one   : 요청 하나의 상위 결과 (categories가 있으면 카테고리 샤드에서 계산)
+- build_response : 점수 계산 결과 → 순위가 매겨진 PredictResponse
+- estimate_response_bytes : 결과 캐시 크기 제한용 응답 JSON 크기 추정 (직렬화 없이)
+"""
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.schemas.prediction import (
+    PredictOptions,
+    PredictRequest,
+    PredictResponse,
+    DiseasePredictor,
+    MatchedSymptom,
+    ScoreBreakdown,
+    BatchPredictItem,
+)
+from app.services.catalog import CatalogSnapshot
+from app.services.prediction_index import ScoredDisease
+from app.services.scorers import (
+    DEFAULT_SCORER,
+    available_scorers,
+    is_shardable,
+    resolve_scorer_name,
+)
+
+
+def scorer_error(scorer: str) -> Optional[str]:
+    """등록되지 않은 점수 방식이면 오류 메시지"""
+    if scorer not in available_scorers():
+        return f"알 수 없는 점수 계산 방식: {scorer} (사용 가능: {available_scorers()})"
+    return None
+
+
+def categories_error(request: PredictOptions, scorer: str) -> Optional[str]:
+    """categories 필터를 쓸 수 없는 요청이면 오류 메시지"""
+    if request.pruning:
+        return "categories는 pruning과 함께 사용할 수 없습니다."
+    if not is_shardable(scorer):
+        return f"categories는 {scorer} 점수 방식에서 사용할 수 없습니다."
+    return None
+
+
+def score_one(
+    request: PredictRequest, snapshot: CatalogSnapshot, scorer: str
+) -> List[ScoredDisease]:
+    """요청 하나의 상위 결과 (categories가 있으면 카테고리 샤드에서 계산)"""
+    if request.categories is not None:
+        return snapshot.category_shards.score(
+            scorer, request.symptom_ids, request.categories, request.top_k, request.min_score
+        )
+    return snapshot.scorer(scorer).score(
+        request.symptom_ids, request.top_k, request.min_score
+    )
+
+
+def score_items(
+    entries: List[Tuple[int, Union[PredictRequest, str]]], snapshot: CatalogSnapshot
+) -> List[BatchPredictItem]:
+    """
+    (순서, 요청 또는 오류 메시지) 목록을 점수 방식별 일괄 계산으로 BatchPredictItem 목록 생성
+
+    존재하지 않는 증상 ID, 등록되지 않은 점수 방식, 쓸 수 없는 categories가 포함된 요청은
+    전체를 실패시키지 않고 해당 항목에만 error를 담습니다.
+    """
+    items: List[BatchPredictItem] = []
+    valid: Dict[str, List[Tuple[int, PredictRequest]]] = {}
+    filtered: List[Tuple[int, PredictRequest, str]] = []
+    for position, (index, entry) in enumerate(entries):
+        if isinstance(entry, str):
+            items.append(BatchPredictItem(index=index, error=entry))
+            continue
+        scorer = resolve_scorer_name(entry.scorer)
+        invalid_ids = snapshot.index.missing_symptom_ids(entry.symptom_ids)
+        error = scorer_error(scorer)
+        if error is None and entry.categories is not None:
+            error = categories_error(entry, scorer)
+        if invalid_ids:
+            items.append(
+                BatchPredictItem(index=index, error=f"존재하지 않는 증상 ID: {list(invalid_ids)}")
+            )
+        elif error is not None:
+            items.append(BatchPredictItem(index=index, error=error))
+        else:
+            items.append(BatchPredictItem(index=index))
+            if entry.categories is not None:
+                # 카테고리 필터 요청은 해당 샤드만 질의별로 계산
+                filtered.append((position, entry, scorer))
+            else:
+                valid.setdefault(scorer, []).append((position, entry))
+
+    for scorer, group in valid.items():
+        batch_scores = snapshot.scorer(scorer).score_batch(
+            [entry.symptom_ids for _, entry in group],
+            limits=[entry.top_k for _, entry in group],
+            min_scores=[entry.min_score for _, entry in group],
+        )
+        for (position, _), top_predictions in zip(group, batch_scores):
+            items[position].result = build_response(top_predictions, snapshot, scorer=scorer)
+    for position, entry, scorer in filtered:
+        items[position].result = build_response(
+            score_one(entry, snapshot, scorer), snapshot, scorer=scorer
+        )
+    return items
+
+
+def build_response(
+    top_predictions: List[ScoredDisease],
+    snapshot: CatalogSnapshot,
+    explain: bool = False,
+    scorer: str = DEFAULT_SCORER,
+) -> PredictResponse:
+    """점수 계산 결과를 순위가 매겨진 PredictResponse로 변환"""
+    return PredictResponse(
+        predictions=[
+            DiseasePredictor(
+                disease_id=scored.disease.id,
+                disease_name=scored.disease.name,
+                description=scored.disease.description,
+                category=scored.disease.category,
+                # heuristic 점수는 1.0을 넘을 수 있음 (순위는 원래 점수 기준)
+                probability=min(round(scored.score, 4), 1.0),
+                rank=rank,
+                matched_symptoms=[
+                    MatchedSymptom(
+                        id=m.symptom_id, name=m.symptom_name, probability=m.probability
+                    )
+                    for m in scored.matched
+                ],
+                score_breakdown=_score_breakdown(scored) if explain else None,
+            )
+            for rank, scored in enumerate(top_predictions, start=1)
+        ],
+        total_diseases_checked=snapshot.index.total_diseases,
+        catalog_generation=snapshot.generation,
+        scorer=scorer,
+    )
+
+
+# 응답 JSON 크기 추정용 고정 크기 (필드 이름·숫자, 실제 직렬화 결과로 맞춘 근사값)
+_RESPONSE_BYTES = 160
+_PREDICTION_BYTES = 150
+_MATCHED_SYMPTOM_BYTES = 45
+_BREAKDOWN_BYTES = 200
+_RETRIEVAL_STATS_BYTES = 60
+_CATEGORY_COUNT_BYTES = 8
+# 문자열은 한글 기준 UTF-8 글자당 3바이트로 추정
+_BYTES_PER_CHAR = 3
+
+
+def estimate_response_bytes(response: PredictResponse) -> int:
+    """
+    PredictResponse JSON 크기 추정치 (결과 캐시 크기 제한용)
+
+    캐시 미스마다 응답을 한 번 더 직렬화하지 않도록 예측 수·일치 증상 수·문자열 길이로 계산합니다.
+    """
+    size = _RESPONSE_BYTES
+    for prediction in response.predictions:
+        size += _PREDICTION_BYTES + _BYTES_PER_CHAR * (
+            len(prediction.disease_name)
+            + len(prediction.description)
+            + len(prediction.category or "")
+        )
+        for matched in prediction.matched_symptoms:
+            size += _MATCHED_SYMPTOM_BYTES + _BYTES_PER_CHAR * len(matched.name)
+        if prediction.score_breakdown is not None:
+            size += _BREAKDOWN_BYTES
+    if response.retrieval_stats is not None:
+        size += _RETRIEVAL_STATS_BYTES
+    if response.category_counts is not None:
+        size += sum(
+            _CATEGORY_COUNT_BYTES + _BYTES_PER_CHAR * len(category)
+            for category in response.category_counts
+        )
+    return size
+
+
+def _score_breakdown(scored: ScoredDisease) -> ScoreBreakdown:
+    """점수 계산 중 이미 구한 값들로 계산 내역 구성 (추가 계산 없음)"""
+    if scored.log_likelihood is not None:
+        # naive_bayes: 사후 확률 = exp(로그 가능도 - 정규화 상수)
+        return ScoreBreakdown(
+            matched_count=len(scored.matched),
+            query_size=scored.query_size,
+            final_score=scored.score,
+            log_likelihood=scored.log_likelihood,
+            log_evidence=scored.log_evidence,
+        )
+    return ScoreBreakdown(
+        matched_count=len(scored.matched),
+        query_size=scored.query_size,
+        user_coverage=scored.user_coverage,
+        avg_probability=scored.avg_probability,
+        match_count_bonus=scored.match_count_bonus,
+        final_score=scored.score,
+    )
@@ -0,0 +1,99 @@
+"""정규화된 증상 세트 기준 LRU 예측 결과 캐시"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "1024"))
+PREDICTION_CACHE_MAX_BYTES = int(os.getenv("PREDICTION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+
+def normalize_symptom_ids(symptom_ids: Iterable[int]) -> Tuple[int, ...]:
+    """정렬 + 중복 제거한 증상 ID 튜플 (캐시 키)"""
+    return tuple(sorted(set(symptom_ids)))
+
+
+class PredictionCache:
+    """
+    항목 수와 바이트 크기로 제한되는 LRU 캐시.
+
+    항목은 계산에 사용된 카탈로그 토큰(예측 색인과 그 버전)과 함께 저장되며,
+    토큰이 바뀌면(카탈로그 쓰기 후 재생성 또는 증분 반영) 캐시 전체가 비워집니다.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._catalog: Optional[object] = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_catalog(self, catalog: object) -> None:
+        if self._catalog != catalog:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._catalog = catalog
+
+    def get(self, key: Hashable, catalog: object) -> Optional[Any]:
+        """캐시 조회 (catalog 토큰이 캐시된 것과 다르면 무효화 후 miss)"""
+        with self._lock:
+            self._sync_catalog(catalog)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int, catalog: object) -> None:
+        """캐시 저장 (size: 값의 바이트 크기 추정치)"""
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            # 계산 도중 카탈로그가 바뀌었다면 오래된 결과이므로 저장하지 않음
+            if self._catalog is not None and self._catalog != catalog:
+                return
+            self._catalog = catalog
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._catalog = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+prediction_cache = PredictionCache(PREDICTION_CACHE_MAX_ENTRIES, PREDICTION_CACHE_MAX_BYTES)
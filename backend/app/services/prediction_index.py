@@ -0,0 +1,287 @@
+"""질병 예측용 인메모리 역색인 (증상 → 질병 포스팅 리스트)"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, MutableMapping, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.models.disease import Disease
+from app.models.disease_symptom import DiseaseSymptom
+from app.models.symptom import Symptom
+
+
+class Posting(NamedTuple):
+    """증상 하나에 연결된 질병 정보"""
+
+    disease_id: int
+    probability: float
+    is_primary: bool
+    link_id: int  # DiseaseSymptom.id (질병 내 증상 순서 유지용)
+
+
+class DiseaseLink(NamedTuple):
+    """질병 하나에 연결된 증상 정보"""
+
+    link_id: int
+    symptom_id: int
+    probability: float
+    is_primary: bool
+
+
+class DiseaseInfo(NamedTuple):
+    """질병 메타데이터"""
+
+    id: int
+    name: str
+    description: str
+    category: str
+
+
+class MatchedPosting(NamedTuple):
+    """질병과 일치한 입력 증상"""
+
+    symptom_id: int
+    symptom_name: str
+    probability: float
+
+
+class ScoredDisease(NamedTuple):
+    """질병별 점수 계산 결과"""
+
+    disease: DiseaseInfo
+    matched: List[MatchedPosting]
+    query_size: int
+    user_coverage: float
+    avg_probability: float
+    match_count_bonus: float
+    score: float
+    log_likelihood: Optional[float] = None  # naive_bayes 점수 방식에서만
+    log_evidence: Optional[float] = None  # naive_bayes 사후 확률의 정규화 상수 (log Σ L(d))
+
+
+def score_matches(
+    disease: DiseaseInfo, matched: List[MatchedPosting], query_size: int
+) -> ScoredDisease:
+    """
+    일치 증상 목록으로 질병 점수 계산
+
+    최종 점수 = 사용자 커버리지 * 평균 확률 * (1 + 일치 증상 수 * 0.1)
+    """
+    probabilities = [m.probability for m in matched]
+
+    user_coverage = len(matched) / query_size
+    avg_probability = sum(probabilities) / len(probabilities)
+    match_count_bonus = 1 + len(matched) * 0.1
+    final_score = user_coverage * avg_probability * match_count_bonus
+
+    return ScoredDisease(
+        disease=disease,
+        matched=matched,
+        query_size=query_size,
+        user_coverage=user_coverage,
+        avg_probability=avg_probability,
+        match_count_bonus=match_count_bonus,
+        score=final_score,
+    )
+
+
+class PredictionIndex:
+    """
+    disease_symptoms 테이블에서 한 번 생성되는 예측 색인.
+
+    - postings: 증상 ID → [(disease_id, probability, is_primary), ...]
+    - disease_links: 질병 ID → 연결된 증상 목록 (연결 생성 순서)
+    - diseases / symptoms: 질병, 증상 메타데이터
+    점수 계산 시 입력된 증상의 포스팅만 순회하므로 DB 조회가 필요 없습니다.
+    각 속성은 사전 또는 copy()를 지원하는 사전형 객체입니다
+    (컴파일된 카탈로그 산출물은 mmap 배열 위의 테이블, catalog_artifact 참고).
+    """
+
+    def __init__(
+        self,
+        diseases: MutableMapping[int, DiseaseInfo],
+        symptoms: MutableMapping[int, str],
+        postings: MutableMapping[int, List[Posting]],
+        disease_links: MutableMapping[int, List[DiseaseLink]],
+    ):
+        self.diseases = diseases
+        self.symptoms = symptoms
+        self.postings = postings
+        self.disease_links = disease_links
+
+    @classmethod
+    def build(cls, db: Session) -> "PredictionIndex":
+        """DB에서 질병/증상/연결 테이블을 각각 한 번씩 읽어 색인 생성"""
+        diseases = {
+            row.id: DiseaseInfo(row.id, row.name, row.description, row.category)
+            for row in db.query(
+                Disease.id, Disease.name, Disease.description, Disease.category
+            ).order_by(Disease.id)
+        }
+        symptoms = {
+            row.id: row.name
+            for row in db.query(Symptom.id, Symptom.name).order_by(Symptom.id)
+        }
+
+        postings: Dict[int, List[Posting]] = defaultdict(list)
+        disease_links: Dict[int, List[DiseaseLink]] = defaultdict(list)
+        links = db.query(
+            DiseaseSymptom.id,
+            DiseaseSymptom.disease_id,
+            DiseaseSymptom.symptom_id,
+            DiseaseSymptom.probability,
+            DiseaseSymptom.is_primary,
+        ).order_by(DiseaseSymptom.id)
+        for link in links:
+            # 삭제된 질병에 남아있는 연결은 예측 대상이 아님
+            if link.disease_id not in diseases:
+                continue
+            postings[link.symptom_id].append(
+                Posting(link.disease_id, link.probability, link.is_primary, link.id)
+            )
+            disease_links[link.disease_id].append(
+                DiseaseLink(link.id, link.symptom_id, link.probability, link.is_primary)
+            )
+
+        return cls(diseases, symptoms, dict(postings), dict(disease_links))
+
+    def clone(self) -> "PredictionIndex":
+        """
+        얕은 복사본 생성 (copy-on-write)
+
+        최상위 사전만 복사(copy())하고 포스팅/연결 리스트는 공유합니다.
+        refresh_* 메서드는 리스트를 제자리 수정하지 않고 교체하므로 원본은 그대로 유지됩니다.
+        """
+        return PredictionIndex(
+            self.diseases.copy(),
+            self.symptoms.copy(),
+            self.postings.copy(),
+            self.disease_links.copy(),
+        )
+
+    def refresh_disease(self, db: Session, disease_id: int) -> Set[int]:
+        """
+        질병 하나의 메타데이터와 증상 연결을 DB에서 다시 읽어 색인에 반영
+
+        해당 질병이 등장하는 포스팅 리스트만 교체하며, 영향받은 증상 ID 집합을 반환합니다.
+        리스트는 제자리 수정 대신 새 리스트로 교체합니다.
+        """
+        row = (
+            db.query(Disease.id, Disease.name, Disease.description, Disease.category)
+            .filter(Disease.id == disease_id)
+            .first()
+        )
+        old_links = self.disease_links.get(disease_id, [])
+        new_links: List[DiseaseLink] = []
+        if row is None:
+            self.diseases.pop(disease_id, None)
+        else:
+            self.diseases[disease_id] = DiseaseInfo(
+                row.id, row.name, row.description, row.category
+            )
+            new_links = [
+                DiseaseLink(link.id, link.symptom_id, link.probability, link.is_primary)
+                for link in db.query(
+                    DiseaseSymptom.id,
+                    DiseaseSymptom.symptom_id,
+                    DiseaseSymptom.probability,
+                    DiseaseSymptom.is_primary,
+                )
+                .filter(DiseaseSymptom.disease_id == disease_id)
+                .order_by(DiseaseSymptom.id)
+            ]
+
+        if old_links == new_links:
+            return set()
+
+        affected = {link.symptom_id for link in old_links} | {
+            link.symptom_id for link in new_links
+        }
+        for symptom_id in affected:
+            merged = [
+                p for p in self.postings.get(symptom_id, ()) if p.disease_id != disease_id
+            ]
+            merged.extend(
+                Posting(disease_id, link.probability, link.is_primary, link.link_id)
+                for link in new_links
+                if link.symptom_id == symptom_id
+            )
+            merged.sort(key=lambda p: p.link_id)
+            if merged:
+                self.postings[symptom_id] = merged
+            else:
+                self.postings.pop(symptom_id, None)
+
+        if new_links:
+            self.disease_links[disease_id] = new_links
+        else:
+            self.disease_links.pop(disease_id, None)
+        return affected
+
+    def refresh_symptom(self, db: Session, symptom_id: int) -> None:
+        """
+        증상 하나의 메타데이터를 DB에서 다시 읽어 색인에 반영
+
+        증상을 삭제해도 DB의 연결은 남아있으므로 포스팅은 그대로 둡니다 (전체 재생성과 동일).
+        """
+        row = db.query(Symptom.id, Symptom.name).filter(Symptom.id == symptom_id).first()
+        if row is None:
+            self.symptoms.pop(symptom_id, None)
+        else:
+            self.symptoms[symptom_id] = row.name
+
+    def diff(self, other: "PredictionIndex") -> List[str]:
+        """다른 색인(예: 전체 재생성 결과)과의 차이점 목록"""
+        differences = []
+        for name in ("diseases", "symptoms", "postings", "disease_links"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            for key in sorted(mine.keys() | theirs.keys()):
+                if mine.get(key) != theirs.get(key):
+                    differences.append(
+                        f"{name}[{key}]: {mine.get(key)!r} != {theirs.get(key)!r}"
+                    )
+        return differences
+
+    @property
+    def total_diseases(self) -> int:
+        return len(self.diseases)
+
+    def missing_symptom_ids(self, symptom_ids: Iterable[int]) -> Set[int]:
+        """색인에 존재하지 않는 증상 ID 집합"""
+        return {sid for sid in symptom_ids if sid not in self.symptoms}
+
+    def matched_symptoms(
+        self, disease_id: int, symptom_ids: Iterable[int]
+    ) -> List[MatchedPosting]:
+        """질병의 연결 증상 중 입력 증상과 일치하는 것 (연결 생성 순서)"""
+        query = set(symptom_ids)
+        return [
+            MatchedPosting(
+                link.symptom_id, self.symptoms.get(link.symptom_id), link.probability
+            )
+            for link in self.disease_links.get(disease_id, ())
+            if link.symptom_id in query
+        ]
+
+    def score(self, symptom_ids: List[int]) -> List[ScoredDisease]:
+        """입력 증상과 하나 이상 일치하는 질병의 점수 계산 (점수 내림차순)"""
+        # 질병별 일치 포스팅 수집 (입력 증상의 포스팅만 순회)
+        matches: Dict[int, List[tuple]] = defaultdict(list)
+        for symptom_id in dict.fromkeys(symptom_ids):
+            symptom_name = self.symptoms.get(symptom_id)
+            for posting in self.postings.get(symptom_id, ()):
+                matches[posting.disease_id].append(
+                    (posting.link_id, symptom_id, symptom_name, posting.probability)
+                )
+
+        results: List[ScoredDisease] = []
+        for disease_id in sorted(matches):
+            # 연결 생성 순서대로 정렬해 기존 루프와 동일한 합산 순서 유지
+            matched = [
+                MatchedPosting(symptom_id, name, probability)
+                for _, symptom_id, name, probability in sorted(matches[disease_id])
+            ]
+            results.append(score_matches(self.diseases[disease_id], matched, len(symptom_ids)))
+
+        # 안정 정렬: 동점이면 질병 ID 순서 유지
+        results.sort(key=lambda r: round(r.score, 4), reverse=True)
+        return results
@@ -0,0 +1,277 @@
+"""
+요청 단위 샘플링 프로파일러
+
+추적 함수(sys.setprofile)를 걸지 않고, 별도 샘플러 스레드가 interval마다
+sys._current_frames()로 각 스레드의 스택을 읽어 기록합니다.
+프로파일 중에도 대상 코드는 거의 원래 속도로 실행되며 (샘플러가 GIL을 잠깐씩 가져가는 정도),
+프로파일하지 않는 요청에는 아무 비용이 없습니다.
+
+요청을 처리하는 스레드(이벤트 루프)뿐 아니라 스레드 풀/aiosqlite 스레드의 스택도 함께
+기록하되, 대기 중인(유휴) 다른 스레드의 스택은 버립니다. 같은 시간에 처리 중인 다른
+요청의 스택이 섞일 수 있으므로 프로세스에서 한 번에 한 요청만 프로파일합니다.
+
+저장 형식 (PROFILE_FORMAT)
+- speedscope : https://www.speedscope.app 에서 바로 여는 JSON (스레드별 프로파일, metadata 포함)
+- collapsed  : flamegraph.pl / inferno 입력용 "스레드;함수;...;함수 샘플수" 텍스트
+               (메타데이터는 같은 이름의 .meta.json)
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from app.services.catalog import catalog_store
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "speedscope")
+# 샘플링 간격(초)
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.0005"))
+# 한 프로파일의 최대 샘플 수 (긴 스트리밍 요청에서 메모리가 무한히 늘지 않도록)
+PROFILE_MAX_SAMPLES = int(os.getenv("PROFILE_MAX_SAMPLES", "100000"))
+
+# 다른 스레드가 이 함수에서 멈춰 있으면 유휴 상태로 보고 샘플을 버림
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    # aiosqlite 연결 스레드 (C 구현 큐에서 대기하므로 바깥 루프가 맨 안쪽 프레임)
+    # 이 스레드의 쿼리 실행 시간은 메타데이터의 sql_ms로 확인
+    ("core.py", "_connection_worker_thread"),
+}
+
+Frame = Tuple[str, int, str]  # (파일 경로, 함수 시작 줄, 함수 이름)
+Stack = Tuple[Frame, ...]  # 바깥 → 안쪽 순서
+
+
+class Profile:
+    """샘플링 결과 (스레드 이름별 (스택, 가중치 ms) 목록)"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Dict[str, List[Tuple[Stack, float]]] = defaultdict(list)
+        self.sample_count = 0
+        self.elapsed = 0.0
+
+    def to_speedscope(self, name: str, metadata: dict) -> dict:
+        frame_index: Dict[Frame, int] = {}
+        frames = []
+        profiles = []
+        for thread_name, samples in sorted(self.samples.items()):
+            stacks = []
+            weights = []
+            for stack, weight in samples:
+                indices = []
+                for frame in stack:
+                    index = frame_index.get(frame)
+                    if index is None:
+                        index = frame_index[frame] = len(frames)
+                        frames.append({"name": frame[2], "file": frame[0], "line": frame[1]})
+                    indices.append(index)
+                stacks.append(indices)
+                weights.append(round(weight, 4))
+            profiles.append({
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 4),
+                "samples": stacks,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "app.services.profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "metadata": metadata,
+        }
+
+    def to_collapsed(self) -> str:
+        counts: Dict[str, int] = defaultdict(int)
+        for thread_name, samples in self.samples.items():
+            for stack, _ in samples:
+                names = [thread_name] + [_frame_label(frame) for frame in stack]
+                counts[";".join(names)] += 1
+        return "".join(f"{line} {count}\n" for line, count in sorted(counts.items()))
+
+
+class SamplingProfiler:
+    """start()부터 stop()까지 요청 스레드와 바쁜 다른 스레드의 스택을 샘플링"""
+
+    def __init__(
+        self, interval: float = PROFILE_INTERVAL, max_samples: int = PROFILE_MAX_SAMPLES
+    ):
+        self.interval = interval
+        self.max_samples = max_samples
+        self.target = threading.get_ident()
+        self.profile = Profile(interval)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread_names: Dict[int, str] = {}
+        self._code_frames: Dict[object, Frame] = {}
+        self._started = 0.0
+        self._switch_interval = sys.getswitchinterval()
+
+    def start(self) -> None:
+        # CPU를 쓰는 스레드는 switch interval(기본 5ms)마다만 GIL을 넘기므로
+        # 프로파일하는 동안만 샘플링 간격에 맞춰 줄임
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        self._thread.join()
+        self.profile.elapsed = time.perf_counter() - self._started
+        sys.setswitchinterval(self._switch_interval)
+        return self.profile
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        previous = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            # 실제 경과 시간을 가중치로 (GIL 대기로 간격이 늘어난 만큼 반영)
+            weight = (now - previous) * 1000
+            previous = now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = self._stack(frame)
+                if thread_id != self.target and _is_idle(stack):
+                    continue
+                self.profile.samples[self._thread_name(thread_id)].append((stack, weight))
+            self.profile.sample_count += 1
+            if self.profile.sample_count >= self.max_samples:
+                return
+
+    def _stack(self, frame) -> Stack:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            entry = self._code_frames.get(code)
+            if entry is None:
+                entry = self._code_frames[code] = (
+                    code.co_filename, code.co_firstlineno, code.co_name
+                )
+            stack.append(entry)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _thread_name(self, thread_id: int) -> str:
+        name = self._thread_names.get(thread_id)
+        if name is None:
+            thread = threading._active.get(thread_id)
+            name = thread.name if thread is not None else f"thread-{thread_id}"
+            if thread_id == self.target:
+                name = f"{name} (요청)"
+            self._thread_names[thread_id] = name
+        return name
+
+
+def _is_idle(stack: Stack) -> bool:
+    if not stack:
+        return True
+    filename, _, function = stack[-1]
+    return (os.path.basename(filename), function) in _IDLE_FRAMES
+
+
+def _frame_label(frame: Frame) -> str:
+    filename, line, function = frame
+    return f"{function} ({_short_path(filename)}:{line})"
+
+
+def _short_path(filename: str) -> str:
+    """site-packages/표준 라이브러리 앞부분과 작업 디렉터리를 잘라낸 경로"""
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        position = filename.rfind(marker)
+        if position >= 0:
+            return filename[position + len(marker):]
+    cwd = os.getcwd() + os.sep
+    if filename.startswith(cwd):
+        return filename[len(cwd):]
+    stdlib = os.path.dirname(os.__file__) + os.sep
+    if filename.startswith(stdlib):
+        return filename[len(stdlib):]
+    return filename
+
+
+_profile_lock = threading.Lock()
+_sequence = 0
+
+
+def try_start_profile() -> Optional[SamplingProfiler]:
+    """프로파일러 시작 (이미 다른 요청을 프로파일 중이면 None)"""
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = SamplingProfiler()
+    profiler.start()
+    return profiler
+
+
+def finish_profile(profiler: SamplingProfiler) -> Profile:
+    """샘플링 종료 후 다음 요청이 프로파일할 수 있도록 잠금 해제"""
+    try:
+        return profiler.stop()
+    finally:
+        _profile_lock.release()
+
+
+def profile_name(method: str, route: str) -> str:
+    """저장 파일 이름의 앞부분 (시각-프로세스-순번-메서드-경로, 프로파일 잠금 안에서 호출)"""
+    global _sequence
+    _sequence += 1
+    slug = re.sub(r"[^0-9A-Za-z]+", "_", route).strip("_") or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_sequence}-{method.lower()}-{slug}"
+
+
+def save_profile(
+    profile: Profile,
+    name: str,
+    metadata: dict,
+    directory: str = PROFILE_DIR,
+    file_format: str = PROFILE_FORMAT,
+) -> str:
+    """프로파일을 directory에 저장하고 경로 반환"""
+    os.makedirs(directory, exist_ok=True)
+    metadata = {
+        **metadata,
+        "samples": profile.sample_count,
+        "interval_ms": profile.interval * 1000,
+        "profiled_ms": round(profile.elapsed * 1000, 3),
+    }
+    if file_format == "collapsed":
+        path = os.path.join(directory, f"{name}.collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profile.to_collapsed())
+        with open(os.path.join(directory, f"{name}.meta.json"), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        return path
+
+    path = os.path.join(directory, f"{name}.speedscope.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile.to_speedscope(name, metadata), f, ensure_ascii=False)
+    return path
+
+
+def catalog_size() -> Optional[dict]:
+    """현재 게시된 카탈로그 스냅샷 크기 (아직 불러오지 않았으면 None)"""
+    snapshot = catalog_store.peek()
+    if snapshot is None:
+        return None
+    index = snapshot.index
+    return {
+        "generation": snapshot.generation,
+        "catalog_version": snapshot.catalog_version,
+        "diseases": index.total_diseases,
+        "symptoms": len(index.symptoms),
+        "links": sum(len(links) for links in index.disease_links.values()),
+    }
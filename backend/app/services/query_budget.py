@@ -0,0 +1,93 @@
+"""
+라우트별 SQL 문장 수 예산 선언
+
+    router = APIRouter(prefix=..., route_class=QueryBudgetRoute)
+
+    @router.get("/{disease_id}/symptoms")
+    @query_budget(2)
+    async def get_disease_symptoms(...):
+
+query_budget은 라우터 데코레이터 아래(먼저 적용되는 쪽)에 둡니다.
+요청이 라우트에 도착하면 현재 요청의 SqlStats(MetricsMiddleware가 생성)에 예산을 설정하고,
+초과 처리는 app.services.sql_stats의 QUERY_BUDGET_MODE를 따릅니다.
+QUERY_BUDGET_MODE=enforce에서는 예산을 선언하지 않은 라우트가 있으면 앱 생성 시 실패합니다.
+"""
+import inspect
+from typing import Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.database import release_session_before_response
+from app.services.sql_stats import (
+    QUERY_BUDGET_MODE,
+    QueryBudgetExceeded,
+    current_sql_stats,
+    track_sql,
+)
+
+_UNSET = object()
+
+
+def query_budget(max_statements: Optional[int]) -> Callable:
+    """엔드포인트가 한 요청에서 실행할 수 있는 최대 SQL 문장 수 (None: 입력 크기에 비례해 제한 없음)"""
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_statements
+        return endpoint
+
+    return decorator
+
+
+class QueryBudgetRoute(APIRoute):
+    """
+    엔드포인트에 선언된 SQL 문장 수 예산을 요청마다 적용하는 라우트
+
+    동기 엔드포인트는 release_session_before_response로 감싸 응답 직렬화 전에 세션을 닫습니다.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # APIRoute.__init__에서 get_route_handler()를 호출하므로 먼저 설정
+        budget = getattr(endpoint, "__query_budget__", _UNSET)
+        if budget is _UNSET:
+            if QUERY_BUDGET_MODE == "enforce":
+                raise RuntimeError(f"SQL 문장 예산이 선언되지 않은 라우트: {path}")
+            budget = None
+        self.query_budget = budget
+        if not inspect.iscoroutinefunction(endpoint):
+            # 응답 직렬화용 스레드를 기다리는 동안 DB 연결을 쥐고 있지 않도록 세션을 먼저 닫음
+            endpoint = release_session_before_response(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        budget = self.query_budget
+        if QUERY_BUDGET_MODE == "off" or budget is None:
+            return handler
+        label = f"{','.join(sorted(self.methods))} {self.path}"
+
+        async def budgeted_handler(request: Request):
+            stats = current_sql_stats()
+            if stats is None:
+                # 미들웨어 없이 호출된 경우 (라우트 처리 중에만 집계)
+                with track_sql(budget, label):
+                    return await handler(request)
+            stats.budget = budget
+            stats.route = label
+            return await handler(request)
+
+        return budgeted_handler
+
+
+async def query_budget_exceeded_handler(request: Request, exc: QueryBudgetExceeded):
+    """예산 초과 요청을 실행된 문장 수·문장 표본과 함께 500으로 응답 (enforce 모드)"""
+    return JSONResponse(
+        status_code=500,
+        content={
+            "detail": str(exc),
+            "budget": exc.budget,
+            "count": exc.count,
+            "statements": exc.statements,
+        },
+    )
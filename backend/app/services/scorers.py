@@ -0,0 +1,115 @@
+"""
+예측 점수 계산 방식(scorer) 등록소
+
+scorer는 점수 엔진(SparseScoringEngine) 하나로 만드는 객체로, score() / score_batch()를 제공합니다.
+스냅샷마다 처음 사용할 때 한 번만 생성됩니다 (CatalogSnapshot.scorer).
+질병별 점수가 다른 질병과 무관한 방식(shardable)은 카테고리 샤드 엔진마다 따로 만들어
+카테고리 필터에 사용합니다 (CategoryShards).
+
+- heuristic        : 커버리지 * 평균 확률 * 일치 수 보너스 (기본값, SparseScoringEngine)
+- heuristic_bitset : heuristic과 같은 점수, 일치 수만 질병별 비트셋 AND + popcount로 계산
+                     (증상 겹침이 많은 카탈로그용, benchmarks/bench_bitset.py로 비교)
+- heuristic_lsh    : MinHash/LSH 근사 후보만 heuristic 점수로 재계산 (매우 큰 카탈로그용,
+                     LSH_BANDS/LSH_ROWS로 재현율-속도 조절, benchmarks/bench_lsh.py로 측정,
+                     LSH_MIN_DISEASES보다 작은 카탈로그에서는 heuristic과 같음)
+- naive_bayes      : 증상 존재/부재를 모두 근거로 쓰는 나이브 베이즈 사후 확률 (NaiveBayesScorer)
+
+배포 기본값은 PREDICTION_SCORER 환경 변수로, 요청별로는 PredictRequest.scorer로 선택합니다.
+새 방식은 register_scorer로 (엔진 → scorer) 생성 함수를 등록하면 됩니다.
+"""
+import os
+from typing import Callable, Dict, List, Optional, Protocol, Set
+
+from app.services.bitset import BitsetScorer
+from app.services.lsh import LshScorer
+from app.services.naive_bayes import NaiveBayesScorer
+from app.services.prediction_index import ScoredDisease
+from app.services.sparse_engine import SparseScoringEngine
+
+DEFAULT_SCORER = "heuristic"
+PREDICTION_SCORER = os.getenv("PREDICTION_SCORER", DEFAULT_SCORER)
+
+
+class Scorer(Protocol):
+    def score(
+        self, symptom_ids: List[int], limit: Optional[int] = None, min_score: float = 0.0
+    ) -> List[ScoredDisease]:
+        """입력 증상과 일치하는 질병의 점수 (반올림 점수 내림차순, 동점이면 질병 ID 순)"""
+
+    def score_batch(
+        self,
+        queries: List[List[int]],
+        limits: Optional[List[Optional[int]]] = None,
+        min_scores: Optional[List[float]] = None,
+    ) -> List[List[ScoredDisease]]:
+        """질의별 score() 결과"""
+
+
+ScorerFactory = Callable[[SparseScoringEngine], Scorer]
+
+_registry: Dict[str, ScorerFactory] = {}
+_shardable: Set[str] = set()
+
+
+def register_scorer(
+    name: str, shardable: bool = True
+) -> Callable[[ScorerFactory], ScorerFactory]:
+    """
+    (엔진 → scorer) 생성 함수를 name으로 등록하는 데코레이터
+
+    shardable=False는 점수가 다른 질병에도 의존해(예: 전체 질병으로 정규화)
+    카테고리 샤드별로 나눠 계산할 수 없는 방식입니다.
+    """
+
+    def decorator(factory: ScorerFactory) -> ScorerFactory:
+        _registry[name] = factory
+        if shardable:
+            _shardable.add(name)
+        else:
+            _shardable.discard(name)
+        return factory
+
+    return decorator
+
+
+def available_scorers() -> List[str]:
+    return sorted(_registry)
+
+
+def is_shardable(name: str) -> bool:
+    """카테고리 샤드별로 계산할 수 있는 점수 방식인지 (categories 필터 사용 가능 여부)"""
+    return name in _shardable
+
+
+def resolve_scorer_name(name: Optional[str]) -> str:
+    """요청의 scorer 이름 (지정하지 않으면 배포 기본값)"""
+    return name or PREDICTION_SCORER
+
+
+def create_scorer(name: str, engine: SparseScoringEngine) -> Scorer:
+    factory = _registry.get(name)
+    if factory is None:
+        raise ValueError(f"알 수 없는 점수 계산 방식: {name} (사용 가능: {available_scorers()})")
+    return factory(engine)
+
+
+@register_scorer("heuristic")
+def _heuristic(engine: SparseScoringEngine) -> Scorer:
+    # 증분 유지되는 스냅샷의 엔진을 그대로 사용
+    return engine
+
+
+@register_scorer("heuristic_bitset")
+def _heuristic_bitset(engine: SparseScoringEngine) -> Scorer:
+    return BitsetScorer(engine)
+
+
+@register_scorer("heuristic_lsh")
+def _heuristic_lsh(engine: SparseScoringEngine) -> Scorer:
+    return LshScorer(engine)
+
+
+# 사후 확률은 전체 질병의 가능도로 정규화하므로 샤드별로 나눌 수 없음
+@register_scorer("naive_bayes", shardable=False)
+def _naive_bayes(engine: SparseScoringEngine) -> Scorer:
+    return NaiveBayesScorer(engine)
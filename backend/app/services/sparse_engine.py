@@ -0,0 +1,450 @@
+"""희소 행렬(CSR) 기반 벡터화 예측 점수 계산 엔진"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.services.prediction_index import (
+    DiseaseLink,
+    PredictionIndex,
+    ScoredDisease,
+    score_matches,
+)
+
+# 벡터 점수와 정확한 점수의 오차(~1e-15)가 반올림(소수 4자리) 순위를 바꿀 수 있는 범위
+_RESCORE_MARGIN = 2e-4
+
+
+class SparseScoringEngine:
+    """
+    질병×증상 확률 테이블을 CSR 행렬로 보관하는 점수 계산기.
+
+    - 행: 질병 (index.diseases 순서 = 질병 ID 오름차순)
+    - 열: 증상 (symptom_columns로 Symptom.id → 열 번호 매핑)
+    질의 증상 열만 잘라 합산하면 질병별 일치 수와 확률 합이 한 번에 계산됩니다.
+    """
+
+    def __init__(self, index: PredictionIndex):
+        self.index = index
+        self.disease_ids = np.fromiter(index.diseases, dtype=np.int64, count=len(index.diseases))
+        self.symptom_columns: Dict[int, int] = {
+            symptom_id: col for col, symptom_id in enumerate(index.symptoms)
+        }
+        disease_rows = {disease_id: row for row, disease_id in enumerate(index.diseases)}
+
+        rows, cols, probabilities = [], [], []
+        for disease_id, links in index.disease_links.items():
+            row = disease_rows[disease_id]
+            for link in links:
+                col = self.symptom_columns.get(link.symptom_id)
+                if col is None:
+                    continue
+                rows.append(row)
+                cols.append(col)
+                probabilities.append(link.probability)
+
+        shape = (len(self.disease_ids), len(self.symptom_columns))
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        # 중복 연결은 COO → CSR 변환 시 합산됨 (기존 루프와 동일하게 각각 집계)
+        self.matrix = sparse.csr_matrix(
+            (np.asarray(probabilities, dtype=np.float64), (rows, cols)), shape=shape
+        )
+        self.indicator = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)), shape=shape
+        )
+        # 열 슬라이싱용 CSC 사본
+        self._matrix_by_symptom = self.matrix.tocsc()
+        self._indicator_by_symptom = self.indicator.tocsc()
+
+    @classmethod
+    def from_matrices(
+        cls,
+        index: PredictionIndex,
+        disease_ids: np.ndarray,
+        symptom_ids: np.ndarray,
+        matrix: sparse.csr_matrix,
+        indicator: sparse.csr_matrix,
+        matrix_by_symptom: sparse.csc_matrix,
+        indicator_by_symptom: sparse.csc_matrix,
+    ) -> "SparseScoringEngine":
+        """
+        이미 만들어진 행렬로 엔진 구성 (컴파일된 카탈로그 산출물의 배열을 복사 없이 사용)
+
+        symptom_ids[col]은 col번째 열의 증상 ID입니다.
+        """
+        engine = object.__new__(cls)
+        engine.index = index
+        engine.disease_ids = disease_ids
+        engine.symptom_columns = {
+            symptom_id: col for col, symptom_id in enumerate(symptom_ids.tolist())
+        }
+        engine.matrix = matrix
+        engine.indicator = indicator
+        engine._matrix_by_symptom = matrix_by_symptom
+        engine._indicator_by_symptom = indicator_by_symptom
+        return engine
+
+    def symptom_ids(self) -> np.ndarray:
+        """열 번호 → 증상 ID 배열"""
+        symptom_ids = np.empty(len(self.symptom_columns), dtype=np.int64)
+        for symptom_id, col in self.symptom_columns.items():
+            symptom_ids[col] = symptom_id
+        return symptom_ids
+
+    def clone(self, index: PredictionIndex) -> "SparseScoringEngine":
+        """
+        새 세대 색인을 가리키는 얕은 복사본 생성 (copy-on-write)
+
+        행렬은 refresh_* 에서 새 객체로 교체되므로 공유해도 원본은 변하지 않습니다.
+        """
+        engine = object.__new__(SparseScoringEngine)
+        engine.__dict__.update(self.__dict__)
+        engine.index = index
+        engine.symptom_columns = dict(self.symptom_columns)
+        return engine
+
+    def refresh_disease(self, disease_id: int) -> None:
+        """
+        색인에 반영된 질병 하나의 변경을 행렬의 해당 행에만 적용
+
+        행 데이터만 잘라 붙여 새 배열을 만들고(O(nnz) 메모리 복사), 나머지 행은 다시 계산하지 않습니다.
+        열 슬라이싱용 CSC 사본도 전체 변환 없이 해당 행의 항목만 빼고 끼워 넣습니다.
+        """
+        row = int(np.searchsorted(self.disease_ids, disease_id))
+        exists = row < len(self.disease_ids) and self.disease_ids[row] == disease_id
+        keep = disease_id in self.index.diseases
+
+        if not keep:
+            if not exists:
+                return
+            self.disease_ids = np.delete(self.disease_ids, row)
+            cols = np.empty(0, dtype=np.int32)
+            probabilities = counts = np.empty(0, dtype=np.float64)
+        else:
+            if not exists:
+                self.disease_ids = np.insert(self.disease_ids, row, disease_id)
+            cols, probabilities, counts = self._row_entries(
+                self.index.disease_links.get(disease_id, ())
+            )
+
+        mode = "replace" if exists and keep else ("insert" if keep else "delete")
+        shape = (len(self.disease_ids), len(self.symptom_columns))
+        self._matrix_by_symptom = _splice_column_entries(
+            self._matrix_by_symptom, self.matrix, row, cols, probabilities, mode, shape
+        )
+        self._indicator_by_symptom = _splice_column_entries(
+            self._indicator_by_symptom, self.indicator, row, cols, counts, mode, shape
+        )
+        self.matrix = _splice_row(self.matrix, row, cols, probabilities, mode, shape)
+        self.indicator = _splice_row(self.indicator, row, cols, counts, mode, shape)
+
+    def refresh_symptom(self, symptom_id: int) -> None:
+        """새 증상이면 빈 열 추가 (삭제된 증상의 열은 질의될 수 없으므로 그대로 둠)"""
+        if symptom_id not in self.index.symptoms or symptom_id in self.symptom_columns:
+            return
+        self.symptom_columns[symptom_id] = len(self.symptom_columns)
+        shape = (len(self.disease_ids), len(self.symptom_columns))
+        self.matrix = sparse.csr_matrix(
+            (self.matrix.data, self.matrix.indices, self.matrix.indptr), shape=shape
+        )
+        self.indicator = sparse.csr_matrix(
+            (self.indicator.data, self.indicator.indices, self.indicator.indptr), shape=shape
+        )
+        self._matrix_by_symptom = _append_empty_column(self._matrix_by_symptom, shape)
+        self._indicator_by_symptom = _append_empty_column(self._indicator_by_symptom, shape)
+
+    def entries(self) -> Dict[Tuple[int, int], float]:
+        """(질병 ID, 증상 ID) → 확률 합 (행/열 배치와 무관한 비교용)"""
+        symptom_ids = self.symptom_ids()
+        coo = self.matrix.tocoo()
+        return {
+            (int(d), int(sid)): float(v)
+            for d, sid, v in zip(self.disease_ids[coo.row], symptom_ids[coo.col], coo.data)
+        }
+
+    def _row_entries(
+        self, links: Iterable[DiseaseLink]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """질병 연결 목록 → (정렬된 열 번호, 열별 확률 합, 열별 연결 수)"""
+        pairs = [
+            (self.symptom_columns[link.symptom_id], link.probability)
+            for link in links
+            if link.symptom_id in self.symptom_columns
+        ]
+        if not pairs:
+            return (
+                np.empty(0, dtype=np.int32),
+                np.empty(0, dtype=np.float64),
+                np.empty(0, dtype=np.float64),
+            )
+        cols, inverse = np.unique(
+            np.fromiter((c for c, _ in pairs), dtype=np.int32), return_inverse=True
+        )
+        probabilities = np.bincount(
+            inverse, weights=np.fromiter((p for _, p in pairs), dtype=np.float64)
+        )
+        counts = np.bincount(inverse).astype(np.float64)
+        return cols.astype(np.int32), probabilities, counts
+
+    def _columns(self, symptom_ids: List[int]) -> np.ndarray:
+        return np.fromiter(
+            (self.symptom_columns[sid] for sid in dict.fromkeys(symptom_ids)),
+            dtype=np.int64,
+        )
+
+    def match_counts(self, cols: np.ndarray) -> np.ndarray:
+        """질병별 일치 증상 수 (질의 열의 indicator 합)"""
+        return np.asarray(self._indicator_by_symptom[:, cols].sum(axis=1)).ravel()
+
+    def score(
+        self,
+        symptom_ids: List[int],
+        limit: Optional[int] = None,
+        min_score: float = 0.0,
+        match_counts: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> List[ScoredDisease]:
+        """
+        입력 증상과 일치하는 질병의 점수를 벡터 연산으로 계산 (점수 내림차순)
+
+        반올림 점수가 min_score 미만인 질병은 제외하고 최대 limit개를 반환합니다.
+        symptom_ids는 모두 색인에 존재해야 합니다 (missing_symptom_ids로 사전 검증).
+        match_counts로 일치 수 계산 방식을 바꿀 수 있습니다 (예: SymptomBitsets.match_counts).
+        """
+        cols = self._columns(symptom_ids)
+        match_counts = (match_counts or self.match_counts)(cols)
+        probability_sums = np.asarray(self._matrix_by_symptom[:, cols].sum(axis=1)).ravel()
+
+        rows = np.flatnonzero(match_counts)
+        return self._rank(
+            symptom_ids, rows, match_counts[rows], probability_sums[rows], limit, min_score
+        )
+
+    def score_rows(
+        self,
+        symptom_ids: List[int],
+        rows: np.ndarray,
+        limit: Optional[int] = None,
+        min_score: float = 0.0,
+    ) -> List[ScoredDisease]:
+        """
+        후보 질병 행(rows)만 score()와 같은 방식으로 계산 (근사 후보 생성 뒤 정확한 재계산용)
+
+        질의 열 전체가 아니라 후보 행의 연결만 읽으므로 후보가 적을수록 빠릅니다.
+        """
+        selected = np.zeros(len(self.symptom_columns), dtype=bool)
+        selected[self._columns(symptom_ids)] = True
+        match_counts = _selected_row_sums(self.indicator, rows, selected)
+        probability_sums = _selected_row_sums(self.matrix, rows, selected)
+
+        matched = np.flatnonzero(match_counts)
+        return self._rank(
+            symptom_ids,
+            rows[matched],
+            match_counts[matched],
+            probability_sums[matched],
+            limit,
+            min_score,
+        )
+
+    def score_batch(
+        self,
+        queries: List[List[int]],
+        limits: Optional[List[Optional[int]]] = None,
+        min_scores: Optional[List[float]] = None,
+    ) -> List[List[ScoredDisease]]:
+        """
+        여러 질의를 희소 질의 행렬로 쌓아 한 번의 행렬 곱으로 계산
+
+        queries의 각 증상 ID는 모두 색인에 존재해야 합니다.
+        limits, min_scores는 질의별 설정이며 생략하면 제한 없음으로 처리합니다.
+        """
+        limits = limits or [None] * len(queries)
+        min_scores = min_scores or [0.0] * len(queries)
+        if not queries:
+            return []
+
+        query_rows, query_cols = [], []
+        for i, symptom_ids in enumerate(queries):
+            cols = self._columns(symptom_ids)
+            query_rows.append(np.full(len(cols), i, dtype=np.int64))
+            query_cols.append(cols)
+        query_rows = np.concatenate(query_rows)
+        query_matrix = sparse.csr_matrix(
+            (
+                np.ones(len(query_rows), dtype=np.float64),
+                (query_rows, np.concatenate(query_cols)),
+            ),
+            shape=(len(queries), len(self.symptom_columns)),
+        )
+
+        # (질의 수 × 질병 수) 희소 결과: 일치 수, 확률 합
+        match_counts = (query_matrix @ self.indicator.T).tocsr()
+        probability_sums = (query_matrix @ self.matrix.T).tocsr()
+        match_counts.sort_indices()
+        probability_sums.sort_indices()
+
+        results = []
+        for i, symptom_ids in enumerate(queries):
+            start, end = match_counts.indptr[i], match_counts.indptr[i + 1]
+            rows = match_counts.indices[start:end]
+            counts = match_counts.data[start:end]
+
+            # 확률 0인 연결은 결과에서 빠질 수 있으므로 일치 수 기준 위치에 배치
+            p_start, p_end = probability_sums.indptr[i], probability_sums.indptr[i + 1]
+            sums = np.zeros(len(rows), dtype=np.float64)
+            sums[np.searchsorted(rows, probability_sums.indices[p_start:p_end])] = (
+                probability_sums.data[p_start:p_end]
+            )
+            results.append(
+                self._rank(symptom_ids, rows, counts, sums, limits[i], min_scores[i])
+            )
+        return results
+
+    def _rank(
+        self,
+        symptom_ids: List[int],
+        rows: np.ndarray,
+        counts: np.ndarray,
+        probability_sums: np.ndarray,
+        limit: Optional[int],
+        min_score: float,
+    ) -> List[ScoredDisease]:
+        """일치 수/확률 합으로 최종 점수를 계산하고 상위 결과를 구성"""
+        user_coverage = counts / len(symptom_ids)
+        avg_probability = probability_sums / counts
+        match_count_bonus = 1 + counts * 0.1
+        scores = user_coverage * avg_probability * match_count_bonus
+
+        # 벡터 합산은 기존 루프와 덧셈 순서가 달라 반올림 경계에서 결과가 바뀔 수 있으므로,
+        # 경계 근처(_RESCORE_MARGIN 이내)까지의 후보만 골라 기존 방식으로 다시 계산
+        threshold = min_score - _RESCORE_MARGIN
+        if limit is not None and len(scores) > limit:
+            kth_score = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            threshold = max(threshold, kth_score - _RESCORE_MARGIN)
+        selected = rows[scores >= threshold]
+
+        query = set(symptom_ids)
+        results = [
+            score_matches(
+                self.index.diseases[disease_id],
+                self.index.matched_symptoms(disease_id, query),
+                len(symptom_ids),
+            )
+            for disease_id in self.disease_ids[np.sort(selected)].tolist()
+        ]
+
+        # 반올림 점수 내림차순, 동점이면 질병 ID 순서 유지 (안정 정렬)
+        results.sort(key=lambda r: round(r.score, 4), reverse=True)
+        if min_score > 0:
+            results = [r for r in results if round(r.score, 4) >= min_score]
+        return results[:limit]
+
+
+def _selected_row_sums(
+    matrix: sparse.csr_matrix, rows: np.ndarray, selected: np.ndarray
+) -> np.ndarray:
+    """matrix의 rows 행마다 selected 열 값의 합 (결과 순서는 rows 순서)"""
+    sub = matrix[rows]
+    owners = np.repeat(np.arange(len(rows)), np.diff(sub.indptr))
+    keep = selected[sub.indices]
+    return np.bincount(owners[keep], weights=sub.data[keep], minlength=len(rows))
+
+
+def _splice_row(
+    matrix: sparse.csr_matrix,
+    row: int,
+    cols: np.ndarray,
+    values: np.ndarray,
+    mode: str,
+    shape: tuple,
+) -> sparse.csr_matrix:
+    """CSR 행렬의 한 행을 교체/삽입/삭제한 새 행렬 생성 (원본은 수정하지 않음)"""
+    indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+    start = indptr[row]
+    end = indptr[row + 1] if mode != "insert" else start
+    removed = end - start
+    added = len(cols) if mode != "delete" else 0
+
+    new_indices = np.concatenate((indices[:start], cols, indices[end:])).astype(indices.dtype)
+    new_data = np.concatenate((data[:start], values, data[end:]))
+    if mode == "replace":
+        new_indptr = indptr.copy()
+        new_indptr[row + 1:] += added - removed
+    elif mode == "insert":
+        new_indptr = np.concatenate((indptr[: row + 1], indptr[row:] + added))
+    else:
+        new_indptr = np.concatenate((indptr[:row], indptr[row + 1:] - removed))
+    return sparse.csr_matrix((new_data, new_indices, new_indptr), shape=shape)
+
+
+def _splice_column_entries(
+    by_symptom: sparse.csc_matrix,
+    by_disease: sparse.csr_matrix,
+    row: int,
+    cols: np.ndarray,
+    values: np.ndarray,
+    mode: str,
+    shape: tuple,
+) -> sparse.csc_matrix:
+    """
+    CSC 사본에 _splice_row와 같은 행 변경을 적용한 새 행렬 생성 (원본은 수정하지 않음)
+
+    by_disease는 변경 전 CSR 행렬로, 빠질 항목의 열 번호를 읽는 데 사용합니다.
+    열마다 행 번호가 정렬된 상태를 유지하며 tocsc()처럼 전체를 다시 정렬하지 않습니다.
+    """
+    indptr, indices, data = by_symptom.indptr, by_symptom.indices, by_symptom.data
+    if mode == "insert":
+        old_cols = np.empty(0, dtype=np.int64)
+    else:
+        old_cols = by_disease.indices[by_disease.indptr[row]:by_disease.indptr[row + 1]]
+    if mode == "delete":
+        cols = np.empty(0, dtype=np.int64)
+
+    # 1. 변경 전 행의 항목 제거 (열 안에서 행 번호로 위치 탐색)
+    removed = np.fromiter(
+        (
+            indptr[col] + np.searchsorted(indices[indptr[col]:indptr[col + 1]], row)
+            for col in old_cols.tolist()
+        ),
+        dtype=np.int64,
+        count=len(old_cols),
+    )
+    new_indices = np.delete(indices, removed)
+    new_data = np.delete(data, removed)
+    column_delta = np.zeros(shape[1], dtype=np.int64)
+    np.subtract.at(column_delta, old_cols, 1)
+    new_indptr = indptr + np.concatenate(([0], np.cumsum(column_delta)))
+
+    # 2. 행 삽입/삭제로 뒤쪽 행 번호 이동
+    if mode == "insert":
+        new_indices[new_indices >= row] += 1
+    elif mode == "delete":
+        new_indices[new_indices > row] -= 1
+
+    # 3. 변경 후 행의 항목을 각 열의 정렬 위치에 삽입
+    if len(cols):
+        positions = np.fromiter(
+            (
+                new_indptr[col]
+                + np.searchsorted(new_indices[new_indptr[col]:new_indptr[col + 1]], row)
+                for col in cols.tolist()
+            ),
+            dtype=np.int64,
+            count=len(cols),
+        )
+        new_indices = np.insert(new_indices, positions, row)
+        new_data = np.insert(new_data, positions, values)
+        column_delta = np.zeros(shape[1], dtype=np.int64)
+        np.add.at(column_delta, cols, 1)
+        new_indptr = new_indptr + np.concatenate(([0], np.cumsum(column_delta)))
+
+    return sparse.csc_matrix(
+        (new_data, new_indices, new_indptr.astype(indptr.dtype)), shape=shape
+    )
+
+
+def _append_empty_column(by_symptom: sparse.csc_matrix, shape: tuple) -> sparse.csc_matrix:
+    """CSC 행렬 끝에 빈 열 추가 (데이터 배열은 공유)"""
+    indptr = np.append(by_symptom.indptr, by_symptom.indptr[-1])
+    return sparse.csc_matrix((by_symptom.data, by_symptom.indices, indptr), shape=shape)
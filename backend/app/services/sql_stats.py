@@ -0,0 +1,169 @@
+"""
+요청별 SQL 실행 통계 및 문장 수 예산
+
+SQLAlchemy 엔진 이벤트(before/after_cursor_execute)로 문장 수와 DB 시간을 모읍니다.
+현재 요청의 집계 객체는 ContextVar에 두므로 스레드 풀에서 실행되는 동기 라우트
+(anyio가 컨텍스트를 복사)와 aiosqlite 비동기 세션(greenlet이 컨텍스트를 이어받음)
+모두 같은 요청으로 집계됩니다.
+
+집계 객체에 예산(budget)이 있으면 문장을 실행하기 전에 확인해, 예산을 넘는 문장에서
+QUERY_BUDGET_MODE에 따라 처리합니다.
+- enforce : QueryBudgetExceeded 발생 (테스트/스테이징 - 요청이 실패하고 문장 목록을 보여줌)
+- log     : 요청마다 한 번 경고 로그 (기본값, 운영)
+- off     : 확인하지 않음
+
+문장 텍스트는 요청당 처음 SQL_STATEMENT_SAMPLE개만 보관하고(스트리밍처럼 문장 수가
+입력에 비례하는 요청에서도 메모리가 늘지 않도록), 전체 문장 수는 count로 셉니다.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log")
+
+# 요청당 보관하는 문장 텍스트 수 (예산 초과 보고용 표본)
+SQL_STATEMENT_SAMPLE = 20
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """요청이 선언된 SQL 문장 수 예산을 넘음"""
+
+    def __init__(self, route: Optional[str], budget: int, count: int, statements: List[str]):
+        super().__init__(
+            f"SQL 문장 예산 초과 ({route or '알 수 없는 경로'}: 예산 {budget}개, "
+            f"{count}번째 문장에서 중단)"
+        )
+        self.route = route
+        self.budget = budget
+        self.count = count
+        # 처음 SQL_STATEMENT_SAMPLE개 (중단된 문장 포함)
+        self.statements = statements
+
+
+class SqlStats:
+    """한 요청(또는 구간)에서 실행된 SQL 집계"""
+
+    __slots__ = (
+        "count", "seconds", "statements", "budget", "route", "budgeted", "exempt", "reported"
+    )
+
+    def __init__(self, budget: Optional[int] = None, route: Optional[str] = None):
+        self.count = 0
+        self.seconds = 0.0
+        # 처음 SQL_STATEMENT_SAMPLE개 문장 (전체 수는 count)
+        self.statements: List[str] = []
+        # 예산 (None이면 제한 없음)과 예산에 포함된 문장 수
+        self.budget = budget
+        self.route = route
+        self.budgeted = 0
+        # budget_exempt() 중첩 깊이 (카탈로그 재적재처럼 요청과 무관한 문장)
+        self.exempt = 0
+        self.reported = False
+
+
+_current: ContextVar[Optional[SqlStats]] = ContextVar("sql_stats", default=None)
+
+
+def current_sql_stats() -> Optional[SqlStats]:
+    """현재 집계 중인 SqlStats (집계 구간 밖이면 None)"""
+    return _current.get()
+
+
+@contextmanager
+def track_sql(budget: Optional[int] = None, route: Optional[str] = None) -> Iterator[SqlStats]:
+    """with 블록 안에서 실행되는 SQL을 새 SqlStats에 집계 (budget: 최대 문장 수)"""
+    stats = SqlStats(budget, route)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def budget_exempt() -> Iterator[None]:
+    """with 블록 안의 문장은 집계하되 현재 요청의 예산에서 제외"""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    stats.exempt += 1
+    try:
+        yield
+    finally:
+        stats.exempt -= 1
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    if stats.budget is not None and not stats.exempt:
+        stats.budgeted += 1
+        if stats.budgeted > stats.budget:
+            _over_budget(stats, statement)
+    conn.info.setdefault("sql_stats_started", []).append(time.perf_counter())
+
+
+def _over_budget(stats: SqlStats, statement: str) -> None:
+    if QUERY_BUDGET_MODE == "enforce":
+        raise QueryBudgetExceeded(
+            stats.route, stats.budget, stats.count + 1, _sample_with(stats, statement)
+        )
+    if QUERY_BUDGET_MODE == "log" and not stats.reported:
+        stats.reported = True
+        logger.warning(
+            "SQL 문장 예산 초과 (%s: 예산 %d개, %d번째 문장)\n%s",
+            stats.route, stats.budget, stats.count + 1,
+            "\n".join(_sample_with(stats, statement)),
+        )
+
+
+def _sample_with(stats: SqlStats, statement: str) -> List[str]:
+    """보관 중인 문장 표본 + 예산을 넘은 문장 (표본이 가득 찼으면 마지막 자리를 대신함)"""
+    return stats.statements[: SQL_STATEMENT_SAMPLE - 1] + [statement]
+
+
+def _record(stats: SqlStats, statement: str) -> None:
+    stats.count += 1
+    if len(stats.statements) < SQL_STATEMENT_SAMPLE:
+        stats.statements.append(statement)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("sql_stats_started")
+    if started:
+        stats.seconds += time.perf_counter() - started.pop()
+    _record(stats, statement)
+
+
+def _handle_error(exception_context):
+    # 실패한 문장도 시작 시각을 꺼내 다음 문장의 시간 계산이 어긋나지 않도록 함
+    conn = exception_context.connection
+    stats = _current.get()
+    if conn is None or stats is None:
+        return
+    started = conn.info.get("sql_stats_started")
+    if started:
+        stats.seconds += time.perf_counter() - started.pop()
+    _record(stats, exception_context.statement or "")
+
+
+def instrument_engine(engine: Engine) -> None:
+    """엔진에 SQL 집계 이벤트 등록 (여러 번 호출해도 한 번만 등록)"""
+    if event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
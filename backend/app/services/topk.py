@@ -0,0 +1,196 @@
+"""점수 상한 기반 가지치기 top-k 검색 (WAND/MaxScore 방식)"""
+import bisect
+import heapq
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from app.services.prediction_index import (
+    DiseaseLink,
+    Posting,
+    PredictionIndex,
+    ScoredDisease,
+    score_matches,
+)
+
+# 부동소수점 합산 순서 차이로 상한이 실제 점수보다 작아지지 않도록 여유를 둠
+_BOUND_SLACK = 1 + 1e-9
+
+
+class TermPostings(NamedTuple):
+    """증상 하나의 질병 ID 오름차순 포스팅 (같은 질병의 중복 연결은 합산)"""
+
+    disease_ids: List[int]
+    probability_sums: List[float]
+    max_probability_sum: float
+    max_count: int
+
+
+class SearchStats(NamedTuple):
+    """가지치기 검색 통계"""
+
+    candidates: int  # 입력 증상과 하나 이상 일치하는 질병 수
+    fully_scored: int  # 실제 점수를 계산한 질병 수
+    pruned: int  # 상한 검사로 제외된 질병 수
+
+
+class PrunedTopKRetriever:
+    """
+    질병별/증상별 점수 상한으로 후보를 건너뛰는 top-k 검색기.
+
+    점수 = (확률 합 / 입력 증상 수) * (1 + 일치 수 * 0.1) 이므로
+    - 증상별 상한: 해당 증상 포스팅의 최대 확률 * (1 + 최대 일치 수 * 0.1) / 입력 증상 수
+    - 질병별 상한: 일치 가능 수 * 질병의 최대 확률 / 입력 증상 수 * (1 + 일치 가능 수 * 0.1)
+    포스팅을 질병 ID 순서로 병합하면서(DAAT) 증상별 상한 합이 현재 k번째 점수를
+    넘지 못하는 구간은 건너뛰고(WAND), 피벗 질병도 질병별 상한을 통과해야만 전체 점수를 계산합니다.
+    """
+
+    def __init__(self, index: PredictionIndex):
+        self.index = index
+
+        self.terms: Dict[int, TermPostings] = {
+            symptom_id: _term_postings(postings)
+            for symptom_id, postings in index.postings.items()
+        }
+
+        # 질병별 상한 계산용 집계: (연결 수, 최대 확률)
+        self.disease_bounds: Dict[int, Tuple[int, float]] = {
+            disease_id: _disease_bound(links)
+            for disease_id, links in index.disease_links.items()
+            if links
+        }
+
+    def clone(self, index: PredictionIndex) -> "PrunedTopKRetriever":
+        """새 세대 색인을 가리키는 얕은 복사본 생성 (copy-on-write)"""
+        retriever = object.__new__(PrunedTopKRetriever)
+        retriever.index = index
+        retriever.terms = dict(self.terms)
+        retriever.disease_bounds = dict(self.disease_bounds)
+        return retriever
+
+    def refresh_disease(self, disease_id: int, symptom_ids: Iterable[int]) -> None:
+        """색인에 반영된 질병 변경을 영향받은 증상 포스팅과 해당 질병 집계에만 적용"""
+        for symptom_id in symptom_ids:
+            postings = self.index.postings.get(symptom_id)
+            if postings:
+                self.terms[symptom_id] = _term_postings(postings)
+            else:
+                self.terms.pop(symptom_id, None)
+
+        links = self.index.disease_links.get(disease_id)
+        if links:
+            self.disease_bounds[disease_id] = _disease_bound(links)
+        else:
+            self.disease_bounds.pop(disease_id, None)
+
+    def _disease_upper_bound(
+        self, disease_id: int, max_matches: int, query_size: int
+    ) -> float:
+        link_count, max_probability = self.disease_bounds[disease_id]
+        matches = min(max_matches, link_count)
+        return matches * max_probability / query_size * (1 + matches * 0.1) * _BOUND_SLACK
+
+    def search(
+        self, symptom_ids: List[int], top_k: int, min_score: float = 0.0
+    ) -> Tuple[List[ScoredDisease], SearchStats]:
+        """
+        상위 top_k개 질병과 검색 통계 반환
+
+        symptom_ids는 모두 색인에 존재해야 합니다.
+        결과 순서는 전체 점수 계산 후 정렬한 결과와 동일합니다 (동점이면 질병 ID 순).
+        """
+        query_size = len(symptom_ids)
+        query = set(symptom_ids)
+        terms = [self.terms[sid] for sid in dict.fromkeys(symptom_ids) if sid in self.terms]
+        candidates = len(set().union(*(t.disease_ids for t in terms)))
+
+        max_matches = sum(t.max_count for t in terms)
+        bonus_bound = (1 + max_matches * 0.1) / query_size
+        # 커서: [현재 위치, 증상 포스팅, 증상별 상한]
+        cursors = [[0, t, t.max_probability_sum * bonus_bound * _BOUND_SLACK] for t in terms]
+
+        heap: List[tuple] = []  # (반올림 점수, -질병 ID) 최소 힙
+        scored: Dict[int, ScoredDisease] = {}
+
+        def can_enter(upper_bound: float) -> bool:
+            bound = round(upper_bound, 4)
+            if len(heap) < top_k:
+                return bound >= min_score
+            # 이후 질병은 ID가 더 크므로 동점으로는 진입할 수 없음
+            return bound > heap[0][0]
+
+        def current(cursor) -> int:
+            return cursor[1].disease_ids[cursor[0]]
+
+        # 커서는 현재 질병 ID 순서로 유지 (이동한 커서만 제자리에 다시 끼워 넣음)
+        cursors.sort(key=current)
+        while cursors:
+            # 피벗: 앞에서부터 증상별 상한을 누적해 처음으로 진입 가능해지는 커서
+            accumulated = 0.0
+            pivot = None
+            for i, (_, _, term_bound) in enumerate(cursors):
+                accumulated += term_bound
+                if can_enter(accumulated):
+                    pivot = i
+                    break
+            if pivot is None:
+                break
+
+            pivot_disease = current(cursors[pivot])
+            if current(cursors[0]) == pivot_disease:
+                upper_bound = self._disease_upper_bound(pivot_disease, max_matches, query_size)
+                if can_enter(upper_bound):
+                    result = score_matches(
+                        self.index.diseases[pivot_disease],
+                        self.index.matched_symptoms(pivot_disease, query),
+                        query_size,
+                    )
+                    scored[pivot_disease] = result
+                    if can_enter(result.score):
+                        entry = (round(result.score, 4), -pivot_disease)
+                        if len(heap) < top_k:
+                            heapq.heappush(heap, entry)
+                        else:
+                            heapq.heapreplace(heap, entry)
+                advance_to = pivot_disease + 1
+                # 피벗 질병에 있는 커서는 정렬 순서상 맨 앞에 모여 있음
+                moving = pivot + 1
+                while moving < len(cursors) and current(cursors[moving]) == pivot_disease:
+                    moving += 1
+            else:
+                advance_to = pivot_disease
+                moving = pivot
+
+            advancing, cursors = cursors[:moving], cursors[moving:]
+            for cursor in advancing:
+                cursor[0] = bisect.bisect_left(cursor[1].disease_ids, advance_to, cursor[0])
+                if cursor[0] < len(cursor[1].disease_ids):
+                    bisect.insort(cursors, cursor, key=current)
+
+        ranked = sorted(heap, key=lambda e: (-e[0], -e[1]))
+        results = [scored[-disease_id] for _, disease_id in ranked]
+        stats = SearchStats(
+            candidates=candidates,
+            fully_scored=len(scored),
+            pruned=candidates - len(scored),
+        )
+        return results, stats
+
+
+def _term_postings(postings: List[Posting]) -> TermPostings:
+    """포스팅 리스트 → 질병 ID 오름차순 집계 (같은 질병의 중복 연결은 합산)"""
+    sums: Dict[int, float] = {}
+    counts: Dict[int, int] = {}
+    for posting in postings:
+        disease_id = posting.disease_id
+        sums[disease_id] = sums.get(disease_id, 0.0) + posting.probability
+        counts[disease_id] = counts.get(disease_id, 0) + 1
+    disease_ids = sorted(sums)
+    return TermPostings(
+        disease_ids=disease_ids,
+        probability_sums=[sums[d] for d in disease_ids],
+        max_probability_sum=max(sums.values()),
+        max_count=max(counts.values()),
+    )
+
+
+def _disease_bound(links: List[DiseaseLink]) -> Tuple[int, float]:
+    return len(links), max(link.probability for link in links)
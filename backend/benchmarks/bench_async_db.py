@@ -0,0 +1,312 @@
+"""
+동기(스레드 풀) vs 비동기(aiosqlite) 읽기 경로 벤치마크
+
+비교 대상 (각각 uvicorn 워커 1개로 실행):
+- sync  : 이 파일의 sync_app - 예전처럼 동기 def + SessionLocal (anyio 스레드 풀에서 실행)
+- async : app.main:app - async def + AsyncSession
+두 서버에 같은 요청 목록을 동시 클라이언트 200개로 보내 p50/p99 지연 시간과 처리량을 비교합니다.
+
+요청 구성 (순서대로 반복):
+  GET /api/symptoms/, GET /api/diseases/, GET /api/diseases/{id}/symptoms,
+  GET /api/diseases/categories, POST /api/predict
+
+실행: python benchmarks/bench_async_db.py [요청 수] [동시 클라이언트 수]
+"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, get_db, release_session_before_response
+from app.models import Disease, DiseaseSymptom, Symptom
+from app.routers.prediction import _predict
+from app.services.prediction import estimate_response_bytes
+from app.schemas import (
+    DiseaseResponse,
+    DiseaseSymptomResponse,
+    PredictRequest,
+    PredictResponse,
+    SymptomInfo,
+    SymptomResponse,
+)
+from app.services.catalog import get_catalog_snapshot
+from app.services.prediction_cache import normalize_symptom_ids, prediction_cache
+
+# ==================== 비교용 동기 앱 (이전 구현) ====================
+
+class _SessionReleasingRoute(APIRoute):
+    """app.main과 같이 응답 직렬화 전에 세션을 닫는 라우트 (연결 풀 상한에서 교착 방지)"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, release_session_before_response(endpoint), **kwargs)
+
+
+sync_app = FastAPI()
+sync_app.router.route_class = _SessionReleasingRoute
+
+
+@sync_app.get("/api/health")
+def sync_health():
+    return {"status": "ok"}
+
+
+@sync_app.get("/api/symptoms/", response_model=list[SymptomResponse])
+def sync_get_symptoms(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return db.query(Symptom).offset(skip).limit(limit).all()
+
+
+@sync_app.get("/api/diseases/categories")
+def sync_get_categories(db: Session = Depends(get_db)):
+    categories = db.query(Disease.category).distinct().all()
+    return {"categories": [c[0] for c in categories if c[0]]}
+
+
+@sync_app.get("/api/diseases/", response_model=list[DiseaseResponse])
+def sync_get_diseases(
+    skip: int = 0, limit: int = 100, category: str | None = None, db: Session = Depends(get_db)
+):
+    query = db.query(Disease)
+    if category:
+        query = query.filter(Disease.category == category)
+    return query.offset(skip).limit(limit).all()
+
+
+@sync_app.get("/api/diseases/{disease_id}/symptoms", response_model=DiseaseSymptomResponse)
+def sync_get_disease_symptoms(disease_id: int, db: Session = Depends(get_db)):
+    disease = db.query(Disease).filter(Disease.id == disease_id).first()
+    if not disease:
+        raise HTTPException(status_code=404, detail="질병을 찾을 수 없습니다")
+    symptom_infos = []
+    for ds in db.query(DiseaseSymptom).filter(DiseaseSymptom.disease_id == disease_id).all():
+        symptom = db.query(Symptom).filter(Symptom.id == ds.symptom_id).first()
+        if symptom:
+            symptom_infos.append(
+                SymptomInfo(
+                    symptom_id=symptom.id,
+                    symptom_name=symptom.name,
+                    probability=ds.probability,
+                    is_primary=ds.is_primary,
+                )
+            )
+    return DiseaseSymptomResponse(
+        disease_id=disease.id, disease_name=disease.name, symptoms=symptom_infos
+    )
+
+
+@sync_app.post("/api/predict", response_model=PredictResponse)
+def sync_predict(request: PredictRequest, db: Session = Depends(get_db)):
+    snapshot = get_catalog_snapshot(db)
+    invalid_ids = snapshot.index.missing_symptom_ids(request.symptom_ids)
+    if invalid_ids:
+        raise HTTPException(status_code=404, detail=f"존재하지 않는 증상 ID: {list(invalid_ids)}")
+    cache_key = (
+        normalize_symptom_ids(request.symptom_ids),
+        len(request.symptom_ids),
+        request.top_k,
+        request.min_score,
+        request.pruning,
+        False,
+    )
+    cached = prediction_cache.get(cache_key, snapshot.generation)
+    if cached is not None:
+        return cached
+    response = _predict(request, snapshot)
+    prediction_cache.put(
+        cache_key, response, estimate_response_bytes(response), snapshot.generation
+    )
+    return response
+
+
+# ==================== 부하 생성 ====================
+
+
+def _requests(count: int):
+    """(method, path, json) 요청 목록 (증상 1~6개 무작위 예측 포함)"""
+    db = SessionLocal()
+    try:
+        symptom_ids = [row.id for row in db.query(Symptom.id)]
+        disease_ids = [row.id for row in db.query(Disease.id)]
+    finally:
+        db.close()
+
+    rng = random.Random(42)
+    templates = [
+        lambda: ("GET", "/api/symptoms/?limit=100", None),
+        lambda: ("GET", "/api/diseases/?limit=100", None),
+        lambda: ("GET", f"/api/diseases/{rng.choice(disease_ids)}/symptoms", None),
+        lambda: ("GET", "/api/diseases/categories", None),
+        lambda: (
+            "POST",
+            "/api/predict",
+            {"symptom_ids": rng.sample(symptom_ids, rng.randint(1, 6))},
+        ),
+    ]
+    return [templates[i % len(templates)]() for i in range(count)]
+
+
+def _start_server(app_path: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", app_path,
+            "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+            "--port", str(port), "--log-level", "critical",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"{app_path} 서버가 시작되지 않았습니다")
+
+
+class _Connection:
+    """
+    keep-alive HTTP/1.1 연결 하나 (클라이언트 1개)
+
+    httpx 연결 풀은 연결 수가 수백 개가 되면 클라이언트 쪽이 먼저 병목이 되므로
+    요청/응답만 주고받는 최소 구현을 사용합니다.
+    """
+
+    def __init__(self, port: int):
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method: str, path: str, body: Optional[bytes]) -> int:
+        """요청을 보내고 응답 본문까지 읽은 뒤 상태 코드 반환"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self.writer.write(head.encode("ascii") + b"\r\n" + (body or b""))
+
+        header_block = await self.reader.readuntil(b"\r\n\r\n")
+        lines = header_block.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = dict(
+            line.split(":", 1) for line in lines[1:] if ":" in line
+        )
+        headers = {k.strip().lower(): v.strip().lower() for k, v in headers.items()}
+        await self.reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection") == "close":
+            self.close()
+        return status
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def _route(path: str) -> str:
+    """/api/diseases/3/symptoms?x → /api/diseases/{id}/symptoms"""
+    parts = path.split("?", 1)[0].split("/")
+    return "/".join("{id}" if part.isdigit() else part for part in parts)
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[max(int(len(samples) * 0.99) - 1, 0)]
+
+
+async def _run_load(port: int, requests, concurrency: int):
+    """
+    동시 클라이언트 concurrency개가 요청 목록을 나눠 보냄
+
+    (경로별 성공한 요청의 지연 시간 ms 목록, 경과 초, 실패 수)를 반환합니다.
+    """
+    queue = list(reversed(requests))
+    latencies, failures = defaultdict(list), 0
+
+    async def client():
+        nonlocal failures
+        connection = _Connection(port)
+        while queue:
+            method, path, body = queue.pop()
+            payload = json.dumps(body).encode("utf-8") if body is not None else None
+            for attempt in range(2):
+                start = time.perf_counter()
+                try:
+                    status = await connection.request(method, path, payload)
+                    break
+                except (OSError, asyncio.IncompleteReadError):
+                    # 500 응답 뒤 서버가 닫은 keep-alive 연결: 다시 연결해 한 번 재시도
+                    connection.close()
+            else:
+                failures += 1
+                continue
+            latencies[_route(path)].append((time.perf_counter() - start) * 1000)
+            if status >= 500:
+                failures += 1
+        connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return latencies, elapsed, failures
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    requests = _requests(count)
+
+    print("=" * 60)
+    print(f"요청 {count}개, 동시 클라이언트 {concurrency}개")
+    print("=" * 60)
+
+    results = {}
+    for label, app_path, port in (
+        ("sync", "bench_async_db:sync_app", 8701),
+        ("async", "app.main:app", 8702),
+    ):
+        server = _start_server(app_path, port)
+        try:
+            # 워밍업 (카탈로그 스냅샷 로드, 연결 풀 생성)
+            asyncio.run(_run_load(port, requests[:200], 20))
+            by_route, elapsed, failures = asyncio.run(_run_load(port, requests, concurrency))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+        latencies = [ms for samples in by_route.values() for ms in samples]
+        p50, p99 = _percentiles(latencies)
+        results[label] = (p50, p99, len(latencies) / elapsed)
+        print(f"[{label}] p50 {p50:8.1f}ms   p99 {p99:8.1f}ms   "
+              f"{results[label][2]:8.1f} req/s   실패 {failures}")
+        for route, samples in sorted(by_route.items()):
+            route_p50, route_p99 = _percentiles(samples)
+            print(f"    {route:<32} p50 {route_p50:8.1f}ms   p99 {route_p99:8.1f}ms")
+
+    print("-" * 60)
+    print(f"p99 sync / async : {results['sync'][1] / results['async'][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+일치 수 계산 표현 비교: 객체 / CSR 희소 행렬 / 비트셋
+
+카탈로그마다 질병-증상 연결을 세 가지 표현으로 만들어
+- 질병당 메모리 (객체: PredictionIndex.disease_links, CSR: 엔진의 indicator 열 행렬,
+                 비트셋: SymptomBitsets)
+- 증상 수별 일치 수 계산 시간 (CSR 열 합 vs 비트셋 AND + popcount)
+을 출력하고, 더 빠른 표현(heuristic / heuristic_bitset 점수 방식)을 알려줍니다.
+
+카탈로그: 실제 시드 DB(real), bench_predict.py의 합성 카탈로그(1k/10k/100k),
+          증상 겹침이 많은 합성 카탈로그(dense-10k/dense-100k: 증상 256개, 질병당 20~60개)
+
+실행: python benchmarks/bench_bitset.py [--catalogs real 10k dense-10k] [--queries 200]
+                                        [--sizes 1 5 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_predict import SYNTHETIC_CATALOGS, _catalog_dir  # noqa: E402
+
+# 이름: (질병 수, 증상 수, 질병당 최소 증상 수, 최대 증상 수)
+DENSE_CATALOGS = {
+    "dense-10k": (10_000, 256, 20, 60),
+    "dense-100k": (100_000, 256, 20, 60),
+}
+
+
+def _database_path(name: str, cache_dir: str) -> str:
+    if name not in DENSE_CATALOGS:
+        return os.path.join(_catalog_dir(name, cache_dir), "app.db")
+
+    from sqlalchemy import create_engine
+
+    from app.cli.seed_synthetic import generate_catalog
+
+    diseases, symptoms, min_symptoms, max_symptoms = DENSE_CATALOGS[name]
+    directory = os.path.join(
+        cache_dir, f"synthetic-{diseases}-{symptoms}-{min_symptoms}-{max_symptoms}"
+    )
+    path = os.path.join(directory, "app.db")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        print(f"[{name}] 합성 카탈로그 생성 중...", flush=True)
+        partial = path + ".partial"
+        bind = create_engine(f"sqlite:///{partial}")
+        try:
+            generate_catalog(
+                bind, diseases=diseases, symptoms=symptoms,
+                min_symptoms=min_symptoms, max_symptoms=max_symptoms,
+            )
+        finally:
+            bind.dispose()
+        os.replace(partial, path)
+    return path
+
+
+def _deep_size(root) -> int:
+    """root에서 도달 가능한 객체들의 sys.getsizeof 합 (공유 객체는 한 번만)"""
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    return total
+
+
+def _median_us(func, workload) -> float:
+    samples = []
+    for cols in workload:
+        start = time.perf_counter()
+        func(cols)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def _measure(name: str, path: str, queries: int, sizes) -> None:
+    import numpy as np
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.services.bitset import SymptomBitsets
+    from app.services.prediction_index import PredictionIndex
+    from app.services.sparse_engine import SparseScoringEngine
+
+    bind = create_engine(f"sqlite:///{path}")
+    try:
+        with Session(bind) as db:
+            index = PredictionIndex.build(db)
+    finally:
+        bind.dispose()
+    engine = SparseScoringEngine(index)
+    bitsets = SymptomBitsets(engine)
+
+    diseases = len(engine.disease_ids)
+    csc = engine._indicator_by_symptom
+    links = csc.nnz
+    memory = {
+        "객체": _deep_size(index.disease_links),
+        "CSR": csc.data.nbytes + csc.indices.nbytes + csc.indptr.nbytes,
+        "비트셋": bitsets.nbytes,
+    }
+
+    print("=" * 60)
+    print(
+        f"[{name}] 질병 {diseases:,}개, 증상 {len(engine.symptom_columns):,}개, "
+        f"연결 {links:,}개 (질병당 {links / max(diseases, 1):.1f}개)"
+    )
+    print("=" * 60)
+    print("질병당 메모리:")
+    for layout, size in memory.items():
+        per_disease = size / max(diseases, 1)
+        print(f"  {layout:<6} {per_disease:>10.1f} bytes  (전체 {size / 2**20:,.1f} MiB)")
+
+    print(f"일치 수 계산 시간 (중앙값, 질의 {queries}개):")
+    print(f"  {'증상':>4} {'CSR':>10} {'비트셋':>10}  더 빠른 표현")
+    rng = random.Random(42)
+    columns = list(engine.symptom_columns.values())
+    for size in sizes:
+        workload = [
+            np.asarray(rng.sample(columns, min(size, len(columns))), dtype=np.int64)
+            for _ in range(queries)
+        ]
+        for cols in workload[:10]:
+            engine.match_counts(cols)
+            bitsets.match_counts(cols)
+        csr_us = _median_us(engine.match_counts, workload)
+        bitset_us = _median_us(bitsets.match_counts, workload)
+        faster = "heuristic_bitset" if bitset_us < csr_us else "heuristic"
+        print(f"  {size:>4} {csr_us:>8.1f}us {bitset_us:>8.1f}us  {faster}")
+
+
+def main():
+    catalogs = ["real", *SYNTHETIC_CATALOGS, *DENSE_CATALOGS]
+    parser = argparse.ArgumentParser(description="일치 수 계산 표현(객체/CSR/비트셋) 비교")
+    parser.add_argument(
+        "--catalogs", nargs="+", default=["real", "10k", "dense-10k"], choices=catalogs
+    )
+    parser.add_argument("--queries", type=int, default=200, help="증상 수별 질의 수")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument(
+        "--cache-dir", default=os.path.join(tempfile.gettempdir(), "prediction-bench")
+    )
+    args = parser.parse_args()
+
+    for name in args.catalogs:
+        _measure(name, _database_path(name, args.cache_dir), args.queries, args.sizes)
+
+
+if __name__ == "__main__":
+    main()
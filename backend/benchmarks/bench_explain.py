@@ -0,0 +1,82 @@
+"""
+explain 모드 오버헤드 벤치마크
+
+비교 대상:
+- default : explain=false (기본 경로)
+- explain : explain=true (질병별 점수 계산 내역 포함)
+- prints  : 예전 predict_disease처럼 일치한 모든 질병마다 print() 7회 (stdout → /dev/null)
+
+실행: python benchmarks/bench_explain.py [반복 횟수]
+"""
+import contextlib
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import SessionLocal
+from app.services.prediction import build_response
+from app.services.catalog import get_catalog_snapshot
+
+
+def _legacy_prints(snapshot, symptom_ids):
+    """예전 디버깅 로그와 같은 양의 stdout 쓰기"""
+    for scored in snapshot.engine.score(symptom_ids):
+        print(f"질병: {scored.disease.name}")
+        print(f"  일치 증상: {len(scored.matched)}/{len(symptom_ids)}")
+        print(f"  사용자 커버리지: {scored.user_coverage:.2f}")
+        print(f"  평균 확률: {scored.avg_probability:.2f}")
+        print(f"  가중치 보너스: {scored.match_count_bonus:.2f}")
+        print(f"  최종 점수: {scored.score:.4f}")
+        print()
+    return build_response(snapshot.engine.score(symptom_ids, 3), snapshot)
+
+
+def _time(fn, queries):
+    """질의별 소요 시간(us)의 (p50, p99)"""
+    samples = []
+    for symptom_ids in queries:
+        start = time.perf_counter()
+        fn(symptom_ids)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    db = SessionLocal()
+    snapshot = get_catalog_snapshot(db)
+    db.close()
+
+    symptom_ids = list(snapshot.index.symptoms)
+    rng = random.Random(42)
+    queries = [rng.sample(symptom_ids, rng.randint(1, 6)) for _ in range(iterations)]
+
+    print("=" * 60)
+    print(f"질병 {snapshot.index.total_diseases}개, 증상 {len(symptom_ids)}개, 질의 {iterations}개")
+    print("=" * 60)
+
+    engine = snapshot.engine
+    results = {
+        "default": _time(lambda q: build_response(engine.score(q, 3), snapshot), queries),
+        "explain": _time(
+            lambda q: build_response(engine.score(q, 3), snapshot, explain=True), queries
+        ),
+    }
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results["prints"] = _time(lambda q: _legacy_prints(snapshot, q), queries)
+
+    for label, (p50, p99) in results.items():
+        print(f"  {label:<8} p50 {p50:8.1f}us   p99 {p99:8.1f}us")
+    print("-" * 60)
+    default = results["default"][0]
+    print(f"explain / default : {results['explain'][0] / default:.2f}x")
+    print(f"prints  / default : {results['prints'][0] / default:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+오타 허용 증상 검색(SymptomFuzzyIndex)의 속도와 정확도 측정
+
+증상 수 × n-gram 길이마다
+- 생성   : 색인 생성 시간
+- 갱신   : 증상 하나 이름 변경 반영(clone + refresh_symptom) 시간 중앙값
+- 검색   : 오타 질의 검색 시간 p50/p95
+- top1/top5 : 오타를 내기 전 원래 증상이 1위 / 5위 안에 든 비율
+를 출력합니다.
+
+증상 이름: 시드 DB 증상 이름의 음절을 무작위로 2~5개 이어 붙인 합성 이름
+          (bench_predict.py의 합성 카탈로그는 증상 이름이 "합성증상000001" 형태라 쓰지 않음)
+오타 질의: 카탈로그 증상 하나를 골라 음절 하나의 중성 또는 종성을 무작위로 바꾼 이름
+
+실행: python benchmarks/bench_fuzzy.py [--sizes 1000 10000 100000] [--ngrams 2 3] [--queries 1000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+_HANGUL_FIRST = 0xAC00
+
+
+def _syllables():
+    from app.database import SessionLocal
+    from app.models import Symptom
+
+    db = SessionLocal()
+    try:
+        names = [name for (name,) in db.query(Symptom.name)]
+    finally:
+        db.close()
+    return [char for name in names for char in name if "가" <= char <= "힣"] or ["가"]
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    """음절 하나의 중성 또는 종성을 다른 값으로 바꾼 이름"""
+    position = rng.randrange(len(name))
+    initial, rest = divmod(ord(name[position]) - _HANGUL_FIRST, 21 * 28)
+    medial, final = divmod(rest, 28)
+    if rng.random() < 0.5:
+        medial = rng.choice([m for m in range(21) if m != medial])
+    else:
+        final = rng.choice([f for f in range(28) if f != final])
+    changed = chr(_HANGUL_FIRST + (initial * 21 + medial) * 28 + final)
+    return name[:position] + changed + name[position + 1:]
+
+
+def _measure(size: int, n: int, queries: int, syllables) -> None:
+    from app.services.fuzzy import SymptomFuzzyIndex
+    from app.services.prediction_index import PredictionIndex
+
+    rng = random.Random(42)
+    symptoms = {}
+    seen = set()
+    while len(symptoms) < size:
+        name = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 5)))
+        if name not in seen:
+            seen.add(name)
+            symptoms[len(symptoms) + 1] = name
+    index = PredictionIndex({}, symptoms, {}, {})
+
+    start = time.perf_counter()
+    fuzzy = SymptomFuzzyIndex(index, n)
+    build = time.perf_counter() - start
+
+    refresh_samples = []
+    for _ in range(50):
+        symptom_id = rng.choice(list(symptoms))
+        renamed = PredictionIndex({}, dict(symptoms), {}, {})
+        renamed.symptoms[symptom_id] = _typo(symptoms[symptom_id], rng)
+        start = time.perf_counter()
+        clone = fuzzy.clone(renamed)
+        clone.refresh_symptom(symptom_id)
+        refresh_samples.append((time.perf_counter() - start) * 1000)
+
+    samples, top1, top5 = [], 0, 0
+    for _ in range(queries):
+        symptom_id = rng.choice(list(symptoms))
+        query = _typo(symptoms[symptom_id], rng)
+        start = time.perf_counter()
+        results = fuzzy.search(query, 5)
+        samples.append((time.perf_counter() - start) * 1000)
+        found = [match.symptom_id for match in results]
+        top1 += found[:1] == [symptom_id]
+        top5 += symptom_id in found
+
+    samples.sort()
+    print(
+        f"  {size:>7,} {n:>3} {build:>7.2f}s {statistics.median(refresh_samples):>7.3f}ms "
+        f"{samples[len(samples) // 2]:>7.3f}ms {samples[int(len(samples) * 0.95)]:>7.3f}ms "
+        f"{top1 / queries:>6.3f} {top5 / queries:>6.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오타 허용 증상 검색 속도·정확도 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--ngrams", type=int, nargs="+", default=[2, 3])
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    syllables = _syllables()
+    print("=" * 60)
+    print(f"오타 허용 증상 검색 (음절 {len(set(syllables))}종, 질의 {args.queries}개)")
+    print("=" * 60)
+    print(f"  {'증상':>7} {'n':>3} {'생성':>8} {'갱신':>9} {'p50':>9} {'p95':>9} {'top1':>6} {'top5':>6}")
+    for size in args.sizes:
+        for n in args.ngrams:
+            _measure(size, n, args.queries, syllables)
+
+
+if __name__ == "__main__":
+    main()
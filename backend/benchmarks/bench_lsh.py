@@ -0,0 +1,146 @@
+"""
+MinHash/LSH 근사 후보 생성(heuristic_lsh)의 재현율과 속도 측정
+
+카탈로그 × LSH 설정(밴드 수 × 밴드당 해시 수) × 증상 수마다
+- recall@3 : 정확한 predict_disease 결과(heuristic 점수, top_k=3) 중 LSH 결과에도 든 비율
+- 시간     : 정확한 계산(SparseScoringEngine.score) / LSH(LshScorer.score) 중앙값과 속도 향상
+- 색인     : LSH 색인 생성 시간과 메모리
+를 출력합니다. 밴드 수를 늘리거나 밴드당 해시 수를 줄이면 재현율이, 반대로 하면 속도가 오릅니다.
+(LshScorer는 후보 재계산이 전체 계산보다 비쌀 것으로 보이면 정확한 계산을 그대로 사용하며,
+ 작은 카탈로그도 LSH 경로를 측정하도록 LSH_MIN_DISEASES는 적용하지 않음)
+
+질의: disease - 무작위 질병 하나의 증상 중 일부 (실제 환자 입력과 비슷한 경우, 기본값)
+      random  - 전체 증상 중 무작위 (bench_predict.py와 같은 방식)
+카탈로그: 실제 시드 DB(real), bench_predict.py의 합성 카탈로그(1k/10k/100k),
+          bench_bitset.py의 증상 겹침이 많은 합성 카탈로그(dense-10k/dense-100k)
+
+실행: python benchmarks/bench_lsh.py [--catalogs 100k dense-100k] [--configs 16x2 32x3 32x4]
+                                     [--sizes 3 10 20] [--queries 200] [--workload disease]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_bitset import DENSE_CATALOGS, _database_path  # noqa: E402
+from bench_predict import SYNTHETIC_CATALOGS  # noqa: E402
+
+TOP_K = 3
+
+
+def _config(value: str):
+    try:
+        bands, rows = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'밴드수x해시수' 형식이어야 합니다: {value}")
+    return bands, rows
+
+
+def _workload(index, size: int, queries: int, kind: str, rng: random.Random):
+    symptom_ids = list(index.symptoms)
+    if kind == "random":
+        return [rng.sample(symptom_ids, min(size, len(symptom_ids))) for _ in range(queries)]
+    disease_ids = [d for d, links in index.disease_links.items() if links]
+    workload = []
+    for _ in range(queries):
+        links = index.disease_links[rng.choice(disease_ids)]
+        links = list(dict.fromkeys(link.symptom_id for link in links))
+        workload.append(rng.sample(links, min(size, len(links))))
+    return workload
+
+
+def _timed(func, workload):
+    results, samples = [], []
+    for symptom_ids in workload:
+        start = time.perf_counter()
+        results.append(func(symptom_ids, TOP_K))
+        samples.append((time.perf_counter() - start) * 1000)
+    return results, statistics.median(samples)
+
+
+def _measure(name: str, path: str, configs, sizes, queries: int, kind: str) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.services.lsh import LshScorer
+    from app.services.prediction_index import PredictionIndex
+    from app.services.sparse_engine import SparseScoringEngine
+
+    bind = create_engine(f"sqlite:///{path}")
+    try:
+        with Session(bind) as db:
+            index = PredictionIndex.build(db)
+    finally:
+        bind.dispose()
+    engine = SparseScoringEngine(index)
+
+    print("=" * 60)
+    print(
+        f"[{name}] 질병 {len(engine.disease_ids):,}개, 증상 {len(engine.symptom_columns):,}개, "
+        f"연결 {engine.indicator.nnz:,}개 (질의: {kind})"
+    )
+    print("=" * 60)
+
+    scorers = {}
+    for bands, rows in configs:
+        start = time.perf_counter()
+        scorers[(bands, rows)] = LshScorer(engine, bands, rows, min_diseases=0)
+        elapsed = time.perf_counter() - start
+        size = scorers[(bands, rows)].lsh.nbytes
+        print(f"  LSH {bands}x{rows}: 생성 {elapsed:.2f}s, 색인 {size / 2**20:,.1f} MiB")
+
+    print(f"  {'증상':>4} {'설정':>6} {'recall@3':>9} {'정확':>9} {'LSH':>9} {'속도':>6}")
+    rng = random.Random(42)
+    for size in sizes:
+        workload = _workload(index, size, queries, kind, rng)
+        exact, exact_ms = _timed(engine.score, workload)
+        for (bands, rows), scorer in scorers.items():
+            approximate, lsh_ms = _timed(scorer.score, workload)
+            recalls = []
+            for expected, got in zip(exact, approximate):
+                expected_ids = {r.disease.id for r in expected}
+                if expected_ids:
+                    recalls.append(
+                        len(expected_ids & {r.disease.id for r in got}) / len(expected_ids)
+                    )
+            recall = statistics.mean(recalls) if recalls else 1.0
+            print(
+                f"  {size:>4} {f'{bands}x{rows}':>6} {recall:>9.3f} "
+                f"{exact_ms:>7.3f}ms {lsh_ms:>7.3f}ms {exact_ms / lsh_ms:>5.2f}x"
+            )
+
+
+def main():
+    catalogs = ["real", *SYNTHETIC_CATALOGS, *DENSE_CATALOGS]
+    parser = argparse.ArgumentParser(description="MinHash/LSH 후보 생성 재현율·속도 측정")
+    parser.add_argument(
+        "--catalogs", nargs="+", default=["100k", "dense-100k"], choices=catalogs
+    )
+    parser.add_argument(
+        "--configs", nargs="+", type=_config, default=[(16, 2), (32, 3), (32, 4), (16, 5)],
+        help="LSH 설정 (밴드수x밴드당해시수)",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 10, 20])
+    parser.add_argument("--queries", type=int, default=200, help="증상 수별 질의 수")
+    parser.add_argument("--workload", choices=["disease", "random"], default="disease")
+    parser.add_argument(
+        "--cache-dir", default=os.path.join(tempfile.gettempdir(), "prediction-bench")
+    )
+    args = parser.parse_args()
+
+    for name in args.catalogs:
+        _measure(
+            name, _database_path(name, args.cache_dir),
+            args.configs, args.sizes, args.queries, args.workload,
+        )
+
+
+if __name__ == "__main__":
+    main()
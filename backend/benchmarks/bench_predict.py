@@ -0,0 +1,329 @@
+"""
+질병 예측 벤치마크 (회귀 기준선 비교 포함)
+
+측정 대상 (카탈로그 × 점수 계산 방식(scorer) × pruning × 방식 × 증상 수마다):
+- api  : TestClient로 POST /api/predict 전체 경로 (결과 캐시는 요청마다 비움)
+- core : _predict 직접 호출 (HTTP/검증/캐시 제외, 점수 계산 + 응답 생성)
+scorer는 app.services.scorers에 등록된 방식 (기본: 전부)
+heuristic은 pruning=false(벡터 연산 엔진)와 pruning=true(점수 상한 가지치기 top-k)를 모두 측정
+카탈로그: 실제 시드 DB(real)와 합성 카탈로그 1k/10k/100k
+          (app.cli.seed_synthetic으로 생성해 캐시 디렉터리에 보관, 인자가 같으면 재사용)
+
+카탈로그마다 그 DB가 ./app.db가 되도록 작업 디렉터리를 바꾼 자식 프로세스에서 측정하므로
+앱 코드를 수정하지 않고 같은 설정(산출물 mmap, 카탈로그 버전 확인 포함)으로 실행됩니다.
+
+결과는 JSON 파일로 저장하며, 다음 경우 해당 항목을 출력하고 종료 코드 1로 끝납니다.
+- 200이 아닌 응답(errors)이 있는 항목 (기준선과 무관, --update-baseline도 저장하지 않음)
+- 기준선보다 p50/p95가 threshold 비율 넘게 느려진 항목
+- 기준선보다 요청당 최대 SQL 문장 수(sql_max)가 늘어난 항목 (N+1 회귀 - 허용 비율 없음)
+
+실행: python benchmarks/bench_predict.py [--catalogs real 1k 10k 100k] [--queries 200]
+                                         [--sizes 1 2 5 10 20] [--scorers heuristic naive_bayes]
+                                         [--threshold 0.2] [--update-baseline]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 이름: (질병 수, 증상 수) - 질병당 증상 5~15개, Zipf 1.1, seed 42
+SYNTHETIC_CATALOGS = {
+    "1k": (1_000, 500),
+    "10k": (10_000, 2_000),
+    "100k": (100_000, 5_000),
+}
+
+# p50/p95 비교 (p99는 실행마다 편차가 커서 기록만 함)
+COMPARED_METRICS = ("p50_ms", "p95_ms")
+# 기준선보다 하나라도 많으면 실패 (지연과 달리 실행마다 편차가 없음)
+COMPARED_SQL_METRICS = ("sql_max",)
+
+
+def _percentile(samples, q: float) -> float:
+    return samples[min(int(len(samples) * q), len(samples) - 1)]
+
+
+def _summary(samples_ms, elapsed: float, statements, errors: int) -> dict:
+    samples_ms = sorted(samples_ms)
+    return {
+        "p50_ms": round(statistics.median(samples_ms), 4),
+        "p95_ms": round(_percentile(samples_ms, 0.95), 4),
+        "p99_ms": round(_percentile(samples_ms, 0.99), 4),
+        "throughput_rps": round(len(samples_ms) / elapsed, 1),
+        "sql_per_request": round(statistics.mean(statements), 3),
+        "sql_max": max(statements),
+        "errors": errors,
+    }
+
+
+# ==================== 자식 프로세스: 카탈로그 하나 측정 ====================
+
+
+def _measure(queries: int, sizes, scorers) -> dict:
+    """작업 디렉터리의 app.db로 측정한 결과 목록"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, func, select
+
+    from app.database import SessionLocal, async_engine, engine
+    from app.main import app
+    from app.models import Disease, DiseaseSymptom
+    from app.routers.prediction import _predict
+    from app.schemas import PredictRequest
+    from app.services.catalog import get_catalog_snapshot
+    from app.services.prediction_cache import prediction_cache
+    from app.services.scorers import DEFAULT_SCORER
+
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    db = SessionLocal()
+    try:
+        disease_count = db.scalar(select(func.count(Disease.id)))
+        link_count = db.scalar(select(func.count(DiseaseSymptom.id)))
+    finally:
+        db.close()
+
+    results = []
+    with TestClient(app, raise_server_exceptions=False) as client:
+        db = SessionLocal()
+        try:
+            snapshot = get_catalog_snapshot(db)
+        finally:
+            db.close()
+        symptom_ids = list(snapshot.index.symptoms)
+
+        variants = [(scorer, False) for scorer in scorers]
+        if DEFAULT_SCORER in scorers:
+            variants.insert(scorers.index(DEFAULT_SCORER) + 1, (DEFAULT_SCORER, True))
+        for scorer, pruning in variants:
+            # 점수 방식마다 같은 질의 (파생 구조 생성 시간은 측정에서 제외)
+            rng = random.Random(42)
+            if pruning:
+                snapshot.retriever
+            else:
+                snapshot.scorer(scorer)
+            options = {"scorer": scorer, "pruning": pruning}
+            for size in sizes:
+                count = min(size, len(symptom_ids))
+                workload = [rng.sample(symptom_ids, count) for _ in range(queries)]
+                # 워밍업 (첫 요청의 지연 초기화 제외)
+                for query in workload[:10]:
+                    client.post("/api/predict", json={"symptom_ids": query, **options})
+
+                samples, counts, errors = [], [], 0
+                started = time.perf_counter()
+                for query in workload:
+                    prediction_cache.clear()
+                    before = statements[0]
+                    start = time.perf_counter()
+                    response = client.post(
+                        "/api/predict", json={"symptom_ids": query, **options}
+                    )
+                    samples.append((time.perf_counter() - start) * 1000)
+                    counts.append(statements[0] - before)
+                    errors += response.status_code != 200
+                results.append({
+                    "scorer": scorer, "pruning": pruning, "mode": "api", "symptoms": size,
+                    **_summary(samples, time.perf_counter() - started, counts, errors),
+                })
+
+                samples, counts, errors = [], [], 0
+                started = time.perf_counter()
+                for query in workload:
+                    request = PredictRequest(symptom_ids=query, **options)
+                    before = statements[0]
+                    start = time.perf_counter()
+                    _predict(request, snapshot)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    counts.append(statements[0] - before)
+                results.append({
+                    "scorer": scorer, "pruning": pruning, "mode": "core", "symptoms": size,
+                    **_summary(samples, time.perf_counter() - started, counts, errors),
+                })
+
+    return {"diseases": disease_count, "links": link_count, "results": results}
+
+
+# ==================== 부모 프로세스 ====================
+
+
+def _catalog_dir(name: str, cache_dir: str) -> str:
+    """카탈로그의 app.db가 있는 디렉터리 (합성 카탈로그는 없으면 생성)"""
+    if name == "real":
+        return BACKEND_DIR
+
+    from sqlalchemy import create_engine
+
+    from app.cli.seed_synthetic import generate_catalog
+
+    diseases, symptoms = SYNTHETIC_CATALOGS[name]
+    directory = os.path.join(cache_dir, f"synthetic-{diseases}-{symptoms}")
+    if not os.path.exists(os.path.join(directory, "app.db")):
+        os.makedirs(directory, exist_ok=True)
+        print(f"[{name}] 합성 카탈로그 생성 중...", flush=True)
+        partial = os.path.join(directory, "app.db.partial")
+        bind = create_engine(f"sqlite:///{partial}")
+        try:
+            generate_catalog(bind, diseases=diseases, symptoms=symptoms)
+        finally:
+            bind.dispose()
+        os.replace(partial, os.path.join(directory, "app.db"))
+    return directory
+
+
+def _run_catalog(name: str, directory: str, queries: int, sizes, scorers) -> dict:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker",
+         "--queries", str(queries), "--sizes", *map(str, sizes), "--scorers", *scorers],
+        cwd=directory, env=env, check=True, stdout=subprocess.PIPE, text=True,
+    ).stdout
+    measured = json.loads(output.strip().splitlines()[-1])
+    for row in measured["results"]:
+        row.update(catalog=name, diseases=measured["diseases"], links=measured["links"])
+    return measured
+
+
+def _key(row: dict) -> str:
+    # scorer가 없는 기준선은 점수 방식 추가 이전의 heuristic 결과 (pruning이 없으면 false)
+    scorer = row.get("scorer", "heuristic") + ("+pruning" if row.get("pruning") else "")
+    return f"{row['catalog']}/{scorer}/{row['mode']}/{row['symptoms']}"
+
+
+def _failed_requests(results):
+    """200이 아닌 응답이 있는 (항목, 오류 수) 목록"""
+    return [(_key(row), row["errors"]) for row in results if row["errors"]]
+
+
+def _regressions(results, baseline, threshold: float):
+    """
+    기준선보다 threshold 비율 넘게 느려졌거나 SQL 문장 수가 늘어난
+    (항목, 지표, 기준값, 현재값) 목록
+    """
+    previous = {_key(row): row for row in baseline["results"]}
+    found = []
+    for row in results:
+        base = previous.get(_key(row))
+        if base is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if row[metric] > base[metric] * (1 + threshold):
+                found.append((_key(row), metric, base[metric], row[metric]))
+        for metric in COMPARED_SQL_METRICS:
+            if metric in base and row[metric] > base[metric]:
+                found.append((_key(row), metric, base[metric], row[metric]))
+    return found
+
+
+def _format_metric(metric: str, value) -> str:
+    return f"{value:.2f}ms" if metric.endswith("_ms") else f"{value}개"
+
+
+def main():
+    from app.services.scorers import available_scorers
+
+    parser = argparse.ArgumentParser(description="질병 예측 벤치마크")
+    parser.add_argument(
+        "--catalogs", nargs="+", default=["real", *SYNTHETIC_CATALOGS],
+        choices=["real", *SYNTHETIC_CATALOGS],
+    )
+    parser.add_argument("--queries", type=int, default=200, help="증상 수별 질의 수")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    parser.add_argument(
+        "--scorers", nargs="+", default=available_scorers(), choices=available_scorers()
+    )
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "predict.json"))
+    parser.add_argument(
+        "--baseline", default=os.path.join(RESULTS_DIR, "predict-baseline.json")
+    )
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 지연 증가 비율")
+    parser.add_argument("--update-baseline", action="store_true", help="이번 결과를 기준선으로 저장")
+    parser.add_argument(
+        "--cache-dir", default=os.path.join(tempfile.gettempdir(), "prediction-bench")
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_measure(args.queries, args.sizes, args.scorers)))
+        return
+
+    results = []
+    for name in args.catalogs:
+        directory = _catalog_dir(name, args.cache_dir)
+        measured = _run_catalog(name, directory, args.queries, args.sizes, args.scorers)
+        results.extend(measured["results"])
+
+        print("=" * 60)
+        print(f"[{name}] 질병 {measured['diseases']:,}개, 연결 {measured['links']:,}개")
+        print("=" * 60)
+        print(
+            f"{'scorer':<12}{'pruning':<8}{'방식':<6}{'증상':>4} {'p50':>9} {'p95':>9} {'p99':>9} "
+            f"{'req/s':>9} {'SQL':>6} {'오류':>5}"
+        )
+        for row in measured["results"]:
+            print(
+                f"{row['scorer']:<12}{str(row['pruning']).lower():<8}{row['mode']:<6}{row['symptoms']:>4} "
+                f"{row['p50_ms']:>7.2f}ms {row['p95_ms']:>7.2f}ms {row['p99_ms']:>7.2f}ms "
+                f"{row['throughput_rps']:>9.1f} {row['sql_per_request']:>6.2f} {row['errors']:>5}"
+            )
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "queries": args.queries,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {args.output}")
+
+    failed = _failed_requests(results)
+    if failed:
+        print("\n[실패] 200이 아닌 응답이 있는 항목:")
+        for key, errors in failed:
+            print(f"  {key:<36} {errors}건")
+        sys.exit(1)
+
+    if args.update_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"기준선 갱신: {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("기준선 없음 (--update-baseline으로 저장)")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = _regressions(results, json.load(f), args.threshold)
+    if regressions:
+        print(f"\n[실패] 기준선 대비 {args.threshold:.0%} 넘게 느려졌거나 SQL 문장이 늘어난 항목:")
+        for key, metric, before, after in regressions:
+            print(
+                f"  {key:<36} {metric} "
+                f"{_format_metric(metric, before)} → {_format_metric(metric, after)}"
+            )
+        sys.exit(1)
+    print(f"기준선 대비 {args.threshold:.0%} 넘게 느려졌거나 SQL 문장이 늘어난 항목 없음")
+
+
+if __name__ == "__main__":
+    main()
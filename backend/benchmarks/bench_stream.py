@@ -0,0 +1,152 @@
+"""
+NDJSON 스트리밍 일괄 예측(/api/predict/stream) 벤치마크
+
+입력 줄 수를 늘려 가며 처리량(rows/s)과 서버 프로세스의 최대 RSS를 측정합니다.
+입력 크기와 무관하게 RSS가 일정해야 합니다.
+
+클라이언트는 chunked 인코딩으로 입력을 보내면서 동시에 응답을 읽습니다.
+(입력을 다 보낸 뒤에야 응답을 읽는 클라이언트는 역압 때문에 입력 전송이 멈춥니다)
+
+실행: python benchmarks/bench_stream.py [줄 수 ...]   (기본: 10000 100000 300000)
+"""
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.database import SessionLocal
+from app.models import Symptom
+
+PORT = 8731
+CHUNK_BYTES = 64 * 1024
+
+
+def _rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+class _RssSampler(threading.Thread):
+    """서버 프로세스 RSS 최대값 기록"""
+
+    def __init__(self, pid: int):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak_kb = 0
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak_kb = max(self.peak_kb, _rss_kb(self.pid))
+            time.sleep(0.05)
+
+
+def _lines(count: int, symptom_ids):
+    """입력 NDJSON 줄을 필요할 때마다 생성 (클라이언트 메모리도 일정)"""
+    rng = random.Random(42)
+    for _ in range(count):
+        query = {"symptom_ids": rng.sample(symptom_ids, rng.randint(1, 6))}
+        yield json.dumps(query).encode("utf-8") + b"\n"
+
+
+async def _stream(count: int, symptom_ids) -> int:
+    """입력을 보내면서 응답 줄을 세고, 받은 결과 줄 수 반환"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    writer.write(
+        b"POST /api/predict/stream HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        b"Content-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n"
+    )
+
+    async def send():
+        buffer = []
+        size = 0
+        for line in _lines(count, symptom_ids):
+            buffer.append(line)
+            size += len(line)
+            if size >= CHUNK_BYTES:
+                writer.write(b"%x\r\n%s\r\n" % (size, b"".join(buffer)))
+                await writer.drain()
+                buffer, size = [], 0
+        if buffer:
+            writer.write(b"%x\r\n%s\r\n" % (size, b"".join(buffer)))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def receive() -> int:
+        await reader.readuntil(b"\r\n\r\n")
+        received = 0
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                break
+            received += (await reader.readexactly(size)).count(b"\n")
+            await reader.readexactly(2)
+        return received
+
+    _, received = await asyncio.gather(send(), receive())
+    writer.close()
+    return received
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 300000]
+    db = SessionLocal()
+    try:
+        symptom_ids = [row.id for row in db.query(Symptom.id)]
+    finally:
+        db.close()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                httpx.get(f"http://127.0.0.1:{PORT}/api/health", timeout=1)
+                break
+            except httpx.HTTPError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.2)
+        asyncio.run(_stream(1000, symptom_ids))  # 워밍업
+
+        print("=" * 60)
+        print(f"{'줄 수':>10} {'rows/s':>10} {'결과 줄':>10} {'최대 RSS':>12}")
+        print("=" * 60)
+        for count in counts:
+            sampler = _RssSampler(server.pid)
+            sampler.start()
+            started = time.perf_counter()
+            received = asyncio.run(_stream(count, symptom_ids))
+            elapsed = time.perf_counter() - started
+            sampler.running = False
+            sampler.join()
+            print(
+                f"{count:>10,} {count / elapsed:>10,.0f} {received:>10,} "
+                f"{sampler.peak_kb / 1024:>10.1f}MB"
+            )
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+if __name__ == "__main__":
+    main()
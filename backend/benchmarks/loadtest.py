@@ -0,0 +1,429 @@
+"""
+로컬 동시 부하 테스트 (혼합 트래픽, 개방 루프)
+
+외부 부하 서비스 없이 배포 전에 app.main:app의 동시 처리 특성을 확인합니다.
+- 대상 DB를 임시 디렉터리로 복사해 그곳에서 uvicorn을 띄우므로 쓰기 요청이 원본을 바꾸지 않음
+- 개방 루프: 요청 i는 응답과 무관하게 예정 시각(목표 RPS 기준)에 시작하며,
+  지연 시간은 예정 시각부터 재므로 서버가 밀리면 대기 시간까지 지연에 포함됨
+- 경로별 HDR 방식 지연 히스토그램(2의 거듭제곱 구간마다 64칸, 상대 오차 약 1.6%),
+  오류율, SQLite 잠금 오류 수 집계
+
+트래픽 구성 (--mix 이름=비율,...):
+  predict          POST /api/predict (증상 1~6개 무작위)
+  symptoms         GET  /api/symptoms/
+  diseases         GET  /api/diseases/
+  disease_symptoms GET  /api/diseases/{id}/symptoms
+  categories       GET  /api/diseases/categories
+  write            POST /api/diseases/{id}/symptoms (기존 연결의 확률을 무작위로 갱신)
+
+실행: python benchmarks/loadtest.py [--rps 200] [--duration 30]
+                                    [--mix predict=80,symptoms=15,write=5]
+                                    [--workers 1] [--database app.db] [--output 결과.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# 서버가 SQLite 잠금 오류를 표시하는 응답 헤더 (create_app 참고)
+LOCK_ERROR_HEADER = "x-loadtest-error"
+
+DEFAULT_MIX = "predict=80,symptoms=15,write=5"
+REPORTED_PERCENTILES = (50, 90, 99, 99.9)
+
+
+def create_app():
+    """
+    (서버 프로세스) uvicorn --factory 대상
+
+    app.main:app에 sqlalchemy OperationalError 처리기만 추가해, 잠금 오류로 끝난 요청을
+    헤더로 구분할 수 있게 합니다. (기본 처리에서는 다른 500 오류와 구별되지 않음)
+    """
+    from fastapi.responses import JSONResponse
+    from sqlalchemy.exc import OperationalError
+
+    from app.main import app
+
+    async def operational_error(request, exc: OperationalError):
+        kind = "sqlite-locked" if "database is locked" in str(exc) else "sqlite-error"
+        return JSONResponse(
+            status_code=500, content={"detail": kind}, headers={LOCK_ERROR_HEADER: kind}
+        )
+
+    app.add_exception_handler(OperationalError, operational_error)
+    return app
+
+
+# ==================== 히스토그램 ====================
+
+
+class LatencyHistogram:
+    """
+    HDR 방식 지연 시간 히스토그램 (us 단위 정수)
+
+    값 v를 상위 7비트로 구간화: v < 128은 그대로, 그 이상은 2^m 단위로 내림.
+    기록은 O(1), 메모리는 값의 범위에 대해 로그 크기입니다.
+    """
+
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self):
+        self.counts: Dict[Tuple[int, int], int] = defaultdict(int)
+        self.total = 0
+        self.max_us = 0
+
+    def record(self, value_us: int) -> None:
+        shift = max(value_us.bit_length() - self.SUB_BUCKET_BITS, 0)
+        self.counts[(shift, value_us >> shift)] += 1
+        self.total += 1
+        self.max_us = max(self.max_us, value_us)
+
+    def percentile(self, percent: float) -> int:
+        """percent 백분위 값 (구간 상한)"""
+        if not self.total:
+            return 0
+        threshold = self.total * percent / 100
+        seen = 0
+        for shift, sub in sorted(self.counts, key=lambda key: key[1] << key[0]):
+            seen += self.counts[(shift, sub)]
+            if seen >= threshold:
+                return min(((sub + 1) << shift) - 1, self.max_us)
+        return self.max_us
+
+    def buckets(self):
+        """(구간 하한 us, 개수) 목록 - 결과 파일용"""
+        return sorted(((sub << shift, count) for (shift, sub), count in self.counts.items()))
+
+
+class RouteStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.lock_errors = 0
+        self.status_codes: Dict[int, int] = defaultdict(int)
+
+
+# ==================== 클라이언트 ====================
+
+
+class _Connection:
+    """keep-alive HTTP/1.1 연결 하나"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method: str, path: str, body: Optional[bytes]) -> Tuple[int, dict]:
+        """요청을 보내고 응답 본문까지 읽은 뒤 (상태 코드, 헤더) 반환"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self.writer.write(head.encode("ascii") + b"\r\n" + (body or b""))
+
+        header_block = await self.reader.readuntil(b"\r\n\r\n")
+        lines = header_block.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip().lower()
+        await self.reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection") == "close":
+            self.close()
+        return status, headers
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class _ConnectionPool:
+    """최대 size개 연결을 재사용 (모두 사용 중이면 반납될 때까지 대기)"""
+
+    def __init__(self, port: int, size: int):
+        self.port = port
+        self.idle = asyncio.Queue()
+        self.available = asyncio.Semaphore(size)
+
+    async def acquire(self) -> _Connection:
+        await self.available.acquire()
+        return self.idle.get_nowait() if not self.idle.empty() else _Connection(self.port)
+
+    def release(self, connection: _Connection) -> None:
+        self.idle.put_nowait(connection)
+        self.available.release()
+
+    def close(self) -> None:
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+# ==================== 트래픽 ====================
+
+
+def _catalog(database: str):
+    """요청 생성에 필요한 ID 목록 (증상, 질병, (질병, 증상) 연결)"""
+    conn = sqlite3.connect(database)
+    try:
+        symptom_ids = [row[0] for row in conn.execute("SELECT id FROM symptoms")]
+        disease_ids = [row[0] for row in conn.execute("SELECT id FROM diseases")]
+        links = conn.execute("SELECT disease_id, symptom_id FROM disease_symptoms").fetchall()
+    finally:
+        conn.close()
+    return symptom_ids, disease_ids, links
+
+
+def _scenarios(database: str, rng: random.Random):
+    """이름 → (경로 표기, 요청 생성 함수)"""
+    symptom_ids, disease_ids, links = _catalog(database)
+
+    def write():
+        disease_id, symptom_id = rng.choice(links)
+        body = {
+            "symptom_id": symptom_id,
+            "probability": round(rng.uniform(0.1, 0.9), 2),
+            "is_primary": rng.random() < 0.3,
+        }
+        return "POST", f"/api/diseases/{disease_id}/symptoms", body
+
+    return {
+        "predict": (
+            "POST /api/predict",
+            lambda: (
+                "POST", "/api/predict",
+                {"symptom_ids": rng.sample(symptom_ids, rng.randint(1, min(6, len(symptom_ids))))},
+            ),
+        ),
+        "symptoms": ("GET /api/symptoms/", lambda: ("GET", "/api/symptoms/", None)),
+        "diseases": ("GET /api/diseases/", lambda: ("GET", "/api/diseases/", None)),
+        "disease_symptoms": (
+            "GET /api/diseases/{id}/symptoms",
+            lambda: ("GET", f"/api/diseases/{rng.choice(disease_ids)}/symptoms", None),
+        ),
+        "categories": (
+            "GET /api/diseases/categories", lambda: ("GET", "/api/diseases/categories", None)
+        ),
+        "write": ("POST /api/diseases/{id}/symptoms", write),
+    }
+
+
+def _parse_mix(text: str, names) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in names:
+            raise argparse.ArgumentTypeError(f"알 수 없는 트래픽 종류: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+async def _run(port: int, scenarios, mix, rps: float, duration: float, connections: int,
+               timeout: float, rng: random.Random):
+    """개방 루프로 요청을 보내고 (경로별 통계, 실제 경과 초, 밀린 최대 ms) 반환"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+    pool = _ConnectionPool(port, connections)
+    tasks = set()
+    max_lag_ms = 0.0
+
+    async def send(route: str, method: str, path: str, body, scheduled: float):
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        route_stats = stats[route]
+        status, headers = 0, {}
+        # 제한 시간은 예정 시각부터 (연결 대기 포함) - 과부하여도 실행 시간이 늘어나지 않음
+        deadline = scheduled + timeout
+        try:
+            connection = await asyncio.wait_for(pool.acquire(), deadline - time.perf_counter())
+        except asyncio.TimeoutError:
+            connection = None
+        try:
+            for attempt in range(2 if connection else 0):
+                try:
+                    status, headers = await asyncio.wait_for(
+                        connection.request(method, path, payload), deadline - time.perf_counter()
+                    )
+                    break
+                except (OSError, asyncio.IncompleteReadError):
+                    # 500 응답 뒤 서버가 닫은 keep-alive 연결: 다시 연결해 한 번 재시도
+                    connection.close()
+                except (asyncio.TimeoutError, ValueError):
+                    connection.close()
+                    break
+        finally:
+            if connection is not None:
+                pool.release(connection)
+        route_stats.histogram.record(int((time.perf_counter() - scheduled) * 1e6))
+        route_stats.status_codes[status] += 1
+        if status == 0 or status >= 500:
+            route_stats.errors += 1
+        if headers.get(LOCK_ERROR_HEADER) == "sqlite-locked":
+            route_stats.lock_errors += 1
+
+    started = time.perf_counter()
+    total = int(rps * duration)
+    for i in range(total):
+        scheduled = started + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag_ms = max(max_lag_ms, -delay * 1000)
+        route, make_request = scenarios[rng.choices(names, weights)[0]]
+        method, path, body = make_request()
+        task = asyncio.create_task(send(route, method, path, body, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    pool.close()
+    return stats, time.perf_counter() - started, max_lag_ms
+
+
+# ==================== 서버 / 보고 ====================
+
+
+def _start_server(directory: str, port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "loadtest:create_app", "--factory",
+            "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+            "--port", str(port), "--workers", str(workers), "--log-level", "critical",
+        ],
+        cwd=directory,
+        env=env,
+        # 워커가 여러 개일 때 자식 프로세스까지 한 번에 종료하기 위해 별도 프로세스 그룹
+        start_new_session=True,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("서버가 시작되지 않았습니다")
+            time.sleep(0.2)
+    _stop_server(server)
+    raise RuntimeError("서버가 시작되지 않았습니다")
+
+
+def _stop_server(server: subprocess.Popen) -> None:
+    os.killpg(server.pid, signal.SIGTERM)
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+
+def _report(stats: Dict[str, RouteStats], elapsed: float, max_lag_ms: float, target_rps: float):
+    overall = RouteStats()
+    for route_stats in stats.values():
+        for (shift, sub), count in route_stats.histogram.counts.items():
+            overall.histogram.counts[(shift, sub)] += count
+        overall.histogram.total += route_stats.histogram.total
+        overall.histogram.max_us = max(overall.histogram.max_us, route_stats.histogram.max_us)
+        overall.errors += route_stats.errors
+        overall.lock_errors += route_stats.lock_errors
+
+    header = "".join(f"{'p' + format(p, 'g'):>9}" for p in REPORTED_PERCENTILES)
+    print("=" * 100)
+    print(f"목표 {target_rps:g} req/s, 실제 {overall.histogram.total / elapsed:.1f} req/s, "
+          f"경과 {elapsed:.1f}초, 요청 발생 최대 지연 {max_lag_ms:.1f}ms")
+    print("=" * 100)
+    print(f"{'경로':<34}{'요청':>7}{'오류율':>8}{'잠금':>6}{header}{'max':>9}  (ms)")
+    rows = sorted(stats.items()) + [("전체", overall)]
+    report = {}
+    for route, route_stats in rows:
+        histogram = route_stats.histogram
+        percentiles = {p: histogram.percentile(p) / 1000 for p in REPORTED_PERCENTILES}
+        error_rate = route_stats.errors / histogram.total if histogram.total else 0.0
+        print(
+            f"{route:<34}{histogram.total:>7}{error_rate:>8.2%}{route_stats.lock_errors:>6}"
+            + "".join(f"{value:>9.1f}" for value in percentiles.values())
+            + f"{histogram.max_us / 1000:>9.1f}"
+        )
+        report[route] = {
+            "requests": histogram.total,
+            "errors": route_stats.errors,
+            "error_rate": error_rate,
+            "lock_errors": route_stats.lock_errors,
+            "status_codes": dict(route_stats.status_codes),
+            "percentiles_ms": {format(p, "g"): value for p, value in percentiles.items()},
+            "max_ms": histogram.max_us / 1000,
+            "histogram_us": histogram.buckets(),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 동시 부하 테스트")
+    parser.add_argument("--rps", type=float, default=200, help="목표 초당 요청 수")
+    parser.add_argument("--duration", type=float, default=30, help="부하 시간(초)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="트래픽 구성 (이름=비율,...)")
+    parser.add_argument("--connections", type=int, default=256, help="최대 동시 연결 수")
+    parser.add_argument("--timeout", type=float, default=30, help="요청 제한 시간(초)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 프로세스 수")
+    parser.add_argument("--database", default=os.path.join(BACKEND_DIR, "app.db"),
+                        help="복사해서 사용할 SQLite DB")
+    parser.add_argument("--port", type=int, default=8741)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 파일")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as directory:
+        database = os.path.join(directory, "app.db")
+        shutil.copyfile(args.database, database)
+        scenarios = _scenarios(database, rng)
+        try:
+            mix = _parse_mix(args.mix, scenarios)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+
+        server = _start_server(directory, args.port, args.workers)
+        try:
+            # 워밍업 (카탈로그 스냅샷 로드, 연결 생성) - 집계에서 제외
+            asyncio.run(_run(args.port, scenarios, {"predict": 1}, 50, 1, 16, args.timeout, rng))
+            stats, elapsed, max_lag_ms = asyncio.run(
+                _run(args.port, scenarios, mix, args.rps, args.duration,
+                     args.connections, args.timeout, rng)
+            )
+        finally:
+            _stop_server(server)
+
+    report = _report(stats, elapsed, max_lag_ms, args.rps)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"rps": args.rps, "duration": args.duration, "mix": mix,
+                 "workers": args.workers, "elapsed": elapsed, "routes": report},
+                f, ensure_ascii=False, indent=2,
+            )
+        print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@
 - 증상: 50개 이상
 - 질병: 100개 이상
 - 각 질병마다 5-10개의 증상 연결 (확률 포함)
+- 자유 텍스트 증상 추출용 증상의 다른 이름 (구어 표현)
 """
 import sys
 from pathlib import Path
@@ -16,11 +17,13 @@ from app.database import engine, SessionLocal, Base
 from app.models.disease import Disease
 from app.models.symptom import Symptom
 from app.models.disease_symptom import DiseaseSymptom
+from app.models.symptom_alias import SymptomAlias
 
 
 def clear_existing_data(db):
     """기존 데이터 삭제"""
-    print("[1/3] 기존 데이터 삭제 중...")
+    print("[1/4] 기존 데이터 삭제 중...")
+    db.query(SymptomAlias).delete()
     db.query(DiseaseSymptom).delete()
     db.query(Disease).delete()
     db.query(Symptom).delete()
@@ -30,7 +33,7 @@ def clear_existing_data(db):
 
 def create_symptoms(db):
     """증상 50개 이상 생성"""
-    print("\n[2/3] 증상 데이터 생성 중...")
+    print("\n[2/4] 증상 데이터 생성 중...")
 
     symptoms_data = [
         # 호흡기 증상 (11개)
@@ -148,7 +151,7 @@ def create_symptoms(db):
 
 def create_diseases_and_relations(db, symptom_map):
     """질병 100개 이상 생성 및 증상 연결"""
-    print("\n[3/3] 질병 및 증상 관계 데이터 생성 중...")
+    print("\n[3/4] 질병 및 증상 관계 데이터 생성 중...")
 
     diseases_data = [
         # 호흡기 질환 (15개)
@@ -1545,6 +1548,51 @@ def create_diseases_and_relations(db, symptom_map):
     print(f">> 질병 {len(diseases_data)}개 및 증상 관계 {len(disease_relations)}개 생성 완료")
 
 
+def create_symptom_aliases(db, symptom_map):
+    """자유 텍스트 증상 추출용 증상의 다른 이름 생성 (증상 이름 -> 구어 표현)"""
+    print("\n[4/4] 증상 다른 이름 데이터 생성 중...")
+
+    aliases_data = {
+        "고열": ["열이 높", "열이 펄펄"],
+        "발열": ["열이 나", "열나", "열이 있"],
+        "오한": ["으슬으슬", "춥고 떨려"],
+        "기침": ["콜록"],
+        "코막힘": ["코가 막혀", "코막혀"],
+        "재채기": ["에취"],
+        "인후통": ["목이 아파", "목아파", "목이 따끔"],
+        "두통": ["머리가 아파", "머리 아파", "머리가 지끈"],
+        "어지러움": ["어지러워", "어질어질"],
+        "복통": ["배가 아파", "배아파", "배가 쑤셔"],
+        "메스꺼움": ["속이 울렁", "메슥", "구역질"],
+        "구토": ["토했", "토를"],
+        "속쓰림": ["속이 쓰려"],
+        "소화불량": ["체했", "소화가 안"],
+        "식욕부진": ["입맛이 없", "밥맛이 없"],
+        "피로감": ["피곤", "지쳐"],
+        "근육통": ["몸살", "온몸이 쑤셔"],
+        "관절통": ["관절이 아파", "무릎이 아파"],
+        "요통": ["허리가 아파"],
+        "가슴통증": ["가슴이 아파", "흉통"],
+        "두근거림": ["가슴이 두근", "심장이 뛰"],
+        "호흡곤란": ["숨이 차", "숨차", "숨쉬기 힘들"],
+        "가려움": ["가려워", "간지러"],
+        "귀통증": ["귀가 아파"],
+        "눈충혈": ["눈이 빨개"],
+        "불면증": ["잠을 못", "잠이 안"],
+    }
+
+    aliases = [
+        SymptomAlias(symptom_id=symptom_map[name], alias=alias)
+        for name, names in aliases_data.items()
+        if name in symptom_map
+        for alias in names
+    ]
+    db.bulk_save_objects(aliases)
+    db.commit()
+
+    print(f">> 증상 다른 이름 {len(aliases)}개 생성 완료")
+
+
 def main():
     """메인 실행 함수"""
     print("=" * 60)
@@ -1552,7 +1600,7 @@ def main():
     print("=" * 60)
 
     # 기존 테이블 삭제 후 재생성 (스키마 변경 반영)
-    print("\n[0/3] 기존 테이블 삭제 및 재생성 중...")
+    print("\n[0/4] 기존 테이블 삭제 및 재생성 중...")
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     print(">> 테이블 재생성 완료")
@@ -1570,6 +1618,9 @@ def main():
         # 3. 질병 및 증상 관계 생성
         create_diseases_and_relations(db, symptom_map)
 
+        # 4. 증상 다른 이름 생성
+        create_symptom_aliases(db, symptom_map)
+
         # 최종 통계
         print("\n" + "=" * 60)
         print("[완료] 생성 완료 통계")
@@ -1577,6 +1628,7 @@ def main():
         print(f">> 증상: {db.query(Symptom).count()}개")
         print(f">> 질병: {db.query(Disease).count()}개")
         print(f">> 질병-증상 관계: {db.query(DiseaseSymptom).count()}개")
+        print(f">> 증상 다른 이름: {db.query(SymptomAlias).count()}개")
         print("=" * 60)
         print("모든 데이터 생성이 완료되었습니다!")
 
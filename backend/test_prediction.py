@@ -1,14 +1,47 @@
 """
 질병 예측 알고리즘 테스트 스크립트
 """
+import json
+import math
+import random
+import struct
+import subprocess
 import sys
 import os
+import tempfile
+import unicodedata
 sys.path.insert(0, os.path.dirname(__file__))
 
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.cli import score as score_cli
+from app.cli.seed_synthetic import generate_catalog
 from app.database import SessionLocal
 from app.models.symptom import Symptom
 from app.models.disease import Disease
 from app.models.disease_symptom import DiseaseSymptom
+from app.main import app
+from app.middleware.profiling import PROFILE_ID_HEADER, ProfilingMiddleware
+from app.routers.prediction import _predict
+from app.schemas import PredictRequest
+from app.services import autocomplete as autocomplete_module
+from app.services.autocomplete import chosung, normalize
+from app.services.catalog import get_catalog_snapshot
+from app.services.catalog_artifact import compile_catalog, load_or_compile, open_artifact
+from app.services.catalog_version import get_catalog_version
+from app.services.extraction import AhoCorasick, SymptomExtractor, symptom_extractors
+from app.services.fuzzy import SymptomFuzzyIndex, ngrams
+from app.services.lsh import LshScorer
+from app.services.prediction import estimate_response_bytes
+from app.services.prediction_cache import prediction_cache
+from app.services.prediction_index import DiseaseInfo, PredictionIndex
+from app.services.scorers import available_scorers
+from app.services.sql_stats import SQL_STATEMENT_SAMPLE, track_sql
+from app.services.sparse_engine import SparseScoringEngine
+from app.services.topk import PrunedTopKRetriever
 
 def test_prediction():
     db = SessionLocal()
@@ -112,5 +145,998 @@ def test_prediction():
 
     db.close()
 
+def legacy_scores(db, symptom_ids):
+    """기존 루프 방식의 질병별 점수 (질병 ID → 점수)"""
+    scores = {}
+    for disease in db.query(Disease).all():
+        probabilities = [
+            ds.probability
+            for ds in db.query(DiseaseSymptom).filter(DiseaseSymptom.disease_id == disease.id)
+            if ds.symptom_id in symptom_ids
+        ]
+        if not probabilities:
+            continue
+        user_coverage = len(probabilities) / len(symptom_ids)
+        avg_probability = sum(probabilities) / len(probabilities)
+        match_count_bonus = 1 + len(probabilities) * 0.1
+        scores[disease.id] = user_coverage * avg_probability * match_count_bonus
+    return scores
+
+
+def legacy_naive_bayes(db, symptom_ids, smoothing):
+    """모든 질병 × 모든 증상을 순회하는 나이브 베이즈 사후 확률 (질병 ID → 사후 확률)"""
+    all_symptom_ids = [s.id for s in db.query(Symptom).all()]
+    log_likelihoods, candidates = {}, set()
+    for disease in db.query(Disease).all():
+        probabilities = {}
+        for ds in db.query(DiseaseSymptom).filter(DiseaseSymptom.disease_id == disease.id):
+            probabilities[ds.symptom_id] = probabilities.get(ds.symptom_id, 0) + ds.probability
+            if ds.symptom_id in symptom_ids:
+                candidates.add(disease.id)
+        log_likelihood = 0.0
+        for symptom_id in all_symptom_ids:
+            p = min(max(probabilities.get(symptom_id, smoothing), smoothing), 1 - smoothing)
+            log_likelihood += math.log(p) if symptom_id in symptom_ids else math.log(1 - p)
+        log_likelihoods[disease.id] = log_likelihood
+
+    peak = max(log_likelihoods.values())
+    log_total = peak + math.log(sum(math.exp(v - peak) for v in log_likelihoods.values()))
+    return {d: math.exp(log_likelihoods[d] - log_total) for d in candidates}
+
+
+def test_scorer_parity():
+    """등록된 점수 방식과 기존 루프 방식의 점수·순위 비교"""
+    db = SessionLocal()
+    snapshot = get_catalog_snapshot(db)
+    symptom_ids = list(snapshot.index.symptoms)
+    rng = random.Random(42)
+    queries = [rng.sample(symptom_ids, rng.randint(1, 5)) for _ in range(10)]
+
+    print("=" * 60)
+    print(f"점수 방식 일치 검사 ({len(queries)}개 질의): {available_scorers()}")
+    print("=" * 60)
+
+    references = {
+        "heuristic": lambda q: legacy_scores(db, q),
+        "heuristic_bitset": lambda q: legacy_scores(db, q),
+        # LSH_MIN_DISEASES보다 작은 카탈로그에서는 정확히 계산
+        "heuristic_lsh": lambda q: legacy_scores(db, q),
+        "naive_bayes": lambda q: legacy_naive_bayes(
+            db, q, snapshot.scorer("naive_bayes").smoothing
+        ),
+    }
+    for name, reference in references.items():
+        scorer = snapshot.scorer(name)
+        for query in queries:
+            expected = reference(query)
+            results = scorer.score(query)
+            got = {r.disease.id: r.score for r in results}
+            assert got.keys() == expected.keys(), (name, query)
+            for disease_id, score in expected.items():
+                assert math.isclose(got[disease_id], score, rel_tol=1e-9, abs_tol=1e-12), (
+                    name, query, disease_id
+                )
+            # 반올림 점수 내림차순, 동점이면 질병 ID 순
+            order = sorted(expected, key=lambda d: (-round(expected[d], 4), d))
+            assert [r.disease.id for r in results] == order, (name, query)
+        print(f"✅ {name}: 기존 루프와 점수/순위 일치")
+
+    db.close()
+
+
+def test_pruned_topk_parity():
+    """가지치기 top-k 결과와 전체 점수 계산 결과 비교 (합성 카탈로그, ID·순서·동점·min_score)"""
+    bind = create_engine("sqlite://")
+    generate_catalog(bind, diseases=2000, symptoms=300, seed=5)
+    db = sessionmaker(bind=bind)()
+    index = PredictionIndex.build(db)
+    engine = SparseScoringEngine(index)
+    retriever = PrunedTopKRetriever(index)
+    symptom_ids = list(index.symptoms)
+    rng = random.Random(5)
+
+    print("=" * 60)
+    print("가지치기 top-k 검사 (합성 카탈로그 질병 2000개)")
+    print("=" * 60)
+
+    pruned = candidates = 0
+    for _ in range(200):
+        query = rng.sample(symptom_ids, rng.randint(1, 8))
+        top_k = rng.choice([1, 3, 10, 50])
+        min_score = rng.choice([0.0, 0.0, 0.05, 0.2])
+        expected = engine.score(query, top_k, min_score)
+        results, stats = retriever.search(query, top_k, min_score)
+        assert [(r.disease.id, r.score) for r in results] == [
+            (r.disease.id, r.score) for r in expected
+        ], (query, top_k, min_score)
+        assert stats.fully_scored + stats.pruned == stats.candidates
+        pruned += stats.pruned
+        candidates += stats.candidates
+    print(f"✅ 질의 200개 결과 일치 (후보 중 {pruned / candidates:.1%} 가지치기)")
+
+    db.close()
+    bind.dispose()
+
+
+def _predict_ids(client, symptom_ids, **options):
+    return client.post("/api/predict", json={"symptom_ids": symptom_ids, **options})
+
+
+def test_incremental_index_writes():
+    """쓰기 API마다 증분 반영된 색인이 DB 전체 재생성 결과와 같은지 확인"""
+    print("=" * 60)
+    print("쓰기 API 증분 반영 검사")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        symptom_ids = list(get_catalog_snapshot(db).index.symptoms)[:3]
+        rng = random.Random(13)
+
+        def check(step):
+            # 증분 갱신 대상 파생 구조를 모두 만들어 둔 상태에서 비교
+            _predict_ids(client, symptom_ids, pruning=True)
+            client.get("/api/symptoms/autocomplete", params={"q": "테"})
+            client.get("/api/symptoms/search", params={"q": "테스트"})
+            report = client.get("/api/predict/index/consistency").json()
+            assert report["consistent"], (step, report["differences"])
+
+            db.expire_all()
+            snapshot = get_catalog_snapshot(db)
+            fresh = SparseScoringEngine(PredictionIndex.build(db))
+            ids = list(snapshot.index.symptoms)
+            for query in [symptom_ids] + [rng.sample(ids, rng.randint(1, 4)) for _ in range(5)]:
+                assert [(r.disease.id, r.score) for r in snapshot.engine.score(query)] == [
+                    (r.disease.id, r.score) for r in fresh.score(query)
+                ], (step, query)
+            print(f"✅ {step}")
+
+        check("초기 상태")
+        symptom_id = disease_id = None
+        try:
+            symptom_id = client.post(
+                "/api/symptoms/", json={"name": "테스트증상", "description": "검사용"}
+            ).json()["id"]
+            check("증상 생성")
+            assert client.put(
+                f"/api/symptoms/{symptom_id}", json={"name": "테스트증상변경"}
+            ).status_code == 200
+            check("증상 수정")
+            alias = client.post(
+                f"/api/symptoms/{symptom_id}/aliases", json={"alias": "테스트다른이름"}
+            ).json()
+            check("다른 이름 추가")
+            client.delete(f"/api/symptoms/{symptom_id}/aliases/{alias['id']}")
+            check("다른 이름 삭제")
+
+            disease_id = client.post(
+                "/api/diseases/",
+                json={"name": "테스트질병", "description": "검사용", "category": "기타질환"},
+            ).json()["id"]
+            check("질병 생성")
+            for sid, probability in ((symptom_id, 0.9), (symptom_ids[0], 0.4), (symptom_id, 0.7)):
+                assert client.post(
+                    f"/api/diseases/{disease_id}/symptoms",
+                    json={"symptom_id": sid, "probability": probability},
+                ).status_code == 201
+                check(f"연결 추가/갱신 ({sid}, {probability})")
+            client.put(
+                f"/api/diseases/{disease_id}/symptoms/bulk",
+                json={"symptoms": [
+                    {"symptom_id": sid, "probability": 0.5, "is_primary": i == 0}
+                    for i, sid in enumerate(symptom_ids + [symptom_id])
+                ]},
+            )
+            check("연결 일괄 교체")
+            client.delete(f"/api/diseases/{disease_id}/symptoms/{symptom_ids[1]}")
+            check("연결 해제")
+            client.put(f"/api/diseases/{disease_id}", json={"category": "감염성질환"})
+            check("질병 수정")
+        finally:
+            if disease_id is not None:
+                # 연결이 남아 있는 질병은 삭제할 수 없으므로 연결부터 비움
+                client.put(f"/api/diseases/{disease_id}/symptoms/bulk", json={"symptoms": []})
+                check("연결 모두 해제")
+                assert client.delete(f"/api/diseases/{disease_id}").status_code == 200
+                check("질병 삭제")
+            if symptom_id is not None:
+                assert client.delete(f"/api/symptoms/{symptom_id}").status_code == 200
+                check("증상 삭제")
+            db.close()
+
+
+def test_batch_and_stream_match_single():
+    """일괄/스트리밍 예측 결과(개별 오류 포함)가 단건 예측과 같은지 확인"""
+    print("=" * 60)
+    print("일괄/스트리밍 예측 검사")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        snapshot = get_catalog_snapshot(db)
+        db.close()
+        symptom_ids = list(snapshot.index.symptoms)
+        category = next(iter(snapshot.index.diseases.values())).category
+        rng = random.Random(17)
+        requests = [
+            {"symptom_ids": rng.sample(symptom_ids, rng.randint(1, 5)), "top_k": rng.randint(1, 5)}
+            for _ in range(10)
+        ] + [
+            {"symptom_ids": symptom_ids[:2], "scorer": "naive_bayes"},
+            {"symptom_ids": symptom_ids[:3], "categories": [category]},
+            {"symptom_ids": [symptom_ids[0], 999999]},
+            {"symptom_ids": symptom_ids[:2], "scorer": "naive_bayes", "categories": [category]},
+        ]
+
+        expected = []
+        for request in requests:
+            response = _predict_ids(client, **request)
+            body = response.json()
+            if response.status_code == 200:
+                expected.append({"predictions": body["predictions"], "scorer": body["scorer"]})
+            else:
+                assert response.status_code in (400, 404), body
+                expected.append({"error": body["detail"]})
+
+        def normalized(item):
+            if item["error"] is not None:
+                return {"error": item["error"]}
+            return {"predictions": item["result"]["predictions"], "scorer": item["result"]["scorer"]}
+
+        batch = client.post("/api/predict/batch", json={"requests": requests}).json()["results"]
+        assert [item["index"] for item in batch] == list(range(len(requests)))
+        assert [normalized(item) for item in batch] == expected
+        print(f"✅ 일괄 예측 {len(requests)}개 일치")
+
+        body = "\n".join(json.dumps(request) for request in requests) + "\n\n{잘못된 줄\n"
+        response = client.post(
+            "/api/predict/stream",
+            params={"batch_size": 4},
+            content=body.encode("utf-8"),
+            headers={"content-type": "application/x-ndjson"},
+        )
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [item["index"] for item in lines] == list(range(len(requests) + 1))
+        assert [normalized(item) for item in lines[:-1]] == expected
+        assert lines[-1]["error"].startswith("잘못된 요청 형식")
+        print(f"✅ 스트리밍 예측 {len(lines)}줄 일치 (빈 줄 제외, 잘못된 줄 오류)")
+
+
+def test_cache_invalidated_by_write():
+    """같은 요청은 캐시에서 반환하고, 카탈로그 쓰기 후에는 다시 계산하는지 확인"""
+    print("=" * 60)
+    print("예측 결과 캐시 무효화 검사")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        snapshot = get_catalog_snapshot(db)
+        db.close()
+        top = snapshot.engine.score(list(snapshot.index.symptoms)[:1], 1)[0]
+        symptom_id = top.matched[0].symptom_id
+        query = [symptom_id, next(s for s in snapshot.index.symptoms if s != symptom_id)]
+
+        prediction_cache.clear()
+        first = _predict_ids(client, query).json()
+        hits = prediction_cache.stats()["hits"]
+        # 증상 순서가 달라도 같은 증상 세트면 캐시 적중
+        assert _predict_ids(client, list(reversed(query))).json() == first
+        assert prediction_cache.stats()["hits"] == hits + 1
+
+        url = f"/api/diseases/{top.disease.id}/symptoms"
+        original = top.matched[0].probability
+        changed = 0.01 if original > 0.5 else 0.99
+        try:
+            client.post(url, json={"symptom_id": symptom_id, "probability": changed})
+            misses = prediction_cache.stats()["misses"]
+            second = _predict_ids(client, query).json()
+            assert prediction_cache.stats()["misses"] == misses + 1
+            assert second["catalog_generation"] > first["catalog_generation"]
+            probabilities = {
+                p["disease_id"]: m["probability"]
+                for p in second["predictions"]
+                for m in p["matched_symptoms"]
+                if m["id"] == symptom_id
+            }
+            assert probabilities.get(top.disease.id, changed) == changed
+            assert second["predictions"] != first["predictions"]
+        finally:
+            client.post(url, json={"symptom_id": symptom_id, "probability": original})
+        print("✅ 캐시 적중 후 쓰기로 무효화, 새 세대로 다시 계산")
+
+    # 캐시 크기 제한용 추정치는 직렬화 없이 실제 JSON 크기에 가깝게
+    symptom_ids = list(snapshot.index.symptoms)
+    rng = random.Random(5)
+    for i in range(20):
+        request = PredictRequest(
+            symptom_ids=rng.sample(symptom_ids, rng.randint(1, 6)),
+            top_k=rng.randint(1, 20),
+            pruning=i % 2 == 0,
+            include_category_counts=i % 3 == 0,
+        )
+        response = _predict(request, snapshot, explain=i % 4 == 1)
+        actual = len(response.model_dump_json().encode("utf-8"))
+        assert 0.8 * actual <= estimate_response_bytes(response) <= 1.5 * actual, (request, actual)
+    print("✅ 응답 크기 추정치가 실제 JSON 크기의 0.8~1.5배")
+
+
+def test_snapshot_isolation():
+    """요청이 잡은 스냅샷은 그 사이 쓰기가 있어도 같은 세대로 계산되는지 확인"""
+    print("=" * 60)
+    print("카탈로그 스냅샷 격리 검사")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        snapshot = get_catalog_snapshot(db)
+        top = snapshot.engine.score(list(snapshot.index.symptoms)[:1], 1)[0]
+        symptom_id = top.matched[0].symptom_id
+        request = PredictRequest(symptom_ids=[symptom_id], top_k=10)
+        before = _predict(request, snapshot)
+
+        url = f"/api/diseases/{top.disease.id}/symptoms"
+        original = top.matched[0].probability
+        try:
+            # 요청 도중 다른 요청의 쓰기로 새 세대 게시
+            client.post(url, json={"symptom_id": symptom_id, "probability": 0.01})
+            db.expire_all()
+            assert get_catalog_snapshot(db).generation > snapshot.generation
+            during = _predict(request, snapshot)
+            assert during.catalog_generation == snapshot.generation
+            assert during.predictions == before.predictions
+        finally:
+            client.post(url, json={"symptom_id": symptom_id, "probability": original})
+            db.close()
+        print(f"✅ 세대 {snapshot.generation} 스냅샷 결과 유지")
+
+
+def test_catalog_artifact_rebuild():
+    """손상되거나 오래된 카탈로그 산출물은 다시 컴파일하는지 확인"""
+    db = SessionLocal()
+    fresh = PredictionIndex.build(db)
+    version = get_catalog_version(db)
+
+    print("=" * 60)
+    print("카탈로그 산출물 재컴파일 검사")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.artifact")
+        compile_catalog(db, path)
+
+        def tamper(offset, data):
+            with open(path, "r+b") as f:
+                f.seek(offset)
+                f.write(data)
+
+        # 본문 1바이트 손상 → 체크섬 불일치
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            f.seek(size - 1)
+            last = f.read(1)
+        tamper(size - 1, bytes([last[0] ^ 0xFF]))
+        artifact = load_or_compile(db, path)
+        assert artifact.catalog_version == version
+        assert artifact.build_index().diff(fresh) == []
+        print("✅ 손상된 산출물 재컴파일")
+
+        # 배열 위 색인의 쓰기는 복사본에만 반영 (사전 색인과 같은 결과·순서)
+        index = artifact.build_index()
+        mine, theirs = index.clone(), fresh.clone()
+        disease_id = next(iter(fresh.disease_links))
+        new_id = max(fresh.diseases) + 1
+        for target in (mine, theirs):
+            del target.diseases[disease_id]
+            target.disease_links.pop(disease_id)
+            target.diseases[new_id] = DiseaseInfo(new_id, "새 질병", "", "기타질환")
+            target.diseases[new_id] = DiseaseInfo(new_id, "새 질병", "설명", "기타질환")
+            for symptom_id in sorted(target.postings)[:2]:
+                target.postings[symptom_id] = target.postings[symptom_id][1:]
+        assert mine.diff(theirs) == []
+        assert len(mine.diseases) == len(theirs.diseases) == len(fresh.diseases)
+        assert list(mine.diseases) == list(theirs.diseases)
+        assert disease_id not in mine.diseases and new_id in mine.diseases
+        assert index.diff(fresh) == []
+        print("✅ 배열 색인 copy-on-write")
+
+        # 헤더의 카탈로그 버전을 이전 버전으로 → 오래된 산출물
+        tamper(16, struct.pack("<q", version - 1))
+        assert open_artifact(path).catalog_version == version - 1
+        artifact = load_or_compile(db, path)
+        assert artifact.catalog_version == version
+        assert open_artifact(path, version).build_index().diff(fresh) == []
+        print("✅ 오래된 산출물 재컴파일")
+
+        # 잘린 파일
+        with open(path, "r+b") as f:
+            f.truncate(10)
+        assert load_or_compile(db, path).catalog_version == version
+        print("✅ 잘린 산출물 재컴파일")
+
+    db.close()
+
+
+def test_lsh_candidates():
+    """LSH 후보 재계산 결과가 정확한 결과의 부분집합이며 점수·순서가 같은지 확인"""
+    db = SessionLocal()
+    snapshot = get_catalog_snapshot(db)
+    engine = snapshot.engine
+    scorer = LshScorer(engine, bands=8, rows=2, min_diseases=0)
+    symptom_ids = list(snapshot.index.symptoms)
+    rng = random.Random(3)
+
+    print("=" * 60)
+    print("LSH 후보 재계산 검사")
+    print("=" * 60)
+
+    recalls = []
+    for _ in range(20):
+        query = rng.sample(symptom_ids, rng.randint(1, 5))
+        exact = {r.disease.id: r.score for r in engine.score(query)}
+        results = scorer.score(query, 3)
+        for r in results:
+            assert exact[r.disease.id] == r.score, (query, r.disease.id)
+        assert [r.disease.id for r in results] == sorted(
+            (r.disease.id for r in results), key=lambda d: (-round(exact[d], 4), d)
+        ), query
+        top = {r.disease.id for r in engine.score(query, 3)}
+        recalls.append(len(top & {r.disease.id for r in results}) / len(top))
+    print(f"✅ 후보 점수/순위 일치 (recall@3 {sum(recalls) / len(recalls):.3f})")
+
+    db.close()
+
+
+def test_category_shards():
+    """카테고리 샤드 병합 결과와 전체 결과를 카테고리로 거른 결과 비교"""
+    db = SessionLocal()
+    snapshot = get_catalog_snapshot(db)
+    symptom_ids = list(snapshot.index.symptoms)
+    categories = sorted({d.category for d in snapshot.index.diseases.values()})
+    rng = random.Random(7)
+
+    print("=" * 60)
+    print(f"카테고리 샤드 검사 (카테고리 {len(categories)}개)")
+    print("=" * 60)
+
+    # 점수 방식과 무관하게 스냅샷당 하나
+    shards = snapshot.category_shards
+    assert snapshot.category_shards is shards
+    for name in ("heuristic", "heuristic_bitset"):
+        for _ in range(10):
+            query = rng.sample(symptom_ids, rng.randint(1, 5))
+            selected = rng.sample(categories, rng.randint(1, min(3, len(categories))))
+            full = snapshot.scorer(name).score(query)
+            expected = [r for r in full if r.disease.category in selected][:5]
+            results = shards.score(name, query, selected, limit=5)
+            assert [(r.disease.id, r.score) for r in results] == [
+                (r.disease.id, r.score) for r in expected
+            ], (name, query, selected)
+
+            counts = {}
+            for r in full:
+                counts[r.disease.category] = counts.get(r.disease.category, 0) + 1
+            assert shards.category_counts(query) == counts, (name, query)
+        print(f"✅ {name}: 샤드 병합 결과/카테고리별 일치 수 일치")
+    # 샤드 엔진은 카테고리마다 하나 (점수 방식별 scorer가 공유)
+    assert len(shards._engines) <= len(categories)
+
+    # 카테고리별 일치 수는 요청한 경우(또는 categories 지정 시)에만 계산
+    query = symptom_ids[:3]
+    counts = shards.category_counts(query)
+    for options, expected in (
+        ({}, None),
+        ({"pruning": True}, None),
+        ({"scorer": "heuristic_lsh"}, None),
+        ({"include_category_counts": True}, counts),
+        ({"pruning": True, "include_category_counts": True}, counts),
+        ({"scorer": "naive_bayes", "include_category_counts": True}, counts),
+        ({"categories": categories[:1]}, counts),
+    ):
+        response = _predict(PredictRequest(symptom_ids=query, **options), snapshot)
+        assert response.category_counts == expected, options
+    print("✅ category_counts는 include_category_counts/categories 요청에만 포함")
+
+    db.close()
+
+
+def test_symptom_autocomplete():
+    """자동 완성 결과와 전체 증상 선형 탐색 결과 비교 (이름/초성 접두사)"""
+    db = SessionLocal()
+    snapshot = get_catalog_snapshot(db)
+    autocomplete = snapshot.autocomplete
+    index = snapshot.index
+    names = list(index.symptoms.values())
+
+    print("=" * 60)
+    print("증상 자동 완성 검사")
+    print("=" * 60)
+
+    queries = {"ㄷ", "ㅁㅌ", "두", "목 통"} | {name[:1] for name in names} | {name[:2] for name in names}
+    for query in sorted(queries):
+        prefix = normalize(query)
+        expected = sorted(
+            (
+                symptom_id
+                for symptom_id, name in index.symptoms.items()
+                if normalize(name).startswith(prefix) or chosung(normalize(name)).startswith(prefix)
+            ),
+            key=lambda s: (
+                -len({p.disease_id for p in index.postings.get(s, ())}), index.symptoms[s], s
+            ),
+        )[:10]
+        assert [s.symptom_id for s in autocomplete.search(query, 10)] == expected, query
+    print(f"✅ 질의 {len(queries)}개 결과 일치")
+
+    # 복사본은 키 배열·질병 수를 공유하고, 바뀐 증상만 따로 반영 (원본은 그대로)
+    symptom_id = max(index.postings, key=lambda s: len(index.postings[s]))
+    before = autocomplete.disease_count(symptom_id)
+    changed = index.clone()
+    # 같은 질병·증상 연결이 두 행이어도 질병 수는 한 번
+    changed.postings[symptom_id] = changed.postings[symptom_id] + changed.postings[symptom_id][:1]
+    del changed.postings[symptom_id][1:2]
+    clone = autocomplete.clone(changed)
+    assert clone.entries is autocomplete.entries
+    clone.refresh_disease_counts([symptom_id])
+    assert clone.disease_count(symptom_id) == before - 1
+    assert autocomplete.disease_count(symptom_id) == before
+    assert clone.entries is autocomplete.entries
+    clone.refresh_symptom(symptom_id)
+    assert clone.entries is not autocomplete.entries and clone.entries == autocomplete.entries
+    # 변경분이 한도를 넘으면 공유 사전에 합침 (결과는 같음)
+    symptom_ids = list(index.symptoms)
+    limit = autocomplete_module._COUNT_PATCH_LIMIT
+    autocomplete_module._COUNT_PATCH_LIMIT = 8
+    try:
+        shared = clone._counts
+        for start in range(0, len(symptom_ids), 5):
+            clone = clone.clone(changed)
+            clone.refresh_disease_counts(symptom_ids[start:start + 5])
+            assert len(clone._count_patch) <= 8
+        assert clone._counts is not shared and autocomplete._counts is shared
+    finally:
+        autocomplete_module._COUNT_PATCH_LIMIT = limit
+    assert clone.disease_count(symptom_id) == before - 1
+    for other in symptom_ids:
+        if other != symptom_id:
+            assert clone.disease_count(other) == autocomplete.disease_count(other), other
+    print("✅ 복사본이 키 배열·질병 수를 공유, 바뀐 증상만 반영 (같은 질병 중복 연결은 한 번)")
+
+    db.close()
+
+
+def test_symptom_fuzzy_search():
+    """오타 허용 검색 결과와 전체 증상 다이스 유사도 직접 계산 결과 비교 (갱신 후 포함)"""
+    db = SessionLocal()
+    snapshot = get_catalog_snapshot(db)
+    index = snapshot.index
+    fuzzy = snapshot.fuzzy
+
+    print("=" * 60)
+    print("오타 허용 증상 검색 검사")
+    print("=" * 60)
+
+    def expected(symptoms, query):
+        grams = set(ngrams(query))
+        scored = []
+        for symptom_id, name in symptoms.items():
+            names = set(ngrams(name))
+            similarity = 2 * len(grams & names) / (len(grams) + len(names))
+            if similarity >= 0.3:
+                scored.append((-similarity, symptom_id))
+        return [symptom_id for _, symptom_id in sorted(scored)[:5]]
+
+    queries = ["두퉁", "소화불랑", "기칩", "목 아픔"] + [name[:-1] + "앙" for name in index.symptoms.values()]
+    for query in queries:
+        assert [m.symptom_id for m in fuzzy.search(query, 5)] == expected(index.symptoms, query), query
+    assert fuzzy.search("두퉁", 1)[0].name == "두통"
+
+    # 이름 변경을 clone + refresh_symptom으로 반영한 색인과 새로 만든 색인 비교
+    renamed = index.clone()
+    symptom_id = next(iter(renamed.symptoms))
+    renamed.symptoms[symptom_id] = "테스트증상"
+    clone = fuzzy.clone(renamed)
+    clone.refresh_symptom(symptom_id)
+    rebuilt = SymptomFuzzyIndex(renamed)
+    assert clone.postings.keys() == rebuilt.postings.keys()
+    assert all((clone.postings[g] == rebuilt.postings[g]).all() for g in rebuilt.postings)
+    assert clone.search("테스트증샹", 1)[0].symptom_id == symptom_id
+    # 원본 색인은 그대로
+    assert fuzzy.postings.keys() == SymptomFuzzyIndex(index).postings.keys()
+    print(f"✅ 질의 {len(queries)}개 결과 일치, 이름 변경 갱신 일치")
+
+    db.close()
+
+
+def test_symptom_extraction():
+    """Aho–Corasick 자동자 결과와 전체 패턴 직접 탐색 결과 비교, 자유 텍스트 증상 추출 확인"""
+    db = SessionLocal()
+    snapshot = get_catalog_snapshot(db)
+    names = list(snapshot.index.symptoms.values())
+    rng = random.Random(11)
+
+    print("=" * 60)
+    print("자유 텍스트 증상 추출 검사")
+    print("=" * 60)
+
+    patterns = [(name, i) for i, name in enumerate(names)] + [("ab", -1), ("b", -2), ("abc", -3)]
+    automaton = AhoCorasick(patterns)
+    for _ in range(50):
+        text = "".join(rng.choice(names + ["ab", "c", " ", "이랑"]) for _ in range(8))
+        expected = sorted(
+            (start, start + len(pattern), value)
+            for pattern, value in patterns
+            for start in range(len(text))
+            if text.startswith(pattern, start)
+        )
+        assert sorted(automaton.iter(text)) == expected, text
+
+    symptoms = {1: "고열", 2: "기침", 3: "인후통", 4: "목통증", 5: "통증"}
+    extractor = SymptomExtractor(symptoms, [("목이 아파", 3), ("기침", 5)])
+    text = "어제부터 고열이랑 기침, 목이  아파요. 목통증도"
+    results = extractor.extract(text)
+    assert [(r.symptom_id, r.matched) for r in results] == [
+        (1, "고열"), (2, "기침"), (3, "목이  아파"), (4, "목통증"),
+    ], results
+    assert all(text[r.start:r.end] == r.matched for r in results)
+
+    # NFD(자모 분리)로 입력된 텍스트도 NFC 패턴과 일치하고, 위치는 입력 텍스트 기준
+    decomposed = unicodedata.normalize("NFD", text)
+    assert decomposed != text
+    nfd_results = extractor.extract(decomposed)
+    assert [r.symptom_id for r in nfd_results] == [r.symptom_id for r in results], nfd_results
+    for r in nfd_results:
+        assert decomposed[r.start:r.end] == r.matched
+        assert normalize(r.matched) == normalize(symptoms[r.symptom_id]) or r.symptom_id == 3
+    mixed = SymptomExtractor({1: "Café", 2: "두통"}).extract("CAFE\u0301와 두\u1110\u1169\u11bc")
+    assert [(r.symptom_id, r.matched) for r in mixed] == [
+        (1, "CAFE\u0301"), (2, "두\u1110\u1169\u11bc"),
+    ], mixed
+    print("✅ 자동자 일치 위치, 증상 추출/위치 일치 (NFD 입력 포함)")
+
+    db.close()
+
+
+def test_predict_from_text():
+    """자유 텍스트 예측 (점수가 1.0을 넘는 질병이 있어도 200, 확률은 1.0 이하)"""
+    print("=" * 60)
+    print("자유 텍스트 예측 검사")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        text = "어제부터 고열이랑 기침, 목이 아파요"
+        response = client.post("/api/predict/text", json={"text": text, "top_k": 10})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        symptom_ids = list(dict.fromkeys(e["symptom_id"] for e in body["extracted"]))
+        assert symptom_ids
+
+        db = SessionLocal()
+        snapshot = get_catalog_snapshot(db)
+        db.close()
+        expected = snapshot.engine.score(symptom_ids, 10)
+        assert [p["disease_id"] for p in body["predictions"]] == [r.disease.id for r in expected]
+        assert [p["rank"] for p in body["predictions"]] == list(range(1, len(expected) + 1))
+        assert all(0 <= p["probability"] <= 1 for p in body["predictions"])
+        assert body["predictions"][0]["probability"] == min(round(expected[0].score, 4), 1.0)
+
+        explained = client.post(
+            "/api/predict/text", params={"explain": True}, json={"text": text}
+        ).json()
+        assert explained["predictions"][0]["score_breakdown"]["final_score"] == expected[0].score
+    print(f"✅ 증상 {symptom_ids} 추출, 1위 점수 {expected[0].score:.4f}")
+
+
+def test_scorer_option_and_explain():
+    """등록되지 않은 점수 방식은 400(일괄 예측은 항목 오류), naive_bayes 설명은 로그 가능도 기준"""
+    print("=" * 60)
+    print("점수 방식 검증 / naive_bayes 설명 검사")
+    print("=" * 60)
+
+    db = SessionLocal()
+    snapshot = get_catalog_snapshot(db)
+    db.close()
+    symptom_ids = list(snapshot.index.symptoms)[:3]
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/predict/", json={"symptom_ids": symptom_ids, "scorer": "unknown"}
+        )
+        assert response.status_code == 400, response.text
+        response = client.post(
+            "/api/predict/text", json={"text": "고열", "scorer": "unknown"}
+        )
+        assert response.status_code == 400, response.text
+        batch = client.post(
+            "/api/predict/batch",
+            json={"requests": [
+                {"symptom_ids": symptom_ids, "scorer": "unknown"},
+                {"symptom_ids": symptom_ids},
+            ]},
+        ).json()
+        assert batch["results"][0]["error"] and batch["results"][0]["result"] is None
+        assert batch["results"][1]["result"] is not None
+
+        body = client.post(
+            "/api/predict/",
+            params={"explain": True},
+            json={"symptom_ids": symptom_ids, "scorer": "naive_bayes", "top_k": 3},
+        ).json()
+        for prediction in body["predictions"]:
+            breakdown = prediction["score_breakdown"]
+            assert breakdown["user_coverage"] is None
+            assert breakdown["match_count_bonus"] is None
+            assert math.isclose(
+                breakdown["final_score"],
+                math.exp(breakdown["log_likelihood"] - breakdown["log_evidence"]),
+                rel_tol=1e-9,
+            )
+    print("✅ 알 수 없는 점수 방식 400 / 항목 오류, naive_bayes 설명 = exp(로그 가능도 - 정규화 상수)")
+
+
+# QUERY_BUDGET_MODE는 import 시점에 읽으므로 별도 프로세스에서 실행
+_ENFORCE_SCRIPT = """
+import json
+from fastapi import APIRouter, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.database import SessionLocal, get_db
+from app.main import app  # 예산을 선언하지 않은 라우트가 있으면 여기서 실패
+from app.services.catalog import get_catalog_snapshot
+from app.services.query_budget import QueryBudgetRoute, query_budget
+
+probe = APIRouter(prefix="/_budget", route_class=QueryBudgetRoute)
+
+@probe.get("/over")
+@query_budget(1)
+def over(db=Depends(get_db)):
+    db.execute(text("SELECT 1")).all()
+    db.execute(text("SELECT 2")).all()
+
+@probe.get("/many")
+@query_budget(30)
+def many(db=Depends(get_db)):
+    for i in range(40):
+        db.execute(text(f"SELECT {i}")).all()
+
+app.include_router(probe)
+
+db = SessionLocal()
+symptom_ids = list(get_catalog_snapshot(db).index.symptoms)[:3]
+db.close()
+results = {}
+with TestClient(app) as client:
+    def call(name, method, url, **kwargs):
+        response = client.request(method, url, **kwargs)
+        results[name] = [response.status_code, response.json() if response.status_code == 500 else None]
+        return response
+
+    call("health", "GET", "/api/health")
+    call("symptoms", "GET", "/api/symptoms/")
+    call("autocomplete", "GET", "/api/symptoms/autocomplete", params={"q": "발"})
+    call("search", "GET", "/api/symptoms/search", params={"q": "발열"})
+    call("aliases", "GET", f"/api/symptoms/{symptom_ids[0]}/aliases")
+    call("categories", "GET", "/api/diseases/categories")
+    call("diseases", "GET", "/api/diseases/")
+    call("predict", "POST", "/api/predict", json={"symptom_ids": symptom_ids})
+    call("predict_pruning", "POST", "/api/predict", json={"symptom_ids": symptom_ids, "pruning": True})
+    call("extract", "POST", "/api/predict/extract", json={"text": "고열이랑 기침"})
+    call("text", "POST", "/api/predict/text", json={"text": "고열이랑 기침"})
+    call("batch", "POST", "/api/predict/batch", json={"requests": [{"symptom_ids": symptom_ids}] * 3})
+    call("stream", "POST", "/api/predict/stream",
+         content="\\n".join(json.dumps({"symptom_ids": symptom_ids}) for _ in range(3)))
+    call("consistency", "GET", "/api/predict/index/consistency")
+    call("cache_stats", "GET", "/api/predict/cache/stats")
+    call("metrics", "GET", "/api/metrics")
+
+    symptom_id = call("symptom_create", "POST", "/api/symptoms/", json={"name": "예산검사증상"}).json()["id"]
+    try:
+        call("symptom_update", "PUT", f"/api/symptoms/{symptom_id}", json={"description": "검사용"})
+        disease_id = call("disease_create", "POST", "/api/diseases/", json={
+            "name": "예산검사질병", "description": "검사용", "category": "기타질환",
+        }).json()["id"]
+        try:
+            call("link_add", "POST", f"/api/diseases/{disease_id}/symptoms",
+                 json={"symptom_id": symptom_id, "probability": 0.5})
+            call("disease_symptoms", "GET", f"/api/diseases/{disease_id}/symptoms")
+        finally:
+            call("link_bulk", "PUT", f"/api/diseases/{disease_id}/symptoms/bulk", json={"symptoms": []})
+            call("disease_delete", "DELETE", f"/api/diseases/{disease_id}")
+    finally:
+        call("symptom_delete", "DELETE", f"/api/symptoms/{symptom_id}")
+
+    call("over", "GET", "/_budget/over")
+    call("many", "GET", "/_budget/many")
+print(json.dumps(results))
+"""
+
+
+def test_query_budget_enforce():
+    """QUERY_BUDGET_MODE=enforce에서 모든 라우트가 예산 안에서 동작하고, 초과 시 500"""
+    print("=" * 60)
+    print("SQL 문장 예산 enforce 모드 검사")
+    print("=" * 60)
+
+    completed = subprocess.run(
+        [sys.executable, "-c", _ENFORCE_SCRIPT],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, "QUERY_BUDGET_MODE": "enforce"},
+        capture_output=True,
+        text=True,
+    )
+    assert completed.returncode == 0, completed.stderr
+    results = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    over_status, over = results.pop("over")
+    assert over_status == 500
+    assert over["budget"] == 1 and over["count"] == 2
+    assert over["statements"][-1] == "SELECT 2"
+    many_status, many = results.pop("many")
+    assert many_status == 500 and many["count"] == 31
+    assert len(many["statements"]) == SQL_STATEMENT_SAMPLE
+    assert many["statements"][-1] == "SELECT 30"
+    for name, (status_code, _) in results.items():
+        assert status_code < 400, (name, status_code)
+    print(f"✅ 라우트 {len(results)}개 예산 이내, 예산 초과 라우트 500 (문장 표본 {SQL_STATEMENT_SAMPLE}개)")
+
+    # 예산이 없는 구간도 문장 텍스트는 표본만 보관
+    db = SessionLocal()
+    with track_sql() as stats:
+        for i in range(SQL_STATEMENT_SAMPLE * 3):
+            db.execute(text(f"SELECT {i}")).all()
+    db.close()
+    assert stats.count == SQL_STATEMENT_SAMPLE * 3
+    assert len(stats.statements) == SQL_STATEMENT_SAMPLE
+    print(f"✅ 문장 {stats.count}개 실행, 텍스트 {len(stats.statements)}개만 보관")
+
+
+def test_profile_header_requires_token():
+    """PROFILE_TOKEN이 비어 있으면 x-profile 헤더를 무시하고, 설정되면 같은 값만 프로파일"""
+    print("=" * 60)
+    print("프로파일링 헤더 토큰 검사")
+    print("=" * 60)
+
+    def profiled(token, headers):
+        probe = FastAPI()
+        probe.get("/ping")(lambda: {"ok": True})
+        with tempfile.TemporaryDirectory() as directory:
+            probe.add_middleware(
+                ProfilingMiddleware, routes=probe.routes, token=token, directory=directory
+            )
+            with TestClient(probe) as client:
+                response = client.get("/ping", headers=headers)
+            assert response.status_code == 200
+            return PROFILE_ID_HEADER in response.headers, bool(os.listdir(directory))
+
+    assert profiled("", {"x-profile": "1"}) == (False, False)
+    assert profiled("", {"x-profile": ""}) == (False, False)
+    assert profiled("secret", {"x-profile": "wrong"}) == (False, False)
+    assert profiled("secret", {}) == (False, False)
+    assert profiled("secret", {"x-profile": "secret"}) == (True, True)
+    print("✅ 토큰 미설정 시 헤더 무시, 토큰 일치 시에만 프로파일")
+
+
+def test_probability_clamped():
+    """heuristic 점수가 1.0을 넘는 증상 세트(고열+기침)도 /api/predict가 200, 확률은 1.0으로 표시"""
+    print("=" * 60)
+    print("1.0을 넘는 점수의 확률 표시 검사")
+    print("=" * 60)
+
+    db = SessionLocal()
+    snapshot = get_catalog_snapshot(db)
+    db.close()
+    expected = snapshot.engine.score([1, 3], 3)
+    assert expected[0].score > 1.0, expected[0]
+
+    with TestClient(app) as client:
+        for params in ({}, {"explain": True}):
+            response = client.post("/api/predict", params=params, json={"symptom_ids": [1, 3]})
+            assert response.status_code == 200, response.text
+            predictions = response.json()["predictions"]
+            assert [p["disease_id"] for p in predictions] == [r.disease.id for r in expected]
+            assert predictions[0]["probability"] == 1.0
+            assert all(0 <= p["probability"] <= 1 for p in predictions)
+        # 설명 모드에서는 원래 점수 확인 가능
+        assert predictions[0]["score_breakdown"]["final_score"] == expected[0].score
+    print(f"✅ 1위 점수 {expected[0].score:.4f} → 확률 1.0, 200 응답")
+
+
+def test_score_cli_bad_lines():
+    """오프라인 일괄 예측 CLI: 잘못된 줄은 그 줄에만 error를 담고 나머지는 계산"""
+    print("=" * 60)
+    print("일괄 예측 CLI 잘못된 입력 검사")
+    print("=" * 60)
+
+    lines = [
+        "5",                                  # 객체가 아닌 JSON
+        "null",
+        '{"symptoms": [[1]]}',                # 목록 안의 목록
+        '{"symptoms": "고열"}',                # 목록이 아닌 문자열
+        '{"symptoms": [true]}',
+        "{잘못된 JSON",
+        '{"symptoms": ["고열", "없는증상"]}',
+        '["고열", 3]',                         # 정상 (이름과 ID 섞어서)
+        '{"symptom_ids": [1, 3], "top_k": 2}',  # 정상
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "input.jsonl")
+        target = os.path.join(directory, "output.jsonl")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        score_cli.main([source, "-o", target, "--workers", "1"])
+        with open(target, encoding="utf-8") as f:
+            items = [json.loads(line) for line in f]
+
+    assert [item["index"] for item in items] == list(range(len(lines)))
+    for item in items[:6]:
+        assert item["result"] is None and item["error"].startswith("잘못된 요청 형식"), item
+    assert items[6]["error"] == "존재하지 않는 증상: ['없는증상']"
+    for item in items[7:]:
+        assert item["error"] is None and item["result"]["predictions"], item
+    assert len(items[8]["result"]["predictions"]) == 2
+    print(f"✅ {len(lines)}줄 중 잘못된 {len(lines) - 2}줄은 항목 오류, 나머지 계산")
+
+
+def test_extractor_rebuilt_only_on_symptom_changes():
+    """증상 추출 자동자는 질병·연결 쓰기로는 그대로, 다른 이름 추가/삭제 후에는 다시 만듦"""
+    print("=" * 60)
+    print("증상 추출 자동자 재생성 조건 검사")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        snapshot = get_catalog_snapshot(db)
+        db.close()
+        disease_id, links = next(iter(snapshot.index.disease_links.items()))
+        link = links[0]
+
+        client.post("/api/predict/extract", json={"text": "고열"})
+        extractor = symptom_extractors._extractor
+        # 같은 값으로 연결 갱신 → 새 세대지만 증상 세대는 그대로
+        assert client.post(
+            f"/api/diseases/{disease_id}/symptoms",
+            json={"symptom_id": link.symptom_id, "probability": link.probability,
+                  "is_primary": link.is_primary},
+        ).status_code == 201
+        db = SessionLocal()
+        after = get_catalog_snapshot(db)
+        db.close()
+        assert after.generation > snapshot.generation
+        assert after.symptom_generation == snapshot.symptom_generation
+        client.post("/api/predict/extract", json={"text": "고열"})
+        assert symptom_extractors._extractor is extractor
+
+        alias = client.post(
+            f"/api/symptoms/{link.symptom_id}/aliases", json={"alias": "자동자검사별칭"}
+        ).json()
+        try:
+            body = client.post("/api/predict/extract", json={"text": "자동자검사별칭"}).json()
+            assert symptom_extractors._extractor is not extractor
+            assert body["symptom_ids"] == [link.symptom_id]
+        finally:
+            client.delete(f"/api/symptoms/{link.symptom_id}/aliases/{alias['id']}")
+        body = client.post("/api/predict/extract", json={"text": "자동자검사별칭"}).json()
+        assert body["symptom_ids"] == []
+    print("✅ 연결 쓰기 후 자동자 재사용, 다른 이름 추가/삭제 후 재생성")
+
+
 if __name__ == "__main__":
     test_prediction()
+    test_probability_clamped()
+    test_scorer_parity()
+    test_pruned_topk_parity()
+    test_incremental_index_writes()
+    test_batch_and_stream_match_single()
+    test_cache_invalidated_by_write()
+    test_snapshot_isolation()
+    test_catalog_artifact_rebuild()
+    test_lsh_candidates()
+    test_category_shards()
+    test_symptom_autocomplete()
+    test_symptom_fuzzy_search()
+    test_symptom_extraction()
+    test_extractor_rebuilt_only_on_symptom_changes()
+    test_predict_from_text()
+    test_scorer_option_and_explain()
+    test_query_budget_enforce()
+    test_profile_header_requires_token()
+    test_score_cli_bad_lines()
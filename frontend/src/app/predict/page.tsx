@@ -2,7 +2,15 @@
 
 import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
-import { getSymptoms, Symptom } from '@/lib/api';
+import {
+  autocompleteSymptoms,
+  extractSymptoms,
+  getSymptoms,
+  searchSymptoms,
+  Symptom,
+  SymptomMatch,
+  SymptomSuggestion,
+} from '@/lib/api';
 
 
 // 증상을 카테고리별로 그룹화하는 함수
@@ -47,6 +55,10 @@ export default function PredictPage() {
   const [symptoms, setSymptoms] = useState<Symptom[]>([]);
   const [selectedSymptomIds, setSelectedSymptomIds] = useState<number[]>([]);
   const [expandedCategories, setExpandedCategories] = useState<Record<string, boolean>>({});
+  const [query, setQuery] = useState('');
+  const [suggestions, setSuggestions] = useState<SymptomSuggestion[]>([]);
+  const [fuzzyMatches, setFuzzyMatches] = useState<SymptomMatch[]>([]);
+  const [complaint, setComplaint] = useState('');
 
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
@@ -77,6 +89,33 @@ export default function PredictPage() {
     }
   };
 
+  // 검색어 입력 시 자동 완성, 일치하는 접두사가 없으면 오타 허용 검색 (늦게 도착한 이전 응답은 무시)
+  useEffect(() => {
+    if (!query.trim()) {
+      setSuggestions([]);
+      setFuzzyMatches([]);
+      return;
+    }
+    let cancelled = false;
+    autocompleteSymptoms(query)
+      .then(async (data) => {
+        const matches = data.length === 0 ? await searchSymptoms(query) : [];
+        if (!cancelled) {
+          setSuggestions(data);
+          setFuzzyMatches(matches);
+        }
+      })
+      .catch(() => {
+        if (!cancelled) {
+          setSuggestions([]);
+          setFuzzyMatches([]);
+        }
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [query]);
+
   // 증상 선택/해제 토글
   const toggleSymptom = (symptomId: number) => {
     setSelectedSymptomIds((prev) =>
@@ -86,6 +125,25 @@ export default function PredictPage() {
     );
   };
 
+  // 주호소 문장에서 찾은 증상을 선택 목록에 추가
+  const handleExtract = async () => {
+    if (!complaint.trim()) return;
+    try {
+      setError(null);
+      const data = await extractSymptoms(complaint);
+      if (data.symptom_ids.length === 0) {
+        setError('문장에서 증상을 찾지 못했습니다');
+        return;
+      }
+      setSelectedSymptomIds((prev) => [
+        ...prev,
+        ...data.symptom_ids.filter((id) => !prev.includes(id)),
+      ]);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : '증상 추출 실패');
+    }
+  };
+
   // 카테고리 펼치기/접기 토글
   const toggleCategory = (category: string) => {
     setExpandedCategories((prev) => ({
@@ -148,6 +206,75 @@ export default function PredictPage() {
               </div>
             )}
 
+            {/* 주호소 문장으로 증상 찾기 */}
+            <div className="mb-4 flex gap-2">
+              <input
+                type="text"
+                value={complaint}
+                onChange={(e) => setComplaint(e.target.value)}
+                onKeyDown={(e) => {
+                  if (e.key === 'Enter') handleExtract();
+                }}
+                placeholder="증상을 문장으로 입력 (예: 고열이랑 기침, 목이 아파요)"
+                className="flex-1 px-3 py-2 border border-gray-300 rounded-lg text-sm focus:outline-none focus:ring-2 focus:ring-indigo-500"
+              />
+              <button
+                onClick={handleExtract}
+                className="px-4 bg-indigo-100 text-indigo-700 rounded-lg text-sm font-medium hover:bg-indigo-200 transition"
+              >
+                증상 찾기
+              </button>
+            </div>
+
+            {/* 증상 검색 (이름 또는 초성) */}
+            <div className="mb-4">
+              <input
+                type="text"
+                value={query}
+                onChange={(e) => setQuery(e.target.value)}
+                placeholder="증상 검색 (예: 두통, ㄷㅌ)"
+                className="w-full px-3 py-2 border border-gray-300 rounded-lg text-sm focus:outline-none focus:ring-2 focus:ring-indigo-500"
+              />
+              {suggestions.length > 0 && (
+                <div className="mt-2 flex flex-wrap gap-2">
+                  {suggestions.map((suggestion) => (
+                    <button
+                      key={suggestion.id}
+                      onClick={() => toggleSymptom(suggestion.id)}
+                      className={`px-3 py-1 rounded-full text-sm border transition ${
+                        selectedSymptomIds.includes(suggestion.id)
+                          ? 'bg-indigo-600 text-white border-indigo-600'
+                          : 'bg-white text-gray-700 border-gray-300 hover:bg-indigo-50'
+                      }`}
+                    >
+                      {suggestion.name}
+                      <span className="ml-1 text-xs opacity-70">({suggestion.disease_count})</span>
+                    </button>
+                  ))}
+                </div>
+              )}
+              {fuzzyMatches.length > 0 && (
+                <div className="mt-2">
+                  <div className="text-xs text-gray-500 mb-1">혹시 이 증상인가요?</div>
+                  <div className="flex flex-wrap gap-2">
+                    {fuzzyMatches.map((match) => (
+                      <button
+                        key={match.id}
+                        onClick={() => toggleSymptom(match.id)}
+                        className={`px-3 py-1 rounded-full text-sm border transition ${
+                          selectedSymptomIds.includes(match.id)
+                            ? 'bg-indigo-600 text-white border-indigo-600'
+                            : 'bg-white text-gray-700 border-dashed border-gray-300 hover:bg-indigo-50'
+                        }`}
+                      >
+                        {match.name}
+                      </button>
+                    ))}
+                  </div>
+                </div>
+              )}
+            </div>
+
             {/* 카테고리별 증상 목록 */}
             <div className="space-y-3 max-h-[500px] overflow-y-auto mb-4 pr-2">
               {Object.entries(groupedSymptoms).map(([category, categorySymptoms]) => (
@@ -29,6 +29,8 @@ export default function ResultPage() {
 
   const [predictions, setPredictions] = useState<DiseasePredictor[]>([]);
   const [totalDiseasesChecked, setTotalDiseasesChecked] = useState<number>(0);
+  const [categoryCounts, setCategoryCounts] = useState<Record<string, number>>({});
+  const [selectedCategory, setSelectedCategory] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -50,9 +52,13 @@ export default function ResultPage() {
       try {
         setLoading(true);
         setError(null);
-        const result = await predictDisease(symptomIds);
+        const result = await predictDisease(
+          symptomIds,
+          selectedCategory ? [selectedCategory] : undefined
+        );
         setPredictions(result.predictions);
         setTotalDiseasesChecked(result.total_diseases_checked);
+        setCategoryCounts(result.category_counts || {});
       } catch (err) {
         setError(err instanceof Error ? err.message : '질병 예측 실패');
       } finally {
@@ -61,7 +67,7 @@ export default function ResultPage() {
     };
 
     fetchPredictions();
-  }, [symptomIdsParam, router]);
+  }, [symptomIdsParam, selectedCategory, router]);
 
   // 로딩 중
   if (loading) {
@@ -113,6 +119,40 @@ export default function ResultPage() {
           </p>
         </div>
 
+        {/* 카테고리 필터 (카테고리별 일치 질병 수) */}
+        {Object.keys(categoryCounts).length > 0 && (
+          <div className="flex flex-wrap justify-center gap-2 mb-8">
+            <button
+              onClick={() => setSelectedCategory(null)}
+              className={`px-4 py-2 rounded-full text-sm font-semibold transition ${
+                selectedCategory === null
+                  ? 'bg-indigo-600 text-white'
+                  : 'bg-white text-gray-700 hover:bg-indigo-50'
+              }`}
+            >
+              전체
+            </button>
+            {Object.entries(categoryCounts).map(([category, count]) => (
+              <button
+                key={category}
+                onClick={() => setSelectedCategory(category)}
+                className={`px-4 py-2 rounded-full text-sm font-semibold transition ${
+                  selectedCategory === category
+                    ? 'text-white'
+                    : 'bg-white text-gray-700 hover:bg-indigo-50'
+                }`}
+                style={
+                  selectedCategory === category
+                    ? { backgroundColor: categoryColors[category] || defaultColor }
+                    : undefined
+                }
+              >
+                {category} ({count})
+              </button>
+            ))}
+          </div>
+        )}
+
         {/* 차트 섹션 */}
         <div className="bg-white rounded-2xl shadow-xl p-6 mb-8 animate-fade-in">
           <h2 className="text-2xl font-semibold text-gray-800 mb-4">확률 차트</h2>
@@ -35,6 +35,33 @@ export interface DiseasePredictor {
 export interface PredictResponse {
   predictions: DiseasePredictor[];
   total_diseases_checked: number;
+  category_counts?: Record<string, number>;  // 카테고리별 일치 질병 수
+}
+
+export interface SymptomSuggestion {
+  id: number;
+  name: string;
+  disease_count: number;  // 이 증상과 연결된 서로 다른 질병 수
+}
+
+export interface SymptomMatch {
+  id: number;
+  name: string;
+  similarity: number;  // 0~1 (자모 n-gram 유사도)
+}
+
+export interface ExtractedSymptom {
+  symptom_id: number;
+  name: string;
+  start: number;  // 입력 텍스트 기준 위치
+  end: number;
+  matched: string;  // 입력 텍스트에서 일치한 부분
+}
+
+export interface ExtractResponse {
+  symptom_ids: number[];
+  matches: ExtractedSymptom[];
+  catalog_generation: number;
 }
 
 export interface DiseaseSymptomDetail {
@@ -70,9 +97,59 @@ export async function getSymptoms(): Promise<Symptom[]> {
 }
 
 /**
- * 질병 예측 요청
+ * 증상 이름 자동 완성 (이름 또는 초성 접두사, 예: "ㄷㅌ" → 두통)
+ */
+export async function autocompleteSymptoms(
+  q: string,
+  limit: number = 10
+): Promise<SymptomSuggestion[]> {
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  const response = await fetch(`/api/symptoms/autocomplete?${params}`);
+  if (!response.ok) {
+    throw new Error('증상 자동 완성에 실패했습니다');
+  }
+  return response.json();
+}
+
+/**
+ * 오타를 허용하는 증상 이름 검색 (예: "두퉁" → 두통)
+ */
+export async function searchSymptoms(
+  q: string,
+  limit: number = 5
+): Promise<SymptomMatch[]> {
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  const response = await fetch(`/api/symptoms/search?${params}`);
+  if (!response.ok) {
+    throw new Error('증상 검색에 실패했습니다');
+  }
+  return response.json();
+}
+
+/**
+ * 자유 텍스트 주호소에서 증상 찾기 (예: "고열이랑 기침, 목이 아파요")
+ */
+export async function extractSymptoms(text: string): Promise<ExtractResponse> {
+  const response = await fetch('/api/predict/extract', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ text }),
+  });
+  if (!response.ok) {
+    throw new Error('증상 추출에 실패했습니다');
+  }
+  return response.json();
+}
+
+/**
+ * 질병 예측 요청 (categories를 주면 해당 카테고리 질병만 예측)
  */
-export async function predictDisease(symptomIds: number[]): Promise<PredictResponse> {
+export async function predictDisease(
+  symptomIds: number[],
+  categories?: string[]
+): Promise<PredictResponse> {
   const response = await fetch('/api/predict', {
     method: 'POST',
     headers: {
@@ -80,6 +157,8 @@ export async function predictDisease(symptomIds: number[]): Promise<PredictRespo
     },
     body: JSON.stringify({
       symptom_ids: symptomIds,
+      include_category_counts: true,  // 카테고리 필터 버튼용
+      ...(categories && categories.length > 0 ? { categories } : {}),
     }),
   });
 